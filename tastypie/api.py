@@ -1,15 +1,182 @@
 from __future__ import unicode_literals
+import threading
 import warnings
-from django.conf.urls import url, patterns, include
+import weakref
+from django.conf.urls import url, patterns
 from django.core.exceptions import ImproperlyConfigured
-from django.core.urlresolvers import reverse
+from django.core.urlresolvers import reverse, clear_url_caches, get_resolver, get_urlconf, RegexURLResolver, Resolver404, ResolverMatch
 from django.http import HttpResponse, HttpResponseBadRequest
+from django.utils import importlib, six
+from django.utils.encoding import force_text
+from django.views.decorators.csrf import csrf_exempt
+from tastypie.compat import reset_reverse_dicts
 from tastypie.exceptions import NotRegistered, BadRequest
 from tastypie.serializers import Serializer
-from tastypie.utils import trailing_slash, is_valid_jsonp_callback_value
+from tastypie.utils import trailing_slash, is_valid_jsonp_callback_value, cached_response
 from tastypie.utils.mime import determine_format, build_content_type
 
 
+class LazyResourceURLResolver(RegexURLResolver):
+    """
+    Stands in for the URLs of a resource registered with an ``Api`` by its
+    dotted path.
+
+    Until the resource is loaded, its standard URLs are built from just its
+    name & the regex its detail URIs are matched with, which is enough to
+    reverse them. It's loaded as soon as a path beneath its name is resolved.
+    """
+    def __init__(self, api, resource_name, detail_uri_name='pk', detail_uri_regex='.*?'):
+        self.api = api
+        self.resource_name = resource_name
+        self.detail_uri_name = detail_uri_name
+        self.detail_uri_regex = detail_uri_regex
+        self._placeholder_urls = None
+        self._urls = None
+        super(LazyResourceURLResolver, self).__init__(r'^', None)
+
+    @property
+    def resource(self):
+        """
+        The resource, if it's been loaded (otherwise ``None``).
+        """
+        return self.api._registry.get(self.resource_name)
+
+    @property
+    def url_patterns(self):
+        if self._urls is not None:
+            return self._urls
+
+        resource = self.resource
+
+        if resource is not None:
+            self._urls = resource.urls
+            return self._urls
+
+        if self._placeholder_urls is None:
+            self._placeholder_urls = self.get_placeholder_urls()
+
+        return self._placeholder_urls
+
+    def get_placeholder_urls(self):
+        """
+        Mirrors ``Resource.base_urls``, with views that load the resource.
+        """
+        return [
+            url(r"^(?P<resource_name>%s)%s$" % (self.resource_name, trailing_slash()), self.wrap_view('dispatch_list'), name="api_dispatch_list"),
+            url(r"^(?P<resource_name>%s)/schema%s$" % (self.resource_name, trailing_slash()), self.wrap_view('get_schema'), name="api_get_schema"),
+            url(r"^(?P<resource_name>%s)/set/(?P<%s_list>.*?)%s$" % (self.resource_name, self.detail_uri_name, trailing_slash()), self.wrap_view('get_multiple'), name="api_get_multiple"),
+            url(r"^(?P<resource_name>%s)/(?P<%s>%s)%s$" % (self.resource_name, self.detail_uri_name, self.detail_uri_regex, trailing_slash()), self.wrap_view('dispatch_detail'), name="api_dispatch_detail"),
+        ]
+
+    def wrap_view(self, view):
+        def wrapper(request, *args, **kwargs):
+            resource = self.api.load_resource(self.resource_name)
+            return resource.wrap_view(view)(request, *args, **kwargs)
+        return wrapper
+
+    def has_custom_urls(self):
+        resource = self.resource
+        return resource is not None and bool(resource.prepend_urls() or resource.override_urls())
+
+    def resolve(self, path):
+        path = force_text(path)
+
+        if path == self.resource_name or path.startswith(self.resource_name + '/'):
+            self.api.load_resource(self.resource_name)
+
+        return super(LazyResourceURLResolver, self).resolve(path)
+
+
+class ApiURLResolver(RegexURLResolver):
+    """
+    Resolves the URLs of all the resources registered with an ``Api``.
+
+    Rather than trying each resource's patterns in turn, the resource name at
+    the start of the path is looked up in a dict, so only the patterns of that
+    resource (plus those of any resource with its own ``prepend_urls``) are
+    tried, in the order they were given (so the first match wins, as usual).
+    Reversing works as usual, since every pattern is still present.
+
+    ``lazy_resolvers`` are ``LazyResourceURLResolver`` instances for resources
+    that haven't been loaded yet.
+    """
+    def __init__(self, regex, resources, lazy_resolvers=None, **kwargs):
+        self.resource_resolvers = {}
+        self.custom_resolvers = []
+        self.lazy_resolvers = list(lazy_resolvers or [])
+        resolvers = []
+
+        for resource in resources:
+            resolver = RegexURLResolver(r'^', resource.urls)
+            self.resource_resolvers[resource._meta.resource_name] = resolver
+            resolvers.append(resolver)
+
+            if resource.prepend_urls() or resource.override_urls():
+                self.custom_resolvers.append(resolver)
+
+        for resolver in self.lazy_resolvers:
+            self.resource_resolvers[resolver.resource_name] = resolver
+            resolvers.append(resolver)
+
+        self.positions = dict((resolver, position) for position, resolver in enumerate(resolvers))
+        super(ApiURLResolver, self).__init__(regex, resolvers, **kwargs)
+
+    def get_candidates(self, path):
+        """
+        Returns the resolvers that may match ``path`` (already stripped of the
+        API prefix), in the order they'd be tried.
+        """
+        candidates = list(self.custom_resolvers)
+        # Lazy resources only have their own URLs once they've been loaded.
+        candidates.extend([resolver for resolver in self.lazy_resolvers if resolver.has_custom_urls()])
+        end = path.find('/')
+
+        # Resource names may have slashes in them, so try each prefix.
+        while True:
+            resolver = self.resource_resolvers.get(path if end == -1 else path[:end])
+
+            if resolver is not None and not resolver in candidates:
+                candidates.append(resolver)
+
+            if end == -1:
+                candidates.sort(key=self.positions.get)
+                return candidates
+
+            end = path.find('/', end + 1)
+
+    def clear_reverse_caches(self):
+        """
+        Forgets what can be reversed, here & for the lazily registered
+        resources (whose names change once they've been loaded).
+        """
+        reset_reverse_dicts(self)
+
+        for resolver in self.lazy_resolvers:
+            reset_reverse_dicts(resolver)
+
+    def resolve(self, path):
+        path = force_text(path)
+        match = self.regex.search(path)
+
+        if match:
+            new_path = path[match.end():]
+
+            for resolver in self.get_candidates(new_path):
+                try:
+                    sub_match = resolver.resolve(new_path)
+                except Resolver404:
+                    continue
+
+                if sub_match:
+                    sub_match_dict = dict(match.groupdict(), **self.default_kwargs)
+                    sub_match_dict.update(sub_match.kwargs)
+                    return ResolverMatch(sub_match.func, sub_match.args, sub_match_dict, sub_match.url_name, self.app_name or sub_match.app_name, [self.namespace] + sub_match.namespaces)
+
+        # Anything else gets the usual pattern-by-pattern treatment (& the
+        # usual details of what was tried).
+        return super(ApiURLResolver, self).resolve(path)
+
+
 class Api(object):
     """
     Implements a registry to tie together the various resources that make up
@@ -21,27 +188,49 @@ class Api(object):
     Optionally supplying ``api_name`` allows you to name the API. Generally,
     this is done with version numbers (i.e. ``v1``, ``v2``, etc.) but can
     be named any string.
+
+    Optionally supplying a ``tastypie.batch.Batch`` as ``batch`` adds a
+    ``batch/`` endpoint, which carries out many requests in one.
     """
-    def __init__(self, api_name="v1", serializer_class=Serializer):
+    resolver_class = ApiURLResolver
+
+    def __init__(self, api_name="v1", serializer_class=Serializer, batch=None):
         self.api_name = api_name
+        self.batch = batch
         self._registry = {}
         self._canonicals = {}
+        self._lazy = {}
+        self._lock = threading.Lock()
+        self._top_level_responses = {}
+        self._resolvers = weakref.WeakKeyDictionary()
         self.serializer = serializer_class()
 
-    def register(self, resource, canonical=True):
+    def register(self, resource, canonical=True, resource_name=None, detail_uri_name='pk', detail_uri_regex='.*?'):
         """
         Registers an instance of a ``Resource`` subclass with the API.
 
         Optionally accept a ``canonical`` argument, which indicates that the
         resource being registered is the canonical variant. Defaults to
         ``True``.
+
+        ``resource`` may instead be the dotted path to a ``Resource`` subclass
+        (or instance), which isn't imported until it's first needed. Its
+        ``resource_name`` (by default, worked out from the class name the same
+        way ``Resource`` does), ``detail_uri_name`` & ``detail_uri_regex`` (the
+        regex its ``base_urls`` capture the detail value with) must be given,
+        since they're needed for its URLs.
         """
+        if isinstance(resource, six.string_types):
+            return self.register_lazy(resource, canonical=canonical, resource_name=resource_name, detail_uri_name=detail_uri_name, detail_uri_regex=detail_uri_regex)
+
         resource_name = getattr(resource._meta, 'resource_name', None)
 
         if resource_name is None:
             raise ImproperlyConfigured("Resource %r must define a 'resource_name'." % resource)
 
+        self._lazy.pop(resource_name, None)
         self._registry[resource_name] = resource
+        self._top_level_responses.clear()
 
         if canonical is True:
             if resource_name in self._canonicals:
@@ -53,6 +242,133 @@ class Api(object):
             resource._meta.api_name = self.api_name
             resource.__class__.Meta.api_name = self.api_name
 
+    def register_lazy(self, path, canonical=True, resource_name=None, detail_uri_name='pk', detail_uri_regex='.*?'):
+        """
+        Registers the ``Resource`` at the dotted ``path`` without importing
+        it. See ``register``.
+        """
+        if resource_name is None:
+            class_name = path.split('.')[-1]
+            name_bits = [bit for bit in class_name.split('Resource') if bit]
+            resource_name = ''.join(name_bits).lower()
+
+        if canonical is True and resource_name in self._canonicals:
+            warnings.warn("A new resource '%s' is replacing the existing canonical URL for '%s'." % (path, resource_name), Warning, stacklevel=2)
+
+        self._registry.pop(resource_name, None)
+        self._canonicals.pop(resource_name, None)
+        self._lazy[resource_name] = (path, canonical, detail_uri_name, detail_uri_regex)
+        self._top_level_responses.clear()
+
+    def load_resource(self, resource_name):
+        """
+        Returns the resource registered as ``resource_name``, importing it
+        first if it was registered by its dotted path.
+
+        The import happens outside of the lock (it may well register other
+        resources), which is only held to look up & publish the resource.
+        """
+        with self._lock:
+            if not resource_name in self._lazy:
+                if resource_name in self._registry:
+                    return self._registry[resource_name]
+
+                raise NotRegistered("No resource was registered for '%s'." % resource_name)
+
+            lazy = self._lazy[resource_name]
+
+        path, canonical, detail_uri_name, detail_uri_regex = lazy
+
+        if not '.' in path:
+            raise ImproperlyConfigured("Tastypie requires a Python-style path (<module.module.Class>) to lazily register resources. Only given '%s'." % path)
+
+        module_path, class_name = path.rsplit('.', 1)
+        resource = getattr(importlib.import_module(module_path), class_name, None)
+
+        if resource is None:
+            raise ImproperlyConfigured("Module '%s' does not appear to have a resource called '%s'." % (module_path, class_name))
+
+        if isinstance(resource, type):
+            resource = resource()
+
+        if resource._meta.resource_name != resource_name:
+            raise ImproperlyConfigured("Resource '%s' is named '%s' but was registered as '%s'." % (path, resource._meta.resource_name, resource_name))
+
+        if resource._meta.detail_uri_name != detail_uri_name:
+            raise ImproperlyConfigured("Resource '%s' has a 'detail_uri_name' of '%s' but was registered with '%s'." % (path, resource._meta.detail_uri_name, detail_uri_name))
+
+        actual_regex = resource.get_url_group_regex('api_dispatch_detail', detail_uri_name)
+
+        if actual_regex != detail_uri_regex:
+            raise ImproperlyConfigured("Resource '%s' has a 'detail_uri_regex' of '%s' but was registered with '%s'." % (path, actual_regex, detail_uri_regex))
+
+        with self._lock:
+            # Another thread may have got here first (or the registration may
+            # have changed in the meantime).
+            if self._lazy.get(resource_name) is not lazy:
+                if resource_name in self._registry:
+                    return self._registry[resource_name]
+
+                raise NotRegistered("No resource was registered for '%s'." % resource_name)
+
+            self.register(resource, canonical=canonical)
+            resource.api_name = self.api_name
+
+        # The names of its ``prepend_urls`` can only be reversed from now on.
+        self.clear_reverse_caches()
+        return resource
+
+    def clear_reverse_caches(self):
+        """
+        Has Django work out again what can be reversed, once a resource
+        registered by its dotted path has been loaded.
+
+        Besides the resolvers built by ``urls``, this resets the ones of the
+        root (& current) URLconf that include them, which keep a copy of
+        their names.
+        """
+        resolvers = list(self._resolvers.keys())
+
+        for resolver in resolvers:
+            resolver.clear_reverse_caches()
+
+        for urlconf in set([None, get_urlconf()]):
+            self._clear_including(get_resolver(urlconf), resolvers)
+
+        # Namespaced lookups go through resolvers Django keeps aside.
+        clear_url_caches()
+
+    def _clear_including(self, resolver, resolvers):
+        if resolver in resolvers:
+            return True
+
+        found = False
+
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, RegexURLResolver) and self._clear_including(pattern, resolvers):
+                found = True
+
+        if found:
+            reset_reverse_dicts(resolver)
+
+        return found
+
+    def warm_up(self):
+        """
+        Loads every resource registered by its dotted path, along with the
+        resources their related fields point to.
+
+        Call this before forking worker processes (i.e. from your WSGI module
+        with a preloading server), so the work is done once & shared.
+        """
+        for resource_name in sorted(self._lazy.keys()):
+            self.load_resource(resource_name)
+
+        for resource_name in sorted(self._registry.keys()):
+            for field_object in self._registry[resource_name].fields.values():
+                if getattr(field_object, 'is_related', False):
+                    field_object.to_class
+
     def unregister(self, resource_name):
         """
         If present, unregisters a resource from the API.
@@ -60,6 +376,11 @@ class Api(object):
         if resource_name in self._registry:
             del(self._registry[resource_name])
 
+        if resource_name in self._lazy:
+            del(self._lazy[resource_name])
+
+        self._top_level_responses.clear()
+
         if resource_name in self._canonicals:
             del(self._canonicals[resource_name])
 
@@ -67,6 +388,9 @@ class Api(object):
         """
         Returns the canonical resource for a given ``resource_name``.
         """
+        if resource_name in self._lazy and self._lazy[resource_name][1] is True:
+            self.load_resource(resource_name)
+
         if resource_name in self._canonicals:
             return self._canonicals[resource_name]
 
@@ -80,6 +404,13 @@ class Api(object):
                 return HttpResponseBadRequest()
         return wrapper
 
+    def dispatch_batch(self, request, api_name=None):
+        """
+        A view that carries out many requests in one, handing off to the
+        ``batch``.
+        """
+        return self.batch.dispatch(self, request, api_name=api_name)
+
     def override_urls(self):
         """
         Deprecated. Will be removed by v1.0.0. Please use ``prepend_urls`` instead.
@@ -102,9 +433,22 @@ class Api(object):
             url(r"^(?P<api_name>%s)%s$" % (self.api_name, trailing_slash()), self.wrap_view('top_level'), name="api_%s_top_level" % self.api_name),
         ]
 
+        if self.batch is not None:
+            pattern_list.append(url(r"^(?P<api_name>%s)/batch%s$" % (self.api_name, trailing_slash()), csrf_exempt(self.wrap_view('dispatch_batch')), name="api_%s_batch" % self.api_name))
+
+        resources = []
+        lazy_resolvers = []
+
         for name in sorted(self._registry.keys()):
             self._registry[name].api_name = self.api_name
-            pattern_list.append((r"^(?P<api_name>%s)/" % self.api_name, include(self._registry[name].urls)))
+            resources.append(self._registry[name])
+
+        for name in sorted(self._lazy.keys()):
+            lazy_resolvers.append(LazyResourceURLResolver(self, name, detail_uri_name=self._lazy[name][2], detail_uri_regex=self._lazy[name][3]))
+
+        resolver = self.resolver_class(r"^(?P<api_name>%s)/" % self.api_name, resources, lazy_resolvers=lazy_resolvers)
+        self._resolvers[resolver] = True
+        pattern_list.append(resolver)
 
         urlpatterns = self.prepend_urls()
 
@@ -122,13 +466,36 @@ class Api(object):
         """
         A view that returns a serialized list of all resources registers
         to the ``Api``. Useful for discovery.
-        """
-        available_resources = {}
 
+        The serialized list is kept per format (until another resource is
+        registered). Responses carry an ``ETag`` & a request with a matching
+        ``If-None-Match`` gets a 304.
+        """
         if api_name is None:
             api_name = self.api_name
 
-        for name in sorted(self._registry.keys()):
+        desired_format = determine_format(request, self.serializer)
+
+        if 'text/javascript' in desired_format:
+            callback = request.GET.get('callback', 'callback')
+
+            if not is_valid_jsonp_callback_value(callback):
+                raise BadRequest('JSONP callback name is invalid.')
+
+            # JSONP responses depend on the callback, so they aren't kept.
+            serialized = self.serializer.serialize(self.build_top_level(api_name), desired_format, {'callback': callback})
+            return HttpResponse(content=serialized, content_type=build_content_type(desired_format))
+
+        serialize = lambda: self.serializer.serialize(self.build_top_level(api_name), desired_format)
+        return cached_response(request, self._top_level_responses, (api_name, desired_format), serialize, build_content_type(desired_format))
+
+    def build_top_level(self, api_name):
+        """
+        Returns the data for ``top_level``.
+        """
+        available_resources = {}
+
+        for name in sorted(set(self._registry.keys()) | set(self._lazy.keys())):
             available_resources[name] = {
                 'list_endpoint': self._build_reverse_url("api_dispatch_list", kwargs={
                     'api_name': api_name,
@@ -140,20 +507,7 @@ class Api(object):
                 }),
             }
 
-        desired_format = determine_format(request, self.serializer)
-
-        options = {}
-
-        if 'text/javascript' in desired_format:
-            callback = request.GET.get('callback', 'callback')
-
-            if not is_valid_jsonp_callback_value(callback):
-                raise BadRequest('JSONP callback name is invalid.')
-
-            options['callback'] = callback
-
-        serialized = self.serializer.serialize(available_resources, desired_format, options)
-        return HttpResponse(content=serialized, content_type=build_content_type(desired_format))
+        return available_resources
 
     def _build_reverse_url(self, name, args=None, kwargs=None):
         """
@@ -172,10 +526,10 @@ class NamespacedApi(Api):
         super(NamespacedApi, self).__init__(api_name=api_name, **kwargs)
         self.urlconf_namespace = urlconf_namespace
 
-    def register(self, resource, canonical=True):
-        super(NamespacedApi, self).register(resource, canonical=canonical)
+    def register(self, resource, canonical=True, **kwargs):
+        super(NamespacedApi, self).register(resource, canonical=canonical, **kwargs)
 
-        if canonical is True:
+        if canonical is True and not isinstance(resource, six.string_types):
             # Plop in the namespace here as well.
             resource._meta.urlconf_namespace = self.urlconf_namespace
 
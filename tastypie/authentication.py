@@ -35,6 +35,34 @@ except ImportError:
     oauth_provider = None
 
 
+class AuthenticationContext(object):
+    """
+    The outcome of authenticating a single request.
+
+    Built once per request by ``Resource.is_authenticated`` & stored on the
+    request, so that throttling & access logging can reuse the winning
+    backend, user & identifier instead of re-parsing the credentials.
+    """
+    def __init__(self, authentication, request):
+        self.authentication = authentication
+        # ``MultiAuthentication`` records the backend that let the user in.
+        self.backend = getattr(request, '_authentication_backend', authentication)
+        self.user = getattr(request, 'user', None)
+        self._request = request
+        self._identifier = None
+
+    @property
+    def identifier(self):
+        """
+        The requestor's identifier, as provided by ``get_identifier`` on the
+        authentication class. Only computed once.
+        """
+        if self._identifier is None:
+            self._identifier = self.authentication.get_identifier(self._request)
+
+        return self._identifier
+
+
 class Authentication(object):
     """
     A simple base class to establish the protocol for auth.
@@ -485,10 +513,96 @@ class OAuthAuthentication(Authentication):
 class MultiAuthentication(object):
     """
     An authentication backend that tries a number of backends in order.
+
+    The backend that succeeds for a given set of credentials is remembered
+    (keyed on a fingerprint of those credentials) & tried first the next
+    time the same credentials are seen. Requests carrying more than one kind
+    of credentials (which more than one backend may accept) always try the
+    backends in their declared order.
+
+    Optionally accepts a ``max_remembered`` keyword argument, which caps how
+    many credential fingerprints are kept in memory. Default is ``1000``.
     """
+    # The request bits that carry credentials for the shipped backends.
+    fingerprint_meta_keys = ('HTTP_AUTHORIZATION', 'HTTP_X_CSRFTOKEN')
+    fingerprint_param_keys = ('username', 'api_key', 'oauth_consumer_key', 'oauth_token')
+    # The bits that make up each kind of credentials (``session`` being the
+    # session cookie).
+    fingerprint_groups = (
+        ('HTTP_AUTHORIZATION',),
+        ('username', 'api_key'),
+        ('oauth_consumer_key', 'oauth_token'),
+        ('HTTP_X_CSRFTOKEN', 'session'),
+    )
+
     def __init__(self, *backends, **kwargs):
+        self.max_remembered = kwargs.pop('max_remembered', 1000)
         super(MultiAuthentication, self).__init__(**kwargs)
         self.backends = backends
+        self._preferred_backends = {}
+
+    def get_fingerprint(self, request):
+        """
+        Returns a hash of the credential-bearing parts of the request, or
+        ``None`` if the request carries no credentials at all (or more than
+        one kind of them).
+        """
+        content_type = request.META.get('CONTENT_TYPE', '')
+
+        if content_type.startswith('multipart'):
+            # Credentials may be in the body, which we can't peek at without
+            # consuming the stream. Don't guess.
+            return None
+
+        present = set([key for key in self.fingerprint_meta_keys if request.META.get(key)])
+        bits = [request.META.get(key, '') for key in self.fingerprint_meta_keys]
+        bits.extend([request.GET.get(key, '') for key in self.fingerprint_param_keys])
+        present.update([key for key in self.fingerprint_param_keys if request.GET.get(key)])
+
+        if content_type.startswith('application/x-www-form-urlencoded'):
+            bits.extend([request.POST.get(key, '') for key in self.fingerprint_param_keys])
+            present.update([key for key in self.fingerprint_param_keys if request.POST.get(key)])
+
+        bits.append(request.COOKIES.get(settings.SESSION_COOKIE_NAME, ''))
+
+        if bits[-1]:
+            present.add('session')
+
+        kinds = [group for group in self.fingerprint_groups if present.intersection(group)]
+
+        if len(kinds) != 1:
+            # Either nothing to go on, or credentials that more than one
+            # backend may accept, where the declared order decides.
+            return None
+
+        return sha1('\x00'.join(bits).encode('utf-8')).hexdigest()
+
+    def ordered_backends(self, fingerprint):
+        """
+        Returns the backends in the order they should be tried, with the one
+        last seen succeeding for ``fingerprint`` (if any) moved to the front.
+        """
+        preferred = self._preferred_backends.get(fingerprint)
+
+        if preferred is None or preferred >= len(self.backends):
+            return list(enumerate(self.backends))
+
+        ordered = [(preferred, self.backends[preferred])]
+        ordered.extend([(position, backend) for position, backend in enumerate(self.backends) if position != preferred])
+        return ordered
+
+    def remember_backend(self, fingerprint, position):
+        """
+        Records which backend succeeded for the given ``fingerprint``.
+        """
+        if fingerprint is None:
+            return
+
+        if len(self._preferred_backends) >= self.max_remembered and not fingerprint in self._preferred_backends:
+            # Cheaper than tracking recency & good enough for a hint.
+            self._preferred_backends.clear()
+
+        self._preferred_backends[fingerprint] = position
 
     def is_authenticated(self, request, **kwargs):
         """
@@ -497,19 +611,27 @@ class MultiAuthentication(object):
         Should return either ``True`` if allowed, ``False`` if not or an
         ``HttpResponse`` if you need something custom.
         """
-        unauthorized = False
+        unauthorized = {}
+        fingerprint = self.get_fingerprint(request)
 
-        for backend in self.backends:
+        for position, backend in self.ordered_backends(fingerprint):
             check = backend.is_authenticated(request, **kwargs)
 
             if check:
                 if isinstance(check, HttpUnauthorized):
-                    unauthorized = unauthorized or check
+                    unauthorized[position] = check
                 else:
                     request._authentication_backend = backend
+                    self.remember_backend(fingerprint, position)
                     return check
 
-        return unauthorized
+        self._preferred_backends.pop(fingerprint, None)
+
+        if unauthorized:
+            # Same response as trying the backends in their declared order.
+            return unauthorized[min(unauthorized)]
+
+        return False
 
     def get_identifier(self, request):
         """
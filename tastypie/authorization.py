@@ -1,4 +1,9 @@
 from __future__ import unicode_literals
+import threading
+import time
+
+from django.db.models import Q
+
 from tastypie.exceptions import TastypieError, Unauthorized
 
 
@@ -42,6 +47,16 @@ class Authorization(object):
         """
         return True
 
+    def read_detail_lookup(self, object_list, bundle):
+        """
+        Given the ``QuerySet`` used to look up a single object, returns it
+        narrowed down to what the user may read, so the check happens as part
+        of the lookup query.
+
+        Returns the ``object_list`` unaltered by default.
+        """
+        return object_list
+
     def create_list(self, object_list, bundle):
         """
         Unimplemented, as Tastypie never creates entire new lists, but
@@ -136,6 +151,15 @@ class DjangoAuthorization(Authorization):
 
     Both the list & detail variants simply check the model they're based
     on, as that's all the more granular Django's permission setup gets.
+
+    Permission checks are memoized on the request, so checking the same
+    model/action for many bundles (as ``put_list`` & ``patch_list`` do) only
+    asks ``user.has_perm`` once.
+
+    The list methods accept either a ``QuerySet`` or a plain list of model
+    instances. Given a list, each distinct model is checked once & only
+    the instances the user may act on are returned, which makes them
+    suitable for authorizing a whole batch of objects in one call.
     """
     def base_checks(self, request, model_klass):
         # If it doesn't look like a model, we can't check permissions.
@@ -148,98 +172,360 @@ class DjangoAuthorization(Authorization):
 
         return model_klass
 
-    def read_list(self, object_list, bundle):
-        klass = self.base_checks(bundle.request, object_list.model)
+    def check_user_perm(self, request, model_klass, action):
+        """
+        Returns whether the request's user holds the ``action`` (``add``,
+        ``change`` or ``delete``) permission on ``model_klass``.
 
-        if klass is False:
-            return []
+        The answer is memoized on the request, keyed on the user, model &
+        action.
+        """
+        user = request.user
+        cache = getattr(request, '_permission_cache', None)
 
-        # GET-style methods are always allowed.
-        return object_list
+        if cache is None:
+            cache = request._permission_cache = {}
 
-    def read_detail(self, object_list, bundle):
-        klass = self.base_checks(bundle.request, bundle.obj.__class__)
+        key = (user.__class__, getattr(user, 'pk', None), model_klass, action)
 
-        if klass is False:
-            raise Unauthorized("You are not allowed to access that resource.")
+        if not key in cache:
+            permission = '%s.%s_%s' % (model_klass._meta.app_label, action, model_klass._meta.module_name)
+            cache[key] = user.has_perm(permission)
 
-        # GET-style methods are always allowed.
-        return True
+        return cache[key]
 
-    def create_list(self, object_list, bundle):
-        klass = self.base_checks(bundle.request, object_list.model)
+    def perm_list_checks(self, request, action, object_list):
+        """
+        Returns the part of ``object_list`` the user may apply ``action`` to.
 
-        if klass is False:
-            return []
+        A ``QuerySet`` is returned whole or not at all. A list of instances
+        is filtered, checking each distinct model only once.
+        """
+        if hasattr(object_list, 'model'):
+            klass = self.base_checks(request, object_list.model)
 
-        permission = '%s.add_%s' % (klass._meta.app_label, klass._meta.module_name)
+            if klass is False:
+                return []
 
-        if not bundle.request.user.has_perm(permission):
-            return []
+            if action is not None and not self.check_user_perm(request, klass, action):
+                return []
 
-        return object_list
+            return object_list
 
-    def create_detail(self, object_list, bundle):
-        klass = self.base_checks(bundle.request, bundle.obj.__class__)
+        allowed = {}
+        permitted = []
+
+        for obj in object_list:
+            klass = obj.__class__
+
+            if not klass in allowed:
+                allowed[klass] = self.base_checks(request, klass) is not False
+
+                if allowed[klass] and action is not None:
+                    allowed[klass] = self.check_user_perm(request, klass, action)
+
+            if allowed[klass]:
+                permitted.append(obj)
+
+        return permitted
+
+    def perm_obj_checks(self, request, action, obj):
+        """
+        Returns ``True`` if the user may apply ``action`` to ``obj``, raising
+        ``Unauthorized`` if not.
+        """
+        klass = self.base_checks(request, obj.__class__)
 
         if klass is False:
             raise Unauthorized("You are not allowed to access that resource.")
 
-        permission = '%s.add_%s' % (klass._meta.app_label, klass._meta.module_name)
-
-        if not bundle.request.user.has_perm(permission):
+        if action is not None and not self.check_user_perm(request, klass, action):
             raise Unauthorized("You are not allowed to access that resource.")
 
         return True
 
-    def update_list(self, object_list, bundle):
-        klass = self.base_checks(bundle.request, object_list.model)
+    def read_list(self, object_list, bundle):
+        # GET-style methods are always allowed.
+        return self.perm_list_checks(bundle.request, None, object_list)
 
-        if klass is False:
-            return []
+    def read_detail(self, object_list, bundle):
+        # GET-style methods are always allowed.
+        return self.perm_obj_checks(bundle.request, None, bundle.obj)
 
-        permission = '%s.change_%s' % (klass._meta.app_label, klass._meta.module_name)
+    def create_list(self, object_list, bundle):
+        return self.perm_list_checks(bundle.request, 'add', object_list)
 
-        if not bundle.request.user.has_perm(permission):
-            return []
+    def create_detail(self, object_list, bundle):
+        return self.perm_obj_checks(bundle.request, 'add', bundle.obj)
 
-        return object_list
+    def update_list(self, object_list, bundle):
+        return self.perm_list_checks(bundle.request, 'change', object_list)
 
     def update_detail(self, object_list, bundle):
-        klass = self.base_checks(bundle.request, bundle.obj.__class__)
+        return self.perm_obj_checks(bundle.request, 'change', bundle.obj)
 
-        if klass is False:
-            raise Unauthorized("You are not allowed to access that resource.")
+    def delete_list(self, object_list, bundle):
+        return self.perm_list_checks(bundle.request, 'delete', object_list)
 
-        permission = '%s.change_%s' % (klass._meta.app_label, klass._meta.module_name)
+    def delete_detail(self, object_list, bundle):
+        return self.perm_obj_checks(bundle.request, 'delete', bundle.obj)
 
-        if not bundle.request.user.has_perm(permission):
-            raise Unauthorized("You are not allowed to access that resource.")
 
-        return True
+class RowLevelAuthorization(Authorization):
+    """
+    Restricts which rows a user may read, update or delete, with the checks
+    done by the database rather than in Python.
+
+    Requires a ``rules`` dictionary, keyed on ``read``, ``update``,
+    ``delete`` & ``create``. For ``read``/``update``/``delete``, a rule may
+    be:
+
+        * a ``Q`` object,
+        * a dictionary of lookups, whose values may be callables accepting the
+          user (i.e. ``{'author': lambda user: user}``),
+        * ``True`` (every row) or ``False`` (no rows),
+        * a callable accepting the user & returning any of the above,
+        * or a list of any of the above, which are OR'ed together.
+
+    ``update`` & ``delete`` default to the ``read`` rule, which defaults to
+    ``True``. New rows can't be checked against the database, so ``create``
+    must be ``True``, ``False`` or a callable accepting the user & returning
+    one of those. It defaults to ``True``.
+
+    The rules are compiled to ``Q`` objects once per role & kept for ``ttl``
+    seconds (default 60). By default, each user is their own role; override
+    ``get_role`` to share compiled rules between users.
+
+    List reads are filtered in the query & detail lookups (``obj_get``)
+    include the ``read`` rule, so rows the user can't see simply aren't
+    found. Requests without a ``user``, or with an anonymous one, get no rows
+    & can't create anything, unless ``allow_anonymous=True`` is passed, in
+    which case the rules are handed the ``AnonymousUser`` too.
+    """
+    max_compiled = 1000
 
-    def delete_list(self, object_list, bundle):
-        klass = self.base_checks(bundle.request, object_list.model)
+    def __init__(self, rules=None, ttl=60, allow_anonymous=False):
+        self.rules = rules or {}
+        self.ttl = ttl
+        self.allow_anonymous = allow_anonymous
+        self._compiled = {}
+        self._lock = threading.Lock()
 
-        if klass is False:
-            return []
+    def get_user(self, request):
+        """
+        Returns the user the rules should be compiled for, or ``None`` if the
+        request shouldn't be allowed anything.
+        """
+        user = getattr(request, 'user', None)
 
-        permission = '%s.delete_%s' % (klass._meta.app_label, klass._meta.module_name)
+        if user is None:
+            return None
+
+        if not self.allow_anonymous and user.is_anonymous():
+            return None
+
+        return user
+
+    def get_role(self, user):
+        """
+        Returns a hashable key identifying which compiled rules ``user``
+        shares.
+
+        By default, every user gets their own.
+        """
+        return (user.__class__, getattr(user, 'pk', None))
+
+    def rule_action(self, action):
+        """
+        Returns the action whose rule governs ``action``, which is ``read``
+        for ``update`` & ``delete`` unless they have their own rule.
+        """
+        if action in ('update', 'delete') and not action in self.rules:
+            return 'read'
+
+        return action
+
+    def compile_rule(self, rule, user):
+        """
+        Turns a rule into ``True``, ``False`` or a ``Q`` object.
+        """
+        if isinstance(rule, Q) or rule is True or rule is False:
+            return rule
+
+        if isinstance(rule, (list, tuple)):
+            compiled = False
+
+            for sub_rule in rule:
+                sub_compiled = self.compile_rule(sub_rule, user)
+
+                if sub_compiled is True:
+                    return True
+                elif sub_compiled is False:
+                    continue
+                elif compiled is False:
+                    compiled = sub_compiled
+                else:
+                    compiled = compiled | sub_compiled
+
+            return compiled
+
+        if hasattr(rule, 'items'):
+            lookups = {}
+
+            for lookup, value in rule.items():
+                if callable(value):
+                    value = value(user)
+
+                lookups[str(lookup)] = value
+
+            return Q(**lookups)
+
+        if callable(rule):
+            return self.compile_rule(rule(user), user)
+
+        raise TastypieError("Unable to compile the row-level rule %r." % rule)
+
+    def get_compiled(self, request, action):
+        """
+        Returns a ``(token, compiled)`` pair for the user on ``request``,
+        where ``compiled`` is ``True``, ``False`` or a ``Q`` object.
+
+        The ``token`` identifies this particular compilation, so a detail
+        lookup that already applied it doesn't have to be checked again.
+        """
+        user = self.get_user(request)
+
+        if user is None:
+            return (None, False)
+
+        action = self.rule_action(action)
+        key = (action, self.get_role(user))
+        now = time.time()
+
+        with self._lock:
+            cached = self._compiled.get(key)
+
+        if cached is not None and cached[0] > now:
+            return cached[1], cached[2]
+
+        compiled = self.compile_rule(self.rules.get(action, True), user)
+        token = (key, now)
+
+        with self._lock:
+            if len(self._compiled) >= self.max_compiled:
+                self._compiled.clear()
+
+            self._compiled[key] = (now + self.ttl, token, compiled)
+
+        return token, compiled
+
+    def filter_rows(self, object_list, compiled):
+        if compiled is True:
+            return object_list
+
+        if compiled is False:
+            if hasattr(object_list, 'none'):
+                return object_list.none()
 
-        if not bundle.request.user.has_perm(permission):
             return []
 
+        if not hasattr(object_list, 'filter'):
+            # A plain list of instances. Let the database sort it out in a
+            # single query.
+            if not object_list:
+                return []
+
+            model = object_list[0].__class__
+            allowed = set(model._default_manager.filter(compiled).filter(pk__in=[obj.pk for obj in object_list]).values_list('pk', flat=True))
+            return [obj for obj in object_list if obj.pk in allowed]
+
+        return object_list.filter(compiled)
+
+    def check_row(self, action, object_list, bundle):
+        token, compiled = self.get_compiled(bundle.request, action)
+
+        if compiled is True:
+            return True
+
+        if compiled is not False:
+            checked = getattr(bundle.request, '_row_level_checked', {})
+
+            if token in checked.get((bundle.obj.__class__, bundle.obj.pk), ()):
+                # Already enforced by the lookup that fetched the object.
+                return True
+
+            if bundle.obj.pk is not None:
+                queryset = object_list if hasattr(object_list, 'filter') else bundle.obj.__class__._default_manager.all()
+
+                if queryset.filter(compiled).filter(pk=bundle.obj.pk).exists():
+                    return True
+
+        raise Unauthorized("You are not allowed to access that resource.")
+
+    def read_list(self, object_list, bundle):
+        token, compiled = self.get_compiled(bundle.request, 'read')
+        return self.filter_rows(object_list, compiled)
+
+    def read_detail_lookup(self, object_list, bundle):
+        token, compiled = self.get_compiled(bundle.request, 'read')
+        object_list = self.filter_rows(object_list, compiled)
+
+        if compiled is not True and compiled is not False:
+            object_list._row_level_token = token
+
         return object_list
 
-    def delete_detail(self, object_list, bundle):
-        klass = self.base_checks(bundle.request, bundle.obj.__class__)
+    def read_detail(self, object_list, bundle):
+        token, compiled = self.get_compiled(bundle.request, 'read')
 
-        if klass is False:
-            raise Unauthorized("You are not allowed to access that resource.")
+        if token is not None and getattr(object_list, '_row_level_token', None) == token:
+            # The lookup itself applied the rule. Remember that for any
+            # update/delete sharing it.
+            checked = getattr(bundle.request, '_row_level_checked', None)
+
+            if checked is None:
+                checked = bundle.request._row_level_checked = {}
 
-        permission = '%s.delete_%s' % (klass._meta.app_label, klass._meta.module_name)
+            checked.setdefault((bundle.obj.__class__, bundle.obj.pk), set()).add(token)
+            return True
+
+        return self.check_row('read', object_list, bundle)
+
+    def create_allowed(self, bundle):
+        user = self.get_user(bundle.request)
+
+        if user is None:
+            return False
 
-        if not bundle.request.user.has_perm(permission):
+        rule = self.rules.get('create', True)
+
+        if callable(rule):
+            rule = rule(user)
+
+        return rule is True
+
+    def create_list(self, object_list, bundle):
+        if not self.create_allowed(bundle):
+            return []
+
+        return object_list
+
+    def create_detail(self, object_list, bundle):
+        if not self.create_allowed(bundle):
             raise Unauthorized("You are not allowed to access that resource.")
 
         return True
+
+    def update_list(self, object_list, bundle):
+        token, compiled = self.get_compiled(bundle.request, 'update')
+        return self.filter_rows(object_list, compiled)
+
+    def update_detail(self, object_list, bundle):
+        return self.check_row('update', object_list, bundle)
+
+    def delete_list(self, object_list, bundle):
+        token, compiled = self.get_compiled(bundle.request, 'delete')
+        return self.filter_rows(object_list, compiled)
+
+    def delete_detail(self, object_list, bundle):
+        return self.check_row('delete', object_list, bundle)
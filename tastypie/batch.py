@@ -0,0 +1,439 @@
+from __future__ import unicode_literals
+import logging
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.urlresolvers import resolve, Resolver404, get_script_prefix
+from django.db import connections
+from django.http import HttpResponse, Http404
+from django.utils import six
+from django.utils.encoding import force_bytes, force_text
+from django.utils.six.moves import queue
+from django.utils.six.moves.urllib.parse import urlsplit
+
+from tastypie import http
+from tastypie.authentication import Authentication, MultiAuthentication
+from tastypie.compat import atomic, HAS_ATOMIC
+from tastypie.exceptions import BadRequest, UnsupportedFormat
+from tastypie.utils.mime import determine_format, build_content_type
+from tastypie.utils.threads import ThreadState
+
+
+# Headers of the batch request that don't apply to its sub-requests.
+UNINHERITED_HEADERS = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_X_HTTP_METHOD_OVERRIDE', 'HTTP_IF_MATCH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_UNMODIFIED_SINCE', 'HTTP_PREFER')
+
+
+class BatchRollback(Exception):
+    """
+    Raised to roll back a batch run in a transaction.
+    """
+    pass
+
+
+class BatchAuthentication(object):
+    """
+    The authentication shared by the sub-requests of a batch.
+
+    Once a sub-request has been authenticated, any later sub-request with the
+    same method & credentials (see ``get_credentials``), to a resource with an
+    equal authentication (the same class, with the same settings), reuses the
+    outcome rather than authenticating again.
+    """
+    # The request bits that carry credentials for the shipped backends.
+    credential_meta_keys = MultiAuthentication.fingerprint_meta_keys
+    credential_param_keys = MultiAuthentication.fingerprint_param_keys
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._outcomes = []
+
+    def is_equal(self, authentication, other):
+        return type(authentication) is type(other) and vars(authentication) == vars(other)
+
+    def get_credentials(self, request):
+        """
+        Returns the credential-bearing parts of the request (which a
+        sub-request may set with its own headers or query string), or
+        ``None`` if they can't be told without reading a multipart body.
+        """
+        content_type = request.META.get('CONTENT_TYPE', '')
+
+        if content_type.startswith('multipart'):
+            return None
+
+        credentials = [request.META.get(key, '') for key in self.credential_meta_keys]
+        credentials.extend([request.GET.get(key, '') for key in self.credential_param_keys])
+
+        if content_type.startswith('application/x-www-form-urlencoded'):
+            credentials.extend([request.POST.get(key, '') for key in self.credential_param_keys])
+
+        credentials.append(request.COOKIES.get(settings.SESSION_COOKIE_NAME, ''))
+        return tuple(credentials)
+
+    def remember(self, authentication, request):
+        credentials = self.get_credentials(request)
+
+        if credentials is None:
+            return
+
+        with self._lock:
+            self._outcomes.append((authentication, request.method, credentials, getattr(request, 'user', None), getattr(request, '_authentication_backend', None)))
+
+    def restore(self, authentication, request):
+        """
+        Applies a remembered outcome to ``request``, returning whether there
+        was one.
+        """
+        credentials = self.get_credentials(request)
+
+        if credentials is None:
+            return False
+
+        with self._lock:
+            for other, method, other_credentials, user, backend in self._outcomes:
+                if method == request.method and other_credentials == credentials and self.is_equal(authentication, other):
+                    request.user = user
+
+                    if backend is not None:
+                        request._authentication_backend = backend
+
+                    return True
+
+        return False
+
+
+class Batch(object):
+    """
+    Carries out many sub-requests, sent as a single ``POST`` to an ``Api``'s
+    ``batch/`` endpoint, without the overhead of a full request for each.
+
+    Each sub-request is resolved & handed straight to its view, so it goes
+    through the resource's usual ``wrap_view`` & ``dispatch`` (including
+    authorization & throttling) but skips middleware. See
+    ``BatchAuthentication`` for how authentication is shared.
+
+    Accepts:
+
+        * ``authentication`` - checked once for the batch itself. Default is
+          ``Authentication()``, which lets anyone in.
+        * ``max_requests`` - the most sub-requests allowed in one batch.
+        * ``parallel`` - whether runs of ``GET`` sub-requests are carried out
+          at the same time, on ``workers`` threads.
+        * ``allow_transactions`` - whether clients may ask for all of the
+          sub-requests to succeed or fail together. Needs Django 1.6+.
+        * ``reuse_authentication`` - whether sub-requests share their
+          authentication. Turn this off if your authentication looks at more
+          than the method & the credentials (see
+          ``BatchAuthentication.get_credentials``) of a request.
+    """
+    METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+    def __init__(self, authentication=None, max_requests=20, parallel=False, workers=4, allow_transactions=True, reuse_authentication=True, using=None):
+        self.authentication = authentication or Authentication()
+        self.max_requests = max_requests
+        self.parallel = parallel
+        self.workers = workers
+        self.allow_transactions = allow_transactions
+        self.reuse_authentication = reuse_authentication
+        self.using = using
+
+    def dispatch(self, api, request, api_name=None):
+        """
+        The view for the ``batch/`` endpoint.
+        """
+        desired_format = determine_format(request, api.serializer)
+
+        if request.method != 'POST':
+            return self.method_not_allowed()
+
+        auth_result = self.authentication.is_authenticated(request)
+
+        if isinstance(auth_result, HttpResponse):
+            return auth_result
+
+        if not auth_result is True:
+            return http.HttpUnauthorized()
+
+        try:
+            items, transactional = self.parse(api, request)
+        except BadRequest as e:
+            return self.error_response(api, desired_format, six.text_type(e))
+
+        state = BatchAuthentication() if self.reuse_authentication else None
+
+        if state is not None:
+            state.remember(self.authentication, request)
+
+        if transactional:
+            results = []
+
+            try:
+                with atomic(using=self.using):
+                    for item in items:
+                        results.append(self.run(api, request, item, desired_format, state))
+
+                        if results[-1]['status'] >= 400:
+                            raise BatchRollback()
+            except BatchRollback:
+                return self.create_response(api, desired_format, results, response_class=http.HttpBadRequest)
+        else:
+            results = self.run_all(api, request, items, desired_format, state)
+
+        return self.create_response(api, desired_format, results)
+
+    def method_not_allowed(self):
+        response = http.HttpMethodNotAllowed()
+        response['Allow'] = 'POST'
+        return response
+
+    def parse(self, api, request):
+        """
+        Returns the sub-requests in the batch & whether they should be run in
+        a transaction, raising ``BadRequest`` if anything's amiss.
+
+        The batch may be a list of sub-requests or a dictionary with the
+        list as ``requests`` & an optional ``transaction`` flag.
+        """
+        content_type = request.META.get('CONTENT_TYPE', 'application/json')
+
+        try:
+            data = api.serializer.deserialize(request.body, format=content_type)
+        except (BadRequest, UnsupportedFormat, ValueError):
+            raise BadRequest("The batch couldn't be read as '%s'." % content_type)
+
+        transactional = False
+
+        if isinstance(data, dict):
+            transactional = bool(data.get('transaction', False))
+            data = data.get('requests')
+
+        if not isinstance(data, list) or not data:
+            raise BadRequest("A batch must be a non-empty list of requests.")
+
+        if len(data) > self.max_requests:
+            raise BadRequest("A batch may have at most %d requests." % self.max_requests)
+
+        if transactional and not self.allow_transactions:
+            raise BadRequest("Transactions aren't allowed.")
+
+        # The views' own transactions would commit early.
+        if transactional and not HAS_ATOMIC:
+            raise BadRequest("Transactions need Django 1.6 or later.")
+
+        prefix = api._build_reverse_url('api_%s_top_level' % api.api_name, kwargs={'api_name': api.api_name})
+        items = []
+
+        for index, item in enumerate(data):
+            if not isinstance(item, dict) or not item.get('path'):
+                raise BadRequest("Request %d needs a 'path'." % index)
+
+            method = six.text_type(item.get('method', 'GET')).upper()
+
+            if not method in self.METHODS:
+                raise BadRequest("Request %d has an unsupported method '%s'." % (index, method))
+
+            path = six.text_type(item['path'])
+
+            if not path.startswith(prefix):
+                raise BadRequest("Request %d must be for a path beneath '%s'." % (index, prefix))
+
+            headers = item.get('headers') or {}
+
+            if not isinstance(headers, dict):
+                raise BadRequest("Request %d has 'headers' that aren't a dictionary." % index)
+
+            items.append({
+                'method': method,
+                'path': path,
+                'body': item.get('body'),
+                'headers': headers,
+            })
+
+        return items, transactional
+
+    def can_run_in_parallel(self):
+        """
+        Whether sub-requests can be run on other threads, which don't share
+        the transaction of this one (or the in-memory SQLite database).
+        """
+        if not self.parallel:
+            return False
+
+        for connection in connections.all():
+            if getattr(connection, 'in_atomic_block', False):
+                return False
+
+            if connection.vendor == 'sqlite' and connection.settings_dict['NAME'] in ('', ':memory:'):
+                return False
+
+        return True
+
+    def run_all(self, api, request, items, desired_format, state):
+        """
+        Runs the sub-requests in order, except that (if allowed) runs of
+        ``GET`` sub-requests are carried out at the same time.
+        """
+        results = [None] * len(items)
+        parallel = self.can_run_in_parallel()
+        index = 0
+
+        while index < len(items):
+            end = index + 1
+
+            if parallel and items[index]['method'] == 'GET':
+                while end < len(items) and items[end]['method'] == 'GET':
+                    end += 1
+
+            if end - index > 1:
+                self.run_parallel(api, request, items, range(index, end), desired_format, state, results)
+            else:
+                results[index] = self.run(api, request, items[index], desired_format, state)
+
+            index = end
+
+        return results
+
+    def run_parallel(self, api, request, items, indexes, desired_format, state, results):
+        pending = queue.Queue()
+
+        for index in indexes:
+            pending.put(index)
+
+        # New threads don't inherit the script prefix, URLconf, language or
+        # time zone of this one.
+        thread_state = ThreadState()
+
+        def work():
+            try:
+                with thread_state:
+                    while True:
+                        try:
+                            index = pending.get_nowait()
+                        except queue.Empty:
+                            return
+
+                        results[index] = self.run(api, request, items[index], desired_format, state)
+            finally:
+                # Each thread has its own database connections.
+                for connection in connections.all():
+                    connection.close()
+
+        threads = [threading.Thread(target=work) for i in range(min(self.workers, len(indexes)))]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+    def build_request(self, api, request, item, desired_format):
+        """
+        Returns the sub-request for ``item``, with the headers (& user) of the
+        batch request.
+        """
+        split = urlsplit(item['path'])
+        path_info = split.path
+        script_prefix = get_script_prefix()
+
+        if script_prefix != '/' and path_info.startswith(script_prefix):
+            path_info = '/' + path_info[len(script_prefix):]
+
+        body = item['body']
+        content_type = request.META.get('CONTENT_TYPE', 'application/json')
+
+        if body is None:
+            body = b''
+        elif isinstance(body, six.string_types):
+            body = force_bytes(body)
+        else:
+            body = force_bytes(api.serializer.serialize(body, format=content_type.split(';')[0]))
+
+        environ = dict([(key, value) for key, value in request.META.items() if not key in UNINHERITED_HEADERS])
+        environ.update({
+            'PATH_INFO': path_info,
+            'SCRIPT_NAME': request.META.get('SCRIPT_NAME', ''),
+            'QUERY_STRING': split.query,
+            'REQUEST_METHOD': item['method'],
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+        })
+
+        if body:
+            environ['CONTENT_TYPE'] = content_type
+
+        if not 'HTTP_ACCEPT' in environ:
+            environ['HTTP_ACCEPT'] = desired_format
+
+        for header, value in item['headers'].items():
+            key = header.upper().replace('-', '_')
+
+            if not key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = 'HTTP_%s' % key
+
+            environ[key] = force_text(value)
+
+        sub_request = WSGIRequest(environ)
+
+        for attr in ('user', 'session'):
+            if hasattr(request, attr):
+                setattr(sub_request, attr, getattr(request, attr))
+
+        return sub_request
+
+    def run(self, api, request, item, desired_format, state):
+        """
+        Carries out a single sub-request, returning its ``status``,
+        ``headers`` & ``body``.
+        """
+        sub_request = self.build_request(api, request, item, desired_format)
+        sub_request._tastypie_batch = state
+
+        try:
+            match = resolve(sub_request.path_info, urlconf=getattr(request, 'urlconf', None))
+
+            if match.url_name == 'api_%s_batch' % api.api_name:
+                return self.build_result(http.HttpBadRequest(), desired_format, api)
+
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        except (Resolver404, Http404):
+            response = http.HttpNotFound()
+        except Exception:
+            if getattr(settings, 'TASTYPIE_FULL_DEBUG', False):
+                raise
+
+            log = logging.getLogger('django.request.tastypie')
+            log.error('Internal Server Error: %s' % sub_request.path, exc_info=True, extra={'status_code': 500, 'request': sub_request})
+            response = http.HttpApplicationError()
+
+        return self.build_result(response, desired_format, api)
+
+    def build_result(self, response, desired_format, api):
+        body = None
+        content = getattr(response, 'content', b'')
+
+        if content:
+            content_type = response.get('Content-Type', '').split(';')[0].strip()
+
+            try:
+                if content_type == desired_format:
+                    body = api.serializer.deserialize(content, format=content_type)
+                else:
+                    body = force_text(content)
+            except Exception:
+                body = force_text(content, errors='replace')
+
+        return {
+            'status': response.status_code,
+            'headers': dict(response.items()),
+            'body': body,
+        }
+
+    def create_response(self, api, desired_format, results, response_class=HttpResponse):
+        serialized = api.serializer.serialize(results, desired_format)
+        return response_class(content=serialized, content_type=build_content_type(desired_format))
+
+    def error_response(self, api, desired_format, message):
+        serialized = api.serializer.serialize({'error': message}, desired_format)
+        return http.HttpBadRequest(content=serialized, content_type=build_content_type(desired_format))
@@ -2,7 +2,7 @@ from __future__ import unicode_literals
 from django.conf import settings
 import django
 
-__all__ = ['get_user_model', 'get_username_field', 'AUTH_USER_MODEL']
+__all__ = ['get_user_model', 'get_username_field', 'AUTH_USER_MODEL', 'atomic', 'HAS_ATOMIC', 'queries_logged', 'reset_reverse_dicts']
 
 AUTH_USER_MODEL = getattr(settings, 'AUTH_USER_MODEL', 'auth.User')
 
@@ -23,3 +23,38 @@ else:
 
     def get_username_field():
         return 'username'
+
+# Django 1.6+ compatibility
+try:
+    from django.db.transaction import atomic
+    HAS_ATOMIC = True
+except ImportError:
+    # Unlike ``atomic``, nested blocks commit as soon as they finish.
+    from django.db.transaction import commit_on_success as atomic
+    HAS_ATOMIC = False
+
+
+# Django 1.7+ compatibility
+def queries_logged(connection):
+    """
+    Returns whether ``connection`` keeps the queries it runs in
+    ``connection.queries``.
+    """
+    if hasattr(connection, 'queries_logged'):
+        return connection.queries_logged
+
+    return bool(connection.use_debug_cursor or (connection.use_debug_cursor is None and settings.DEBUG))
+
+
+def reset_reverse_dicts(resolver):
+    """
+    Has ``resolver`` (a ``RegexURLResolver``) work out what it can reverse
+    again, the next time it's asked.
+    """
+    resolver._reverse_dict = {}
+    resolver._namespace_dict = {}
+    resolver._app_dict = {}
+
+    if hasattr(resolver, '_populated'):
+        resolver._populated = False
+        resolver._callback_strs = set()
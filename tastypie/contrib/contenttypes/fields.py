@@ -35,6 +35,12 @@ class GenericForeignKeyField(fields.ToOneField):
 
         return super(GenericForeignKeyField, self).get_related_resource(related_instance)
 
+    def get_identity_key(self, bundle, for_list):
+        # ``to_class`` is whichever resource was used last, so key on the one
+        # for this object instead.
+        key = super(GenericForeignKeyField, self).get_identity_key(bundle, for_list)
+        return (self.to.get(type(bundle.obj)),) + key[1:]
+
     @property
     def to_class(self):
         if self._to_class and not issubclass(GenericResource, self._to_class):
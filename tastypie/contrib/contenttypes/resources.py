@@ -1,8 +1,8 @@
 from __future__ import unicode_literals
 from tastypie.bundle import Bundle
-from tastypie.resources import ModelResource
+from tastypie.resources import ModelResource, RESOLVED_URIS
 from tastypie.exceptions import NotFound
-from django.core.urlresolvers import resolve, Resolver404, get_script_prefix
+from django.core.urlresolvers import resolve, Resolver404, get_script_prefix, get_urlconf
 
 
 class GenericResource(ModelResource):
@@ -24,19 +24,32 @@ class GenericResource(ModelResource):
         simply override this method.
         """
         prefix = get_script_prefix()
-        chomped_uri = uri
+        # Resolving against the whole URLconf is slow, so remember the result.
+        cache_key = (self.__class__, prefix, get_urlconf(), uri)
+        resolved = RESOLVED_URIS.get(cache_key)
 
-        if prefix and chomped_uri.startswith(prefix):
-            chomped_uri = chomped_uri[len(prefix)-1:]
+        if resolved is None:
+            chomped_uri = uri
+
+            if prefix and chomped_uri.startswith(prefix):
+                chomped_uri = chomped_uri[len(prefix)-1:]
+
+            try:
+                view, args, kwargs = resolve(chomped_uri)
+                resolved = (kwargs['resource_name'], kwargs)
+            except (Resolver404, KeyError):
+                raise NotFound("The URL provided '%s' was not a link to a valid resource." % uri)
+
+            RESOLVED_URIS.set(cache_key, resolved)
+
+        resource_name, kwargs = resolved
 
         try:
-            view, args, kwargs = resolve(chomped_uri)
-            resource_name = kwargs['resource_name']
             resource_class = self.resource_mapping[resource_name]
-        except (Resolver404, KeyError):
+        except KeyError:
             raise NotFound("The URL provided '%s' was not a link to a valid resource." % uri)
 
         parent_resource = resource_class(api_name=self._meta.api_name)
-        kwargs = parent_resource.remove_api_resource_names(kwargs)
+        kwargs = parent_resource.remove_api_resource_names(kwargs.copy())
         bundle = Bundle(request=request)
         return parent_resource.obj_get(bundle, **kwargs)
@@ -569,13 +569,83 @@ class RelatedField(ApiField):
             )
             return related_resource.full_dehydrate(bundle)
 
+    def get_identity_map(self, request):
+        """
+        Returns the related objects already dehydrated during ``request``, or
+        ``None`` if they shouldn't be reused.
+
+        Only ``GET`` & ``HEAD`` requests are mapped, as writes may change a
+        related object part-way through the response.
+        """
+        if request is None or not getattr(request, 'method', None) in ('GET', 'HEAD'):
+            return None
+
+        identity_map = getattr(request, '_related_identity_map', None)
+
+        if identity_map is None:
+            identity_map = request._related_identity_map = {}
+
+        return identity_map
+
+    def get_identity_key(self, bundle, for_list):
+        """
+        Identifies the representation of ``bundle.obj`` by the related
+        resource, its ``api_name``, the object, whether it's for a list & if
+        it's in full.
+        """
+        api_name = None
+
+        if self._resource and not self._resource._meta.api_name is None:
+            api_name = self._resource._meta.api_name
+
+        return (self.to_class, api_name, type(bundle.obj), bundle.obj.pk, for_list, self.should_full_dehydrate(bundle, for_list=for_list))
+
+    def recall_related(self, bundle, for_list):
+        """
+        Looks up ``bundle.obj`` in the request's identity map, returning the
+        key it's kept under (``None`` if it can't be) & what it was dehydrated
+        to earlier in the request (``None`` if it hasn't been).
+
+        Full representations come back as a new ``Bundle``, so changes to its
+        ``data`` don't leak into other parts of the response.
+        """
+        identity_map = self.get_identity_map(bundle.request)
+
+        if identity_map is None or getattr(bundle.obj, 'pk', None) is None:
+            return None, None
+
+        key = self.get_identity_key(bundle, for_list)
+        dehydrated = identity_map.get(key)
+
+        if isinstance(dehydrated, Bundle):
+            dehydrated = Bundle(obj=bundle.obj, data=dehydrated.data.copy(), request=bundle.request)
+
+        return key, dehydrated
+
+    def remember_related(self, bundle, key, dehydrated):
+        """
+        Keeps what ``bundle.obj`` was dehydrated to for the rest of the
+        request.
+        """
+        if key is None:
+            return
+
+        if isinstance(dehydrated, Bundle):
+            dehydrated = Bundle(obj=bundle.obj, data=dehydrated.data.copy(), request=bundle.request)
+
+        self.get_identity_map(bundle.request)[key] = dehydrated
+
     def resource_from_uri(self, fk_resource, uri, request=None, related_obj=None, related_name=None):
         """
         Given a URI is provided, the related resource is attempted to be
         loaded based on the identifiers in the URI.
         """
         try:
-            obj = fk_resource.get_via_uri(uri, request=request)
+            obj = self.get_prefetched(request, (fk_resource.__class__, 'resource_uri', uri))
+
+            if obj is None:
+                obj = fk_resource.get_via_uri(uri, request=request)
+
             bundle = fk_resource.build_bundle(
                 obj=obj,
                 request=request
@@ -584,6 +654,13 @@ class RelatedField(ApiField):
         except ObjectDoesNotExist:
             raise ApiFieldError("Could not find the provided object via resource URI '%s'." % uri)
 
+    def get_prefetched(self, request, key, default=None):
+        """
+        Returns what ``Resource.prefetch_related_data`` found for ``key``, or
+        ``default`` if it wasn't prefetched.
+        """
+        return getattr(request, '_related_prefetch', {}).get(key, default)
+
     def resource_from_data(self, fk_resource, data, request=None, related_obj=None, related_name=None):
         """
         Given a dictionary-like structure is provided, a fresh related
@@ -606,7 +683,17 @@ class RelatedField(ApiField):
         # happens to match other kwargs. In the case of a create, it might be the
         # completely wrong resource.
         # We also need to check to see if updates are allowed on the FK resource.
-        if unique_keys and fk_resource.can_update():
+        prefetch_key = fk_resource.related_prefetch_key(data) if unique_keys else None
+        obj = self.get_prefetched(request, prefetch_key, NOT_PROVIDED)
+
+        if obj is None:
+            # Known not to exist. It may be created now though, so later
+            # references have to look it up again.
+            del request._related_prefetch[prefetch_key]
+        elif obj is not NOT_PROVIDED:
+            fk_bundle.obj = obj
+            return fk_resource.obj_update(fk_bundle, skip_errors=True, **data)
+        elif unique_keys and fk_resource.can_update():
             try:
                 return fk_resource.obj_update(fk_bundle, skip_errors=True, **data)
             except (NotFound, TypeError):
@@ -733,9 +820,15 @@ class ToOneField(RelatedField):
             
             return None        
 
-        self.fk_resource = self.get_related_resource(foreign_obj)
         fk_bundle = Bundle(obj=foreign_obj, request=bundle.request)
-        return self.dehydrate_related(fk_bundle, self.fk_resource, for_list=for_list)
+        key, dehydrated = self.recall_related(fk_bundle, for_list)
+
+        if dehydrated is None:
+            self.fk_resource = self.get_related_resource(foreign_obj)
+            dehydrated = self.dehydrate_related(fk_bundle, self.fk_resource, for_list=for_list)
+            self.remember_related(fk_bundle, key, dehydrated)
+
+        return dehydrated
 
     def hydrate(self, bundle):
         value = super(ToOneField, self).hydrate(bundle)
@@ -823,10 +916,16 @@ class ToManyField(RelatedField):
         # TODO: Also model-specific and leaky. Relies on there being a
         #       ``Manager`` there.
         for m2m in the_m2ms.all():
-            m2m_resource = self.get_related_resource(m2m)
             m2m_bundle = Bundle(obj=m2m, request=bundle.request)
-            self.m2m_resources.append(m2m_resource)
-            m2m_dehydrated.append(self.dehydrate_related(m2m_bundle, m2m_resource, for_list=for_list))
+            key, dehydrated = self.recall_related(m2m_bundle, for_list)
+
+            if dehydrated is None:
+                m2m_resource = self.get_related_resource(m2m)
+                self.m2m_resources.append(m2m_resource)
+                dehydrated = self.dehydrate_related(m2m_bundle, m2m_resource, for_list=for_list)
+                self.remember_related(m2m_bundle, key, dehydrated)
+
+            m2m_dehydrated.append(dehydrated)
 
         return m2m_dehydrated
 
@@ -0,0 +1,211 @@
+from __future__ import unicode_literals
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import connections
+from django.utils.six.moves import queue
+
+from tastypie import fields
+from tastypie.authorization import ReadOnlyAuthorization
+from tastypie.exceptions import NotFound
+from tastypie.resources import Resource
+from tastypie.utils import now
+
+
+class Job(object):
+    """
+    The state of an asynchronous write.
+
+    Jobs are kept in the cache, so any process sharing it can report on them.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    # How often, in seconds, progress is written back to the cache.
+    save_interval = 1
+
+    def __init__(self, resource_name=None, method=None, total=0, owner=None, expiration=86400):
+        self.id = uuid.uuid4().hex
+        self.resource_name = resource_name
+        self.method = method
+        self.state = self.PENDING
+        self.total = total
+        self.completed = 0
+        self.errors = []
+        self.status_code = None
+        self.result = None
+        self.owner = owner
+        self.created = now()
+        self.finished = None
+        self.expiration = expiration
+        self.saved_at = None
+
+    @classmethod
+    def get_cache_key(cls, job_id):
+        return 'tastypie_job_%s' % job_id
+
+    @classmethod
+    def load(cls, job_id):
+        """
+        Returns the job with the given id, or ``None`` if there's no such job
+        (or it has expired).
+        """
+        return cache.get(cls.get_cache_key(job_id))
+
+    def save(self):
+        self.saved_at = time.time()
+        cache.set(self.get_cache_key(self.id), self, self.expiration)
+
+    def start(self):
+        self.state = self.RUNNING
+        self.save()
+
+    def advance(self, count=1):
+        """
+        Records that ``count`` more items have been processed, saving now &
+        then rather than on every call.
+        """
+        self.completed += count
+
+        if self.saved_at is None or time.time() - self.saved_at >= self.save_interval:
+            self.save()
+
+    def finish(self, status_code, result=None, errors=None):
+        """
+        Records the outcome of the write. Any ``errors`` mean it failed (&
+        that nothing was written).
+        """
+        self.status_code = status_code
+        self.result = result
+        self.errors = errors or []
+        self.state = self.FAILED if self.errors else self.SUCCEEDED
+        self.finished = now()
+        self.save()
+
+    def is_visible_to(self, request):
+        """
+        Jobs started by an authenticated user are only shown to that user.
+        """
+        if self.owner is None:
+            return True
+
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_authenticated() and user.pk == self.owner
+
+
+class JobResource(Resource):
+    """
+    Reports on asynchronous writes.
+
+    Register it with your ``Api`` so the ``Location`` returned for an
+    asynchronous write can be polled.
+    """
+    id = fields.CharField(attribute='id', readonly=True)
+    resource = fields.CharField(attribute='resource_name', readonly=True)
+    method = fields.CharField(attribute='method', readonly=True)
+    state = fields.CharField(attribute='state', readonly=True)
+    total = fields.IntegerField(attribute='total', readonly=True)
+    completed = fields.IntegerField(attribute='completed', readonly=True)
+    errors = fields.ListField(attribute='errors', readonly=True)
+    status_code = fields.IntegerField(attribute='status_code', null=True, readonly=True)
+    result = fields.ApiField(attribute='result', null=True, readonly=True)
+    created = fields.DateTimeField(attribute='created', readonly=True)
+    finished = fields.DateTimeField(attribute='finished', null=True, readonly=True)
+
+    class Meta:
+        resource_name = 'jobs'
+        object_class = Job
+        detail_uri_name = 'id'
+        list_allowed_methods = []
+        detail_allowed_methods = ['get']
+        authorization = ReadOnlyAuthorization()
+
+    def detail_uri_kwargs(self, bundle_or_obj):
+        obj = getattr(bundle_or_obj, 'obj', bundle_or_obj)
+        return {'id': obj.id}
+
+    def obj_get(self, bundle, **kwargs):
+        job = Job.load(kwargs.get('id'))
+
+        if job is None or not job.is_visible_to(bundle.request):
+            raise NotFound("No job matches the provided id.")
+
+        return job
+
+
+class BaseJobQueue(object):
+    """
+    A simplified, swappable base class for running asynchronous writes.
+
+    Runs each job right away, within the request, which makes it suitable for
+    testing.
+    """
+    resource_class = JobResource
+
+    def __init__(self, expiration=86400):
+        self.expiration = expiration
+
+    def create_job(self, resource_name, method, total=0, owner=None):
+        return Job(resource_name, method, total=total, owner=owner, expiration=self.expiration)
+
+    def get_job_uri(self, job, api_name=None):
+        return self.resource_class(api_name=api_name).get_resource_uri(job)
+
+    def enqueue(self, job, func):
+        """
+        Saves the ``job`` & schedules ``func`` (which takes no arguments) to
+        carry it out.
+        """
+        job.save()
+        func()
+
+
+class ThreadedJobQueue(BaseJobQueue):
+    """
+    Runs jobs on a pool of background threads within the web process, so no
+    other services are needed.
+
+    Queued jobs are lost if the process exits.
+    """
+    def __init__(self, workers=2, expiration=86400):
+        super(ThreadedJobQueue, self).__init__(expiration=expiration)
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start_workers(self):
+        """
+        Starts any missing worker threads. They don't survive a ``fork``, so
+        this is checked on every ``enqueue``.
+        """
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self.work)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, job, func):
+        job.save()
+        self.start_workers()
+        self._queue.put(func)
+
+    def work(self):
+        while True:
+            func = self._queue.get()
+
+            try:
+                func()
+            finally:
+                # Each thread has its own database connections.
+                for connection in connections.all():
+                    connection.close()
+
+                self._queue.task_done()
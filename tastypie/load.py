@@ -0,0 +1,583 @@
+from __future__ import unicode_literals
+from __future__ import division
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.http import HttpResponse
+from django.test.client import RequestFactory
+from django.utils import six
+
+from tastypie.test import TestApiClient
+from tastypie.timing import monotonic
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+# The upper bounds (in milliseconds) of the buckets in the latency histograms.
+HISTOGRAM_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class ScenarioStep(object):
+    """
+    One kind of request in a ``Scenario``.
+
+    Strings in the ``data`` can include ``{n}``, which is replaced by a
+    number unique to each request (handy for slugs & the like). ``repeat``
+    maps keys of the ``data`` holding lists to how many items they should be
+    grown to, for sending payloads of different sizes. The items are copied
+    from the ones given & ``{i}`` in them is replaced by each item's index.
+
+    A response counts as an error if its status code isn't in ``expect``
+    (any status code below 400, by default).
+    """
+    METHODS = ('get', 'post', 'put', 'patch', 'delete')
+
+    def __init__(self, uri, method='get', name=None, data=None, weight=1, repeat=None, expect=None, format=None, authentication=None):
+        self.uri = uri
+        self.method = method.lower()
+        self.name = name or '%s %s' % (self.method.upper(), uri)
+        self.data = data
+        self.weight = weight
+        self.repeat = repeat or {}
+        self.expect = expect
+        self.format = format
+        self.authentication = authentication
+
+        if not self.method in self.METHODS:
+            raise ImproperlyConfigured("The step '%s' has an unknown method '%s'. Choose from: %s." % (self.name, method, ', '.join(self.METHODS)))
+
+        if self.weight <= 0:
+            raise ImproperlyConfigured("The step '%s' needs a 'weight' greater than 0." % self.name)
+
+        for key in self.repeat:
+            if not isinstance(self.data, dict) or not isinstance(self.data.get(key), list) or not self.data[key]:
+                raise ImproperlyConfigured("The step '%s' repeats '%s', which isn't a non-empty list in its 'data'." % (self.name, key))
+
+    def is_error(self, status_code):
+        if self.expect is not None:
+            return not status_code in self.expect
+
+        return status_code >= 400
+
+    def build_data(self, n):
+        """
+        Returns the ``data`` to send with the ``n``-th request.
+        """
+        if self.data is None:
+            return None
+
+        data = self.data
+
+        if self.repeat:
+            data = dict(data)
+
+            for key, count in self.repeat.items():
+                items = data[key]
+                data[key] = [substitute(items[i % len(items)], '{i}', i) for i in range(count)]
+
+        return substitute(data, '{n}', n)
+
+
+def substitute(value, placeholder, number):
+    """
+    Replaces ``placeholder`` with ``number`` in every string within
+    ``value`` (a structure of dictionaries, lists & scalars).
+    """
+    if isinstance(value, six.string_types):
+        return value.replace(placeholder, six.text_type(number))
+
+    if isinstance(value, dict):
+        return dict([(key, substitute(item, placeholder, number)) for key, item in value.items()])
+
+    if isinstance(value, list):
+        return [substitute(item, placeholder, number) for item in value]
+
+    return value
+
+
+class Scenario(object):
+    """
+    What to send: a weighted mix of ``ScenarioStep`` instances, how many
+    ``requests`` to make in all & how (``concurrency`` workers, each a
+    ``thread`` or a ``process``, with either the ``test`` client or the
+    ``wsgi`` handler).
+    """
+    MODES = ('thread', 'process')
+    CLIENTS = ('test', 'wsgi')
+
+    def __init__(self, steps, requests=100, concurrency=1, mode='thread', client='test', format='json', seed=None, fixtures=None, authentication=None):
+        self.steps = steps
+        self.requests = requests
+        self.concurrency = concurrency
+        self.mode = mode
+        self.client = client
+        self.format = format
+        self.seed = seed
+        self.fixtures = fixtures or []
+        self.authentication = authentication
+
+    def validate(self):
+        if not self.steps:
+            raise ImproperlyConfigured("A scenario needs at least one step.")
+
+        if self.requests < 1 or self.concurrency < 1:
+            raise ImproperlyConfigured("A scenario needs at least one request & one worker.")
+
+        if not self.mode in self.MODES:
+            raise ImproperlyConfigured("Unknown mode '%s'. Choose from: %s." % (self.mode, ', '.join(self.MODES)))
+
+        if not self.client in self.CLIENTS:
+            raise ImproperlyConfigured("Unknown client '%s'. Choose from: %s." % (self.client, ', '.join(self.CLIENTS)))
+
+    @classmethod
+    def from_dict(cls, config):
+        config = dict(config)
+
+        try:
+            steps = [ScenarioStep(**step) for step in config.pop('steps', [])]
+            return cls(steps, **config)
+        except TypeError as e:
+            raise ImproperlyConfigured("Invalid scenario: %s" % e)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Loads a scenario from a JSON file (or a YAML one, if PyYAML is
+        installed & the name ends in ``.yaml`` or ``.yml``).
+        """
+        with open(path) as scenario_file:
+            if path.endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    raise ImproperlyConfigured("Usage of YAML scenarios requires yaml.")
+
+                config = yaml.safe_load(scenario_file)
+            else:
+                config = json.load(scenario_file)
+
+        return cls.from_dict(config)
+
+
+class WSGIClient(RequestFactory):
+    """
+    Makes requests through Django's ``WSGIHandler``, the same way a WSGI
+    server would, rather than through the test client's handler.
+
+    Responses are rebuilt from the status, headers & body the handler sends
+    back.
+    """
+    def __init__(self, **defaults):
+        super(WSGIClient, self).__init__(**defaults)
+        self.handler = WSGIHandler()
+
+    def request(self, **request):
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started.append((status, headers))
+
+        body = self.handler(self._base_environ(**request), start_response)
+
+        try:
+            content = b''.join(body)
+        finally:
+            # Sends ``request_finished``, as servers do.
+            if hasattr(body, 'close'):
+                body.close()
+
+        status, headers = started[0]
+        response = HttpResponse(content, status=int(status.split(' ', 1)[0]))
+
+        for header, value in headers:
+            response[header] = value
+
+        return response
+
+
+class CountingCursor(object):
+    """
+    Counts the queries run through a cursor towards the current thread.
+    """
+    def __init__(self, cursor, counter):
+        self.cursor = cursor
+        self.counter = counter
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.cursor.__exit__(exc_type, exc_value, traceback)
+
+    def execute(self, sql, params=None):
+        self.counter.increment()
+        return self.cursor.execute(sql, params)
+
+    def executemany(self, sql, param_list):
+        self.counter.increment()
+        return self.cursor.executemany(sql, param_list)
+
+
+class QueryCounter(object):
+    """
+    Counts the queries each thread runs, even over a connection that's
+    shared between threads & whether or not ``DEBUG`` is on.
+    """
+    def __init__(self):
+        self._local = threading.local()
+
+    def install(self, connection):
+        if getattr(connection, '_tastypie_query_counter', None) is self:
+            return
+
+        cursor = connection.cursor
+        connection.cursor = lambda: CountingCursor(cursor(), self)
+        connection._tastypie_query_counter = self
+
+    def uninstall(self, connection):
+        if getattr(connection, '_tastypie_query_counter', None) is self:
+            del(connection.cursor)
+            del(connection._tastypie_query_counter)
+
+    def increment(self):
+        self._local.count = self.count() + 1
+
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at ``fraction`` of the way through the sorted
+    ``values`` (the nearest-rank method).
+    """
+    if not values:
+        return 0
+
+    index = max(int(math.ceil(fraction * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+class LoadReport(object):
+    """
+    The outcome of a run: every sample (a ``(step name, status code,
+    seconds, queries, error)`` tuple) & how long the run took.
+    """
+    def __init__(self, samples, duration, concurrency=1, mode='thread'):
+        self.samples = samples
+        self.duration = duration
+        self.concurrency = concurrency
+        self.mode = mode
+
+    def summarize(self, samples):
+        latencies = sorted([seconds * 1000 for name, status, seconds, queries, error in samples])
+        errors = len([sample for sample in samples if sample[4] is not None])
+        statuses = {}
+        histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+        for name, status, seconds, queries, error in samples:
+            status = six.text_type(status)
+            statuses[status] = statuses.get(status, 0) + 1
+
+        for latency in latencies:
+            bucket = 0
+
+            while bucket < len(HISTOGRAM_BUCKETS) and latency > HISTOGRAM_BUCKETS[bucket]:
+                bucket += 1
+
+            histogram[bucket] += 1
+
+        queries = sum([sample[3] for sample in samples])
+
+        return {
+            'requests': len(samples),
+            'errors': errors,
+            'error_rate': errors / len(samples) if samples else 0,
+            'statuses': statuses,
+            'throughput': len(samples) / self.duration if self.duration else 0,
+            'mean': sum(latencies) / len(latencies) if latencies else 0,
+            'p50': percentile(latencies, 0.5),
+            'p90': percentile(latencies, 0.9),
+            'p99': percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else 0,
+            'histogram': histogram,
+            'queries': queries,
+            'queries_per_request': queries / len(samples) if samples else 0,
+        }
+
+    def summary(self):
+        """
+        Returns the summary of ``all`` the requests & of each ``steps``, with
+        latencies in milliseconds. The ``histogram`` counts the requests in
+        each of the ``HISTOGRAM_BUCKETS``, plus those slower than the last.
+        """
+        steps = {}
+
+        for sample in self.samples:
+            steps.setdefault(sample[0], []).append(sample)
+
+        return {
+            'duration': self.duration,
+            'concurrency': self.concurrency,
+            'mode': self.mode,
+            'all': self.summarize(self.samples),
+            'steps': dict([(name, self.summarize(samples)) for name, samples in steps.items()]),
+            'errors': self.get_error_messages(),
+        }
+
+    def get_error_messages(self, limit=10):
+        """
+        Returns the most common error messages & how often they came up.
+        """
+        counts = {}
+
+        for sample in self.samples:
+            if sample[4] is not None:
+                counts[sample[4]] = counts.get(sample[4], 0) + 1
+
+        return sorted(counts.items(), key=lambda item: -item[1])[:limit]
+
+    def format(self):
+        """
+        Returns the summary as a human-readable table.
+        """
+        summary = self.summary()
+        everything = summary['all']
+        lines = [
+            "%d %s workers, %d requests in %.2fs (%.1f requests/sec)" % (self.concurrency, self.mode, everything['requests'], self.duration, everything['throughput']),
+            "",
+            "%-30s %8s %7s %9s %9s %9s %9s %9s" % ('step', 'requests', 'errors', 'req/sec', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'queries'),
+        ]
+
+        for name, stats in sorted(summary['steps'].items()) + [('all', everything)]:
+            lines.append("%-30s %8d %6.1f%% %9.1f %9.2f %9.2f %9.2f %9d" % (name[:30], stats['requests'], stats['error_rate'] * 100, stats['throughput'], stats['p50'], stats['p90'], stats['p99'], stats['queries']))
+
+        lines.extend(["", "Status codes: %s" % ', '.join(['%s x %d' % (status, count) for status, count in sorted(everything['statuses'].items())])])
+        lines.extend(["", "Latency histogram (all):"])
+        labels = ['<= %dms' % bound for bound in HISTOGRAM_BUCKETS] + ['> %dms' % HISTOGRAM_BUCKETS[-1]]
+        widest = max(everything['histogram'] + [1])
+
+        for label, count in zip(labels, everything['histogram']):
+            lines.append("%10s %7d %s" % (label, count, '#' * int(math.ceil(40 * count / widest))))
+
+        if summary['errors']:
+            lines.extend(["", "Errors:"])
+
+            for message, count in summary['errors']:
+                lines.append("%7d x %s" % (count, message))
+
+        return '\n'.join(lines) + '\n'
+
+
+# The runner being used by worker processes, which inherit it when forked.
+_process_runner = None
+
+
+def _work_in_process(args):
+    return _process_runner.work(*args)
+
+
+class LoadRunner(object):
+    """
+    Drives the resources in-process, following a ``Scenario`` from a pool of
+    threads or processes, & reports on how it went.
+
+    Worker threads each get their own database connections, except for
+    in-memory SQLite databases, which can't be shared any other way. Those
+    connections are shared &, as they can't be used by two threads at once,
+    requests are made one at a time. Use a file-backed test database to see
+    real contention.
+
+    Worker processes are forked, so they're only available where ``fork``
+    is. They each get a copy of an in-memory database & of the local-memory
+    cache, so use a file-backed database & a shared cache to have them
+    contend.
+    """
+    def __init__(self, scenario):
+        scenario.validate()
+        self.scenario = scenario
+        self.counter = QueryCounter()
+        self.weights = self.accumulate([step.weight for step in scenario.steps])
+        self._lock = None
+        self._shared = {}
+
+    def accumulate(self, weights):
+        """
+        Returns the running totals of the ``weights``.
+        """
+        totals = []
+
+        for weight in weights:
+            totals.append(weight + (totals[-1] if totals else 0))
+
+        return totals
+
+    def get_client(self):
+        client = TestApiClient()
+
+        if self.scenario.client == 'wsgi':
+            client.client = WSGIClient()
+
+        return client
+
+    def choose(self, rng):
+        """
+        Picks a step at random, by weight.
+        """
+        point = rng.random() * self.weights[-1]
+
+        for step, total in zip(self.scenario.steps, self.weights):
+            if point < total:
+                return step
+
+        return self.scenario.steps[-1]
+
+    def request(self, client, step, n):
+        """
+        Makes a single request, returning its sample.
+        """
+        queries = self.counter.count()
+        started = monotonic()
+        status = None
+        error = None
+
+        try:
+            response = getattr(client, step.method)(step.uri, format=step.format or self.scenario.format, data=step.build_data(n), authentication=step.authentication or self.scenario.authentication)
+            status = response.status_code
+
+            if step.is_error(status):
+                error = "%s returned %d" % (step.name, status)
+        except Exception as e:
+            error = "%s raised %s: %s" % (step.name, type(e).__name__, e)
+
+        return (step.name, status, monotonic() - started, self.counter.count() - queries, error)
+
+    def work(self, index, count):
+        """
+        Makes ``count`` requests as the ``index``-th worker, returning their
+        samples.
+        """
+        for alias, connection in self._shared.items():
+            connections[alias] = connection
+
+        for connection in connections.all():
+            self.counter.install(connection)
+
+        seed = self.scenario.seed
+        rng = random.Random(seed + index if seed is not None else None)
+        client = self.get_client()
+        samples = []
+
+        try:
+            for i in range(count):
+                step = self.choose(rng)
+                # Unique across all the workers.
+                n = i * self.scenario.concurrency + index
+
+                if self._lock is not None:
+                    with self._lock:
+                        samples.append(self.request(client, step, n))
+                else:
+                    samples.append(self.request(client, step, n))
+        finally:
+            for connection in connections.all():
+                if not connection.alias in self._shared:
+                    self.counter.uninstall(connection)
+                    connection.close()
+
+        return samples
+
+    def get_counts(self):
+        """
+        Splits the requests between the workers.
+        """
+        requests, concurrency = self.scenario.requests, self.scenario.concurrency
+        return [requests // concurrency + (1 if index < requests % concurrency else 0) for index in range(concurrency)]
+
+    def is_in_memory(self, connection):
+        return connection.vendor == 'sqlite' and connection.settings_dict['NAME'] in ('', ':memory:')
+
+    def run(self):
+        if self.scenario.mode == 'process':
+            samples, duration = self.run_processes()
+        else:
+            samples, duration = self.run_threads()
+
+        return LoadReport(samples, duration, concurrency=self.scenario.concurrency, mode=self.scenario.mode)
+
+    def run_threads(self):
+        self._shared = {}
+
+        for connection in connections.all():
+            if self.is_in_memory(connection):
+                connection.allow_thread_sharing = True
+                self._shared[connection.alias] = connection
+
+        self._lock = threading.Lock() if self._shared else None
+        results = {}
+
+        def work(index, count):
+            results[index] = self.work(index, count)
+
+        threads = [threading.Thread(target=work, args=(index, count)) for index, count in enumerate(self.get_counts())]
+        started = monotonic()
+
+        try:
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+        finally:
+            for connection in self._shared.values():
+                connection.allow_thread_sharing = False
+                self.counter.uninstall(connection)
+
+            self._shared = {}
+
+        duration = monotonic() - started
+        return list(itertools.chain(*[results.get(index, []) for index in range(len(threads))])), duration
+
+    def run_processes(self):
+        global _process_runner
+
+        if not hasattr(os, 'fork'):
+            raise ImproperlyConfigured("The 'process' mode requires 'fork'.")
+
+        # Forked children can't share open connections, except in-memory
+        # ones, which they each get a copy of.
+        for connection in connections.all():
+            if not self.is_in_memory(connection):
+                connection.close()
+
+        _process_runner = self
+        # The workers inherit the settings & the test database, so they must
+        # be forked rather than spawned.
+        context = multiprocessing.get_context('fork') if hasattr(multiprocessing, 'get_context') else multiprocessing
+        pool = context.Pool(processes=self.scenario.concurrency)
+        started = monotonic()
+
+        try:
+            results = pool.map(_work_in_process, list(enumerate(self.get_counts())))
+        finally:
+            pool.close()
+            pool.join()
+            _process_runner = None
+
+        duration = monotonic() - started
+        return list(itertools.chain(*results)), duration
@@ -0,0 +1,64 @@
+from __future__ import unicode_literals
+from optparse import make_option
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import get_runner, setup_test_environment, teardown_test_environment
+
+from tastypie.load import Scenario, LoadRunner
+
+
+class Command(BaseCommand):
+    help = "Runs a load scenario against a fresh test database, reporting throughput, latency, errors & queries."
+    args = '<scenario file>'
+    option_list = BaseCommand.option_list + (
+        make_option('--requests', type='int', dest='requests', default=None,
+            help="Overrides the scenario's number of requests."),
+        make_option('--concurrency', type='int', dest='concurrency', default=None,
+            help="Overrides the scenario's number of workers."),
+        make_option('--mode', choices=Scenario.MODES, dest='mode', default=None,
+            help="Overrides whether the workers are threads or processes."),
+        make_option('--client', choices=Scenario.CLIENTS, dest='client', default=None,
+            help="Overrides whether requests go through the test client or the WSGI handler."),
+        make_option('--seed', type='int', dest='seed', default=None,
+            help="Overrides the seed used to pick steps."),
+        make_option('--output', dest='output', default=None,
+            help="Also writes the summary, as JSON, to this file."),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("Please provide a single scenario file.")
+
+        try:
+            scenario = Scenario.from_file(args[0])
+
+            for name in ('requests', 'concurrency', 'mode', 'client', 'seed'):
+                if options.get(name) is not None:
+                    setattr(scenario, name, options[name])
+
+            scenario.validate()
+        except (IOError, ValueError, ImproperlyConfigured) as e:
+            raise CommandError("Couldn't load the scenario: %s" % e)
+
+        setup_test_environment()
+        runner = get_runner(settings)(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+
+        try:
+            if scenario.fixtures:
+                call_command('loaddata', *scenario.fixtures, verbosity=0)
+
+            report = LoadRunner(scenario).run()
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        self.stdout.write(report.format())
+
+        if options.get('output'):
+            with open(options['output'], 'w') as output:
+                json.dump(report.summary(), output, indent=2, sort_keys=True)
@@ -1,26 +1,32 @@
 from __future__ import unicode_literals
 from __future__ import with_statement
 from copy import deepcopy
+from functools import partial
 import logging
+import re
 import warnings
 
 from django.conf import settings
 from django.conf.urls import patterns, url
-from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned, ValidationError
-from django.core.urlresolvers import NoReverseMatch, reverse, resolve, Resolver404, get_script_prefix
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist, MultipleObjectsReturned, ValidationError
+from django.core.urlresolvers import NoReverseMatch, reverse, resolve, Resolver404, get_script_prefix, get_urlconf
 from django.core.signals import got_request_exception
-from django.db import transaction
+from django.db import connections, transaction, DatabaseError
+from django.db.models import AutoField, Model
 from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields import FieldDoesNotExist
 from django.db.models.sql.constants import QUERY_TERMS
 from django.http import HttpResponse, HttpResponseNotFound, Http404
 from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.encoding import force_text
 from django.utils.html import escape
 from django.utils import six
 
-from tastypie.authentication import Authentication
+from tastypie.authentication import Authentication, AuthenticationContext
 from tastypie.authorization import ReadOnlyAuthorization
 from tastypie.bundle import Bundle
 from tastypie.cache import NoCache
+from tastypie.compat import atomic
 from tastypie.constants import ALL, ALL_WITH_RELATIONS
 from tastypie.exceptions import NotFound, BadRequest, InvalidFilterError, HydrationError, InvalidSortError, ImmediateHttpResponse, Unauthorized
 from tastypie import fields
@@ -28,8 +34,10 @@ from tastypie import http
 from tastypie.paginator import Paginator
 from tastypie.serializers import Serializer
 from tastypie.throttle import BaseThrottle
-from tastypie.utils import is_valid_jsonp_callback_value, dict_strip_unicode_keys, trailing_slash
+from tastypie.timing import NoTiming, NULL_PHASE
+from tastypie.utils import is_valid_jsonp_callback_value, dict_strip_unicode_keys, trailing_slash, LRUCache, cached_response
 from tastypie.utils.mime import determine_format, build_content_type
+from tastypie.utils.threads import ThreadState
 from tastypie.validation import Validation
 
 # If ``csrf_exempt`` isn't present, stub it.
@@ -46,6 +54,63 @@ def sanitize(text):
     return escape(text).replace('&#39;', "'").replace('&quot;', '"')
 
 
+# The lookup kwargs of recently resolved detail URIs, each resource class's
+# URL patterns, the templates its URIs are built from & the patterns their
+# values have to match, shared by all instances.
+RESOLVED_URIS = LRUCache(getattr(settings, 'TASTYPIE_URI_CACHE_SIZE', 1000))
+URI_RESOLVERS = {}
+URI_TEMPLATES = {}
+URI_VALUE_PATTERNS = {}
+
+# Stands in for the detail value when reversing a URI template. Only made of
+# characters ``reverse()`` leaves alone.
+URI_PLACEHOLDER = 'tastypie-uri-placeholder'
+
+# Values made only of these come out of ``reverse()`` unchanged on every
+# supported version of Django, so they can be put in a template as they are.
+URI_SAFE_VALUE = re.compile(r'^[A-Za-z0-9_.-]+\Z')
+
+
+def get_group_pattern(regex, name):
+    """
+    Returns the pattern captured by the ``name`` group of ``regex``, or
+    ``None`` if there's no such group.
+    """
+    start = regex.find('(?P<%s>' % name)
+
+    if start == -1:
+        return None
+
+    start += len('(?P<%s>' % name)
+    depth = 1
+    in_class = False
+    position = start
+
+    while position < len(regex):
+        char = regex[position]
+
+        if char == '\\':
+            position += 2
+            continue
+
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+
+            if depth == 0:
+                return regex[start:position]
+
+        position += 1
+
+    return None
+
+
 class NOT_AVAILABLE:
     def __str__(self):
         return 'No such data is available.'
@@ -63,6 +128,7 @@ class ResourceOptions(object):
     authorization = ReadOnlyAuthorization()
     cache = NoCache()
     throttle = BaseThrottle()
+    timing = NoTiming()
     validation = Validation()
     paginator_class = Paginator
     allowed_methods = ['get', 'post', 'put', 'delete', 'patch']
@@ -85,6 +151,14 @@ class ResourceOptions(object):
     always_return_data = False
     collection_name = 'objects'
     detail_uri_name = 'pk'
+    bulk_create = False
+    bulk_create_batch_size = 1000
+    put_list_upsert = False
+    upsert_fields = None
+    clear_m2m_on_save = False
+    job_queue = None
+    commit_chunk_size = None
+    field_constraints = None
 
     def __new__(cls, meta=None):
         overrides = {}
@@ -176,6 +250,7 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
     """
     def __init__(self, api_name=None):
         self.fields = deepcopy(self.base_fields)
+        self._schema_responses = {}
 
         if not api_name is None:
             self._meta.api_name = api_name
@@ -247,7 +322,36 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
                 # error message.
                 return self._handle_500(request, e)
 
-        return wrapper
+        # Checked up front, so untimed resources pay nothing for it.
+        if not self._meta.timing.enabled:
+            return wrapper
+
+        @csrf_exempt
+        def timed_wrapper(request, *args, **kwargs):
+            timer = self._meta.timing.start(request)
+
+            try:
+                response = wrapper(request, *args, **kwargs)
+            except Exception:
+                timer.stop()
+                raise
+
+            self._meta.timing.finish(self, request, response)
+            return response
+
+        return timed_wrapper
+
+    def time_phase(self, request, name):
+        """
+        Returns a context manager that times the ``name`` phase of the
+        request, if ``Meta.timing`` is timing it (otherwise it does nothing).
+        """
+        timer = getattr(request, '_tastypie_timer', None)
+
+        if timer is None:
+            return NULL_PHASE
+
+        return timer.phase(name)
 
     def _handle_500(self, request, exception):
         import traceback
@@ -456,12 +560,19 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         if method is None:
             raise ImmediateHttpResponse(response=http.HttpNotImplemented())
 
-        self.is_authenticated(request)
-        self.throttle_check(request)
+        with self.time_phase(request, 'authentication'):
+            self.is_authenticated(request)
+
+        with self.time_phase(request, 'throttle'):
+            self.throttle_check(request)
 
         # All clear. Process the request.
         request = convert_post_to_put(request)
-        response = method(request, **kwargs)
+
+        if self.is_async_request(request_type, request_method, request):
+            response = self.enqueue_job(request, method, **kwargs)
+        else:
+            response = method(request, **kwargs)
 
         # Add the throttled request.
         self.log_throttled_access(request)
@@ -470,10 +581,99 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         # request was accepted and that some action occurred. This also
         # prevents Django from freaking out.
         if not isinstance(response, HttpResponse):
-            return http.HttpNoContent()
+            response = http.HttpNoContent()
+
+        return self.add_throttle_headers(request, response)
+
+    def is_async_request(self, request_type, request_method, request):
+        """
+        Whether the request should be carried out as a background job, which
+        is the case for ``PUT`` & ``PATCH`` to a list resource with a
+        ``Meta.job_queue`` when the client sends ``Prefer: respond-async``.
+        """
+        if self._meta.job_queue is None or request_type != 'list' or not request_method in ('put', 'patch'):
+            return False
+
+        preferences = request.META.get('HTTP_PREFER', '').replace(';', ',').split(',')
+        return 'respond-async' in [preference.strip().lower() for preference in preferences]
+
+    def enqueue_job(self, request, method, **kwargs):
+        """
+        Checks the envelope of the data sent, then hands the write over to
+        ``Meta.job_queue``.
+
+        Returns ``HttpAccepted`` (202 Accepted), with a ``Location`` where
+        the job's progress can be followed.
+        """
+        deserialized = self.deserialize(request, request.body, format=request.META.get('CONTENT_TYPE', 'application/json'))
+
+        if not hasattr(deserialized, 'get') or not isinstance(deserialized.get(self._meta.collection_name), list):
+            raise BadRequest("Invalid data sent: missing '%s'" % self._meta.collection_name)
+
+        user = getattr(request, 'user', None)
+        owner = user.pk if user is not None and user.is_authenticated() else None
+        job_queue = self._meta.job_queue
+        job = job_queue.create_job(self._meta.resource_name, request.method.lower(), total=len(deserialized[self._meta.collection_name]), owner=owner)
+        request._job = job
+        # The job may run on another thread, which wouldn't have the script
+        # prefix, URLconf, language or time zone of this request.
+        thread_state = ThreadState()
+
+        def run():
+            with thread_state:
+                self.run_job(job, request, method, **kwargs)
 
+        job_queue.enqueue(job, run)
+
+        location = job_queue.get_job_uri(job, api_name=self._meta.api_name)
+        response = self.create_response(request, {'id': job.id, 'state': job.state, 'resource_uri': location}, response_class=http.HttpAccepted)
+        response['Location'] = location
+        response['Preference-Applied'] = 'respond-async'
         return response
 
+    def run_job(self, job, request, method, **kwargs):
+        """
+        Carries out a write queued by ``enqueue_job``, recording the outcome
+        on the ``job``.
+
+        The write stays all-or-nothing, so errors are reported against the
+        item being processed when it failed.
+        """
+        job.start()
+
+        try:
+            response = method(request, **kwargs)
+        except ImmediateHttpResponse as e:
+            response = e.response
+        except (BadRequest, fields.ApiFieldError) as e:
+            job.finish(400, errors=[{'index': job.completed, 'error': sanitize(e.args[0]) if getattr(e, 'args') else ''}])
+            return
+        except ValidationError as e:
+            job.finish(400, errors=[{'index': job.completed, 'error': sanitize(e.messages)}])
+            return
+        except Exception as e:
+            log = logging.getLogger('django.request.tastypie')
+            log.error('Asynchronous job %s failed: %s' % (job.id, request.path), exc_info=True, extra={'request': request})
+            job.finish(500, errors=[{'index': job.completed, 'error_message': six.text_type(e)}])
+            return
+
+        result = self.get_response_data(request, response)
+
+        if response.status_code >= 400:
+            job.finish(response.status_code, errors=[{'index': job.completed, 'error': result}])
+        else:
+            job.finish(response.status_code, result=result)
+
+    def report_progress(self, request, count=1):
+        """
+        Lets the job running this request, if any, know that ``count`` more
+        items have been written.
+        """
+        job = getattr(request, '_job', None)
+
+        if job is not None:
+            job.advance(count)
+
     def remove_api_resource_names(self, url_dict):
         """
         Given a dictionary of regex matches from a URLconf, removes
@@ -538,6 +738,13 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         Mostly a hook, this uses class assigned to ``authentication`` from
         ``Resource._meta``.
         """
+        batch = getattr(request, '_tastypie_batch', None)
+
+        # Sub-requests of a batch may reuse an earlier authentication.
+        if batch is not None and batch.restore(self._meta.authentication, request):
+            request._authentication_context = AuthenticationContext(self._meta.authentication, request)
+            return
+
         # Authenticate the request as needed.
         auth_result = self._meta.authentication.is_authenticated(request)
 
@@ -547,6 +754,28 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         if not auth_result is True:
             raise ImmediateHttpResponse(response=http.HttpUnauthorized())
 
+        if batch is not None:
+            batch.remember(self._meta.authentication, request)
+
+        # Start from a clean slate, since the user may have just changed.
+        request._authentication_context = AuthenticationContext(self._meta.authentication, request)
+
+    def get_authentication_context(self, request):
+        """
+        Returns the ``AuthenticationContext`` for the request, which carries
+        the winning authentication backend, the user & the identifier.
+
+        The context is built once per request & reused by throttling and
+        access logging.
+        """
+        context = getattr(request, '_authentication_context', None)
+
+        if context is None or context.authentication is not self._meta.authentication:
+            context = AuthenticationContext(self._meta.authentication, request)
+            request._authentication_context = context
+
+        return context
+
     def throttle_check(self, request):
         """
         Handles checking if the user should be throttled.
@@ -554,12 +783,34 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         Mostly a hook, this uses class assigned to ``throttle`` from
         ``Resource._meta``.
         """
-        identifier = self._meta.authentication.get_identifier(request)
+        identifier = self.get_authentication_context(request).identifier
 
         # Check to see if they should be throttled.
-        if self._meta.throttle.should_be_throttled(identifier):
+        status = self._meta.throttle.check(identifier)
+        request._throttle_status = status
+
+        if status.throttled:
             # Throttle limit exceeded.
-            raise ImmediateHttpResponse(response=http.HttpTooManyRequests())
+            response = http.HttpTooManyRequests()
+            self.add_throttle_headers(request, response)
+            raise ImmediateHttpResponse(response=response)
+
+    def add_throttle_headers(self, request, response):
+        """
+        Adds the ``X-RateLimit-*`` (and, when throttled, ``Retry-After``)
+        headers reported by the throttle's last check on this request.
+
+        Throttles that don't track quotas add nothing.
+        """
+        status = getattr(request, '_throttle_status', None)
+
+        if status is None:
+            return response
+
+        for header, value in status.headers():
+            response[header] = value
+
+        return response
 
     def log_throttled_access(self, request):
         """
@@ -569,7 +820,18 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         ``Resource._meta``.
         """
         request_method = request.method.lower()
-        self._meta.throttle.accessed(self._meta.authentication.get_identifier(request), url=request.get_full_path(), request_method=request_method)
+        identifier = self.get_authentication_context(request).identifier
+        kwargs = {
+            'url': request.get_full_path(),
+            'request_method': request_method,
+        }
+        status = getattr(request, '_throttle_status', None)
+
+        if status is not None and status.state is not None:
+            # Lets the throttle skip re-reading what it read in ``check``.
+            kwargs['status'] = status
+
+        self._meta.throttle.accessed(identifier, **kwargs)
 
     def unauthorized_result(self, exception):
         raise ImmediateHttpResponse(response=http.HttpUnauthorized())
@@ -600,6 +862,21 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
 
         return auth_result
 
+    def authorized_read_detail_lookup(self, object_list, bundle):
+        """
+        Lets the authorization narrow down the lookup for a single object,
+        so row-level checks happen within the same query.
+        """
+        lookup = getattr(self._meta.authorization, 'read_detail_lookup', None)
+
+        if lookup is None:
+            return object_list
+
+        try:
+            return lookup(object_list, bundle)
+        except Unauthorized as e:
+            self.unauthorized_result(e)
+
     def authorized_create_list(self, object_list, bundle):
         """
         Handles checking of permissions to see if the user has authorization
@@ -782,10 +1059,116 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
             url_name = 'api_dispatch_detail'
 
         try:
-            return self._build_reverse_url(url_name, kwargs=self.resource_uri_kwargs(bundle_or_obj))
+            return self.build_resource_uri(url_name, self.resource_uri_kwargs(bundle_or_obj))
         except NoReverseMatch:
             return ''
 
+    def build_resource_uri(self, url_name, kwargs):
+        """
+        Builds the URI for ``url_name`` from its template (see
+        ``get_uri_template``), falling back to ``_build_reverse_url`` when
+        there's no template to use, or when the value needs quoting or doesn't
+        match the pattern it's captured by (see ``get_uri_value_pattern``).
+
+        Raises ``NoReverseMatch`` if the URI can't be built.
+        """
+        variable = [key for key in kwargs if not key in ('resource_name', 'api_name')]
+
+        if len(variable) > 1:
+            return self._build_reverse_url(url_name, kwargs=kwargs)
+
+        value = force_text(kwargs[variable[0]]) if variable else ''
+
+        template = self.get_uri_template(url_name, kwargs, variable[0] if variable else None)
+
+        if template is None:
+            return self._build_reverse_url(url_name, kwargs=kwargs)
+
+        if not variable:
+            return template
+
+        if not URI_SAFE_VALUE.match(value):
+            return self._build_reverse_url(url_name, kwargs=kwargs)
+
+        pattern = self.get_uri_value_pattern(url_name, variable[0])
+
+        if pattern is None or not pattern.match(value):
+            return self._build_reverse_url(url_name, kwargs=kwargs)
+
+        return template % value
+
+    def get_uri_value_pattern(self, url_name, variable):
+        """
+        Returns the compiled pattern the ``variable`` kwarg of ``url_name`` is
+        captured by in ``base_urls``, or ``None`` if it can't be found.
+
+        Values that don't match it are reversed, so they raise
+        ``NoReverseMatch`` just like they would without a template.
+        """
+        cache_key = (self.__class__, url_name, variable, trailing_slash())
+
+        try:
+            return URI_VALUE_PATTERNS[cache_key]
+        except KeyError:
+            pass
+
+        pattern = None
+        group = self.get_url_group_regex(url_name, variable)
+
+        if group is not None:
+            pattern = re.compile(r'^(?:%s)\Z' % group, re.UNICODE)
+
+        URI_VALUE_PATTERNS[cache_key] = pattern
+        return pattern
+
+    def get_url_group_regex(self, url_name, variable):
+        """
+        Returns the regex the ``variable`` kwarg of ``url_name`` is captured by
+        in ``base_urls`` (i.e. ``.*?`` for the ``detail_uri_name`` of
+        ``api_dispatch_detail``), or ``None`` if it can't be found.
+        """
+        for url_pattern in self.base_urls():
+            if getattr(url_pattern, 'name', None) == url_name:
+                return get_group_pattern(url_pattern.regex.pattern, variable)
+
+        return None
+
+    def get_uri_template(self, url_name, kwargs, variable=None):
+        """
+        Returns a template for the URIs of ``url_name``, with a ``%s`` in place
+        of the ``variable`` kwarg (such as the ``detail_uri_name``), or
+        ``None`` if URIs have to be reversed one at a time.
+
+        Templates are reversed once per resource class & URLconf. Resources
+        with their own ``prepend_urls`` always use ``reverse()``, since their
+        patterns may capture the value differently.
+        """
+        static_kwargs = tuple(sorted((key, value) for key, value in kwargs.items() if key != variable))
+        cache_key = (self.__class__, url_name, get_urlconf(settings.ROOT_URLCONF), get_script_prefix(), trailing_slash(), getattr(self._meta, 'urlconf_namespace', None), static_kwargs, variable)
+
+        try:
+            return URI_TEMPLATES[cache_key]
+        except KeyError:
+            pass
+
+        template = None
+
+        if not self.prepend_urls() and not self.override_urls():
+            template_kwargs = dict(static_kwargs)
+
+            if variable is not None:
+                template_kwargs[variable] = URI_PLACEHOLDER
+
+            uri = self._build_reverse_url(url_name, kwargs=template_kwargs)
+
+            if variable is None:
+                template = uri
+            elif uri.count(URI_PLACEHOLDER) == 1:
+                template = uri.replace('%', '%%').replace(URI_PLACEHOLDER, '%s')
+
+        URI_TEMPLATES[cache_key] = template
+        return template
+
     def get_via_uri(self, uri, request=None):
         """
         This pulls apart the salient bits of the URI and populates the
@@ -796,7 +1179,49 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         If you need custom behavior based on other portions of the URI,
         simply override this method.
         """
+        kwargs = self.resolve_detail_uri(uri)
+        bundle = self.build_bundle(request=request)
+        return self.obj_get(bundle=bundle, **kwargs)
+
+    def resolve_detail_uri(self, uri):
+        """
+        Pulls apart the salient bits of the URI, returning the lookup kwargs
+        that ``get_via_uri`` passes to ``obj_get``.
+
+        Raises ``NotFound`` if the URI isn't a detail URI of this resource.
+
+        Resolved URIs are remembered (up to ``TASTYPIE_URI_CACHE_SIZE`` of
+        them), so repeated lookups skip URL resolution entirely.
+        """
         prefix = get_script_prefix()
+        cache_key = (self.__class__, prefix, trailing_slash(), uri)
+        kwargs = RESOLVED_URIS.get(cache_key)
+
+        if kwargs is None:
+            kwargs = self.remove_api_resource_names(self.match_detail_uri(uri, prefix))
+            RESOLVED_URIS.set(cache_key, kwargs)
+
+        return kwargs.copy()
+
+    def get_uri_resolvers(self):
+        """
+        Returns this resource's URL patterns, built once per class rather than
+        each time ``urls`` is accessed.
+        """
+        cache_key = (self.__class__, trailing_slash())
+        resolvers = URI_RESOLVERS.get(cache_key)
+
+        if resolvers is None:
+            resolvers = list(getattr(self, 'urls', []))
+            URI_RESOLVERS[cache_key] = resolvers
+
+        return resolvers
+
+    def match_detail_uri(self, uri, prefix):
+        """
+        Runs URL resolution for ``uri`` against *only* this resource's URL
+        patterns, returning the matched kwargs.
+        """
         chomped_uri = uri
 
         if prefix and chomped_uri.startswith(prefix):
@@ -810,7 +1235,7 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
             raise NotFound("An incorrect URL was provided '%s' for the '%s' resource." % (uri, self.__class__.__name__))
         chomped_uri = chomped_uri[found_at:]
         try:
-            for url_resolver in getattr(self, 'urls', []):
+            for url_resolver in self.get_uri_resolvers():
                 result = url_resolver.resolve(chomped_uri)
 
                 if result is not None:
@@ -821,8 +1246,49 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         except Resolver404:
             raise NotFound("The URL provided '%s' was not a link to a valid resource." % uri)
 
-        bundle = self.build_bundle(request=request)
-        return self.obj_get(bundle=bundle, **self.remove_api_resource_names(kwargs))
+        return kwargs
+
+    def get_via_uris(self, uris, request=None):
+        """
+        Looks up the objects for many URIs at once, returning a dictionary of
+        URI to object.
+
+        URIs that don't point to a single existing object are left out.
+        Errors in the URIs themselves are raised as ``get_via_uri`` would.
+
+        By default this calls ``get_via_uri`` for each URI. ``ModelResource``
+        fetches them with one query instead.
+        """
+        objects = {}
+
+        for uri in uris:
+            try:
+                objects[uri] = self.get_via_uri(uri, request=request)
+            except (ObjectDoesNotExist, MultipleObjectsReturned):
+                continue
+
+        return objects
+
+    def prefetch_related_data(self, request, data_list):
+        """
+        Looks up, ahead of hydration, the existing objects that the related
+        fields of ``data_list`` (incoming data dictionaries) refer to, either
+        by URI or by the unique keys of nested data.
+
+        What's found is kept on the request, where ``build_related_resource``
+        picks it up instead of looking up each reference on its own.
+
+        Does nothing by default. ``ModelResource`` includes a full working
+        version specific to Django's ``Models``.
+        """
+        pass
+
+    def related_prefetch_key(self, data):
+        """
+        Returns the key nested ``data`` for this resource was prefetched under
+        by ``prefetch_related_data``, or ``None`` if it can't be.
+        """
+        return None
 
     # Data preparation.
 
@@ -1146,6 +1612,46 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         """
         raise NotImplementedError()
 
+    def can_bulk_create(self):
+        """
+        Whether list writes may create their new objects in one go, through
+        ``obj_create_bulk``, rather than one ``obj_create`` at a time.
+
+        ``False`` by default. ``ModelResource`` enables it when
+        ``Meta.bulk_create = True`` & the resource can support it.
+        """
+        return False
+
+    def obj_create_bulk(self, bundles, replace_bundle=None, **kwargs):
+        """
+        Creates new objects for all the provided bundles, all-or-nothing.
+
+        If ``replace_bundle`` is provided, the existing collection is deleted
+        (as ``obj_delete_list_for_update`` does) as part of the same write.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        raise NotImplementedError()
+
+    def obj_upsert_list(self, bundles, bundle, **kwargs):
+        """
+        Makes the collection match the provided bundles, all-or-nothing,
+        updating existing objects in place rather than recreating them.
+
+        Objects are matched on ``Meta.upsert_fields``. Only those that
+        changed are saved, new ones are created & any not provided are
+        deleted.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        raise NotImplementedError()
+
     def obj_update(self, bundle, **kwargs):
         """
         Updates an existing object (or creates a new object) based on the
@@ -1191,6 +1697,16 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         """
         raise NotImplementedError()
 
+    def obj_delete_many(self, bundle, objects):
+        """
+        Deletes the provided objects.
+
+        By default this calls ``obj_delete`` for each of them.
+        ``ModelResource`` deletes them with one query instead.
+        """
+        for obj in objects:
+            self.obj_delete(bundle=self.build_bundle(obj=obj, request=bundle.request))
+
     def create_response(self, request, data, response_class=HttpResponse, **response_kwargs):
         """
         Extracts the common "which-format/serialize/return-response" cycle.
@@ -1198,8 +1714,12 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         Mostly a useful shortcut/hook.
         """
         desired_format = self.determine_format(request)
-        serialized = self.serialize(request, data, desired_format)
-        return response_class(content=serialized, content_type=build_content_type(desired_format), **response_kwargs)
+
+        with self.time_phase(request, 'serialize'):
+            serialized = self.serialize(request, data, desired_format)
+
+        with self.time_phase(request, 'response'):
+            return response_class(content=serialized, content_type=build_content_type(desired_format), **response_kwargs)
 
     def error_response(self, request, errors, response_class=None):
         """
@@ -1256,6 +1776,48 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
 
         return True
 
+    def check_deserialized_data(self, request, data, partial=False):
+        """
+        Checks the data sent for a single object (as altered by
+        ``alter_deserialized_detail_data``), before it's hydrated or anything
+        is looked up.
+
+        Mostly a hook, this uses the ``check_data`` of the class assigned to
+        ``validation`` from ``Resource._meta``. ``partial`` is ``True`` when
+        the data may only update some fields of an existing object.
+
+        If the check fails, an ``ImmediateHttpResponse`` is raised with the
+        error messages serialized inside it.
+        """
+        errors = self._meta.validation.check_data(self, data, request=request, partial=partial)
+
+        if errors:
+            raise ImmediateHttpResponse(response=self.error_response(request, {self._meta.resource_name: errors}))
+
+    def is_valid_list(self, bundles):
+        """
+        Handles checking if the data of many bundles (such as the new objects
+        of a list write) is valid, all at once.
+
+        Uses the ``is_valid_list`` of the class assigned to ``validation``,
+        which can check the whole list in fewer queries than one bundle at a
+        time.
+
+        Returns the first bundle with errors, or ``None`` if all are valid.
+        """
+        if not bundles:
+            return None
+
+        results = self._meta.validation.is_valid_list(bundles, bundles[0].request)
+        invalid_bundle = None
+
+        for bundle, errors in zip(bundles, results):
+            if errors:
+                bundle.errors[self._meta.resource_name] = errors
+                invalid_bundle = invalid_bundle or bundle
+
+        return invalid_bundle
+
     def rollback(self, bundles):
         """
         Given the list of bundles, delete all objects pertaining to those
@@ -1283,18 +1845,26 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         # TODO: Uncached for now. Invalidation that works for everyone may be
         #       impossible.
         base_bundle = self.build_bundle(request=request)
-        objects = self.obj_get_list(bundle=base_bundle, **self.remove_api_resource_names(kwargs))
-        sorted_objects = self.apply_sorting(objects, options=request.GET)
 
-        paginator = self._meta.paginator_class(request.GET, sorted_objects, resource_uri=self.get_resource_uri(), limit=self._meta.limit, max_limit=self._meta.max_limit, collection_name=self._meta.collection_name)
-        to_be_serialized = paginator.page()
+        with self.time_phase(request, 'query'):
+            objects = self.obj_get_list(bundle=base_bundle, **self.remove_api_resource_names(kwargs))
+            sorted_objects = self.apply_sorting(objects, options=request.GET)
+
+        with self.time_phase(request, 'paginate'):
+            paginator = self._meta.paginator_class(request.GET, sorted_objects, resource_uri=self.get_resource_uri(), limit=self._meta.limit, max_limit=self._meta.max_limit, collection_name=self._meta.collection_name)
+            to_be_serialized = paginator.page()
+
+        # Fetch the page here, so the query isn't counted as dehydration.
+        with self.time_phase(request, 'query'):
+            objects = list(to_be_serialized[self._meta.collection_name])
 
         # Dehydrate the bundles in preparation for serialization.
         bundles = []
 
-        for obj in to_be_serialized[self._meta.collection_name]:
-            bundle = self.build_bundle(obj=obj, request=request)
-            bundles.append(self.full_dehydrate(bundle, for_list=True))
+        with self.time_phase(request, 'dehydrate'):
+            for obj in objects:
+                bundle = self.build_bundle(obj=obj, request=request)
+                bundles.append(self.full_dehydrate(bundle, for_list=True))
 
         to_be_serialized[self._meta.collection_name] = bundles
         to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
@@ -1312,14 +1882,17 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         basic_bundle = self.build_bundle(request=request)
 
         try:
-            obj = self.cached_obj_get(bundle=basic_bundle, **self.remove_api_resource_names(kwargs))
+            with self.time_phase(request, 'query'):
+                obj = self.cached_obj_get(bundle=basic_bundle, **self.remove_api_resource_names(kwargs))
         except ObjectDoesNotExist:
             return http.HttpNotFound()
         except MultipleObjectsReturned:
             return http.HttpMultipleChoices("More than one resource is found at this URI.")
 
-        bundle = self.build_bundle(obj=obj, request=request)
-        bundle = self.full_dehydrate(bundle)
+        with self.time_phase(request, 'dehydrate'):
+            bundle = self.build_bundle(obj=obj, request=request)
+            bundle = self.full_dehydrate(bundle)
+
         bundle = self.alter_detail_data_to_serialize(request, bundle)
         return self.create_response(request, bundle)
 
@@ -1336,6 +1909,8 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         """
         deserialized = self.deserialize(request, request.body, format=request.META.get('CONTENT_TYPE', 'application/json'))
         deserialized = self.alter_deserialized_detail_data(request, deserialized)
+        self.check_deserialized_data(request, deserialized)
+        self.prefetch_related_data(request, [deserialized])
         bundle = self.build_bundle(data=dict_strip_unicode_keys(deserialized), request=request)
         updated_bundle = self.obj_create(bundle, **self.remove_api_resource_names(kwargs))
         location = self.get_resource_uri(updated_bundle)
@@ -1365,6 +1940,12 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         Calls ``delete_list`` to clear out the collection then ``obj_create``
         with the provided the data to create the new collection.
 
+        If ``Meta.put_list_upsert = True``, calls ``obj_upsert_list`` instead,
+        which only touches the objects that changed.
+
+        If ``Meta.commit_chunk_size`` is set, the objects are created in
+        chunks of that size (see ``write_in_chunks``).
+
         Return ``HttpNoContent`` (204 No Content) if
         ``Meta.always_return_data = False`` (default).
 
@@ -1377,8 +1958,44 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         if not self._meta.collection_name in deserialized:
             raise BadRequest("Invalid data sent.")
 
+        deserialized[self._meta.collection_name] = [self.alter_deserialized_detail_data(request, object_data) for object_data in deserialized[self._meta.collection_name]]
+
+        for object_data in deserialized[self._meta.collection_name]:
+            self.check_deserialized_data(request, object_data)
+
         basic_bundle = self.build_bundle(request=request)
+
+        if self._meta.put_list_upsert:
+            self.prefetch_related_data(request, deserialized[self._meta.collection_name])
+            bundles_seen = [self.build_bundle(data=dict_strip_unicode_keys(object_data), request=request) for object_data in deserialized[self._meta.collection_name]]
+            self.obj_upsert_list(bundles_seen, basic_bundle, **self.remove_api_resource_names(kwargs))
+            self.report_progress(request, len(bundles_seen))
+            return self.put_list_response(request, bundles_seen)
+
+        if self._meta.commit_chunk_size:
+            object_list = deserialized[self._meta.collection_name]
+            chunks = []
+
+            # The collection is cleared out along with the first chunk, so
+            # there's always one (even if it's empty).
+            for start, end in self.get_chunk_bounds(len(object_list)) or [(0, 0)]:
+                replace_bundle = basic_bundle if start == 0 else None
+                func = partial(self.put_list_chunk, request, object_list[start:end], replace_bundle=replace_bundle, **self.remove_api_resource_names(kwargs))
+                chunks.append((self._meta.collection_name, start, end, func))
+
+            # Succeeds with the same status as an unchunked ``PUT``.
+            response_class = HttpResponse if self._meta.always_return_data else http.HttpNoContent
+            return self.write_in_chunks(request, chunks, response_class=response_class)
+
+        if self.can_bulk_create():
+            bundles_seen = [self.build_bundle(data=dict_strip_unicode_keys(object_data), request=request) for object_data in deserialized[self._meta.collection_name]]
+            self.obj_create_bulk(bundles_seen, replace_bundle=basic_bundle, **self.remove_api_resource_names(kwargs))
+            self.report_progress(request, len(bundles_seen))
+            return self.put_list_response(request, bundles_seen)
+
         self.obj_delete_list_for_update(bundle=basic_bundle, **self.remove_api_resource_names(kwargs))
+        # Only now, so nothing that was just deleted gets prefetched.
+        self.prefetch_related_data(request, deserialized[self._meta.collection_name])
         bundles_seen = []
 
         for object_data in deserialized[self._meta.collection_name]:
@@ -1389,10 +2006,45 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
             try:
                 self.obj_create(bundle=bundle, **self.remove_api_resource_names(kwargs))
                 bundles_seen.append(bundle)
+                self.report_progress(request)
             except ImmediateHttpResponse:
                 self.rollback(bundles_seen)
                 raise
 
+        return self.put_list_response(request, bundles_seen)
+
+    def put_list_chunk(self, request, object_list, replace_bundle=None, **kwargs):
+        """
+        Creates the objects in one chunk of a chunked ``put_list``, clearing out
+        the collection first when given a ``replace_bundle``.
+
+        Returns the bundles created.
+        """
+        if self.can_bulk_create():
+            bundles = [self.build_bundle(data=dict_strip_unicode_keys(object_data), request=request) for object_data in object_list]
+            self.obj_create_bulk(bundles, replace_bundle=replace_bundle, **kwargs)
+            self.report_progress(request, len(bundles))
+            return bundles
+
+        if replace_bundle is not None:
+            self.obj_delete_list_for_update(bundle=replace_bundle, **kwargs)
+
+        self.prefetch_related_data(request, object_list)
+        bundles = []
+
+        for object_data in object_list:
+            bundle = self.build_bundle(data=dict_strip_unicode_keys(object_data), request=request)
+            self.obj_create(bundle=bundle, **kwargs)
+            bundles.append(bundle)
+            self.report_progress(request)
+
+        return bundles
+
+    def put_list_response(self, request, bundles_seen):
+        """
+        Builds the response to a ``PUT`` on a list resource, once the new
+        collection is in place.
+        """
         if not self._meta.always_return_data:
             return http.HttpNoContent()
         else:
@@ -1422,6 +2074,8 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         """
         deserialized = self.deserialize(request, request.body, format=request.META.get('CONTENT_TYPE', 'application/json'))
         deserialized = self.alter_deserialized_detail_data(request, deserialized)
+        self.check_deserialized_data(request, deserialized, partial=True)
+        self.prefetch_related_data(request, [deserialized])
         bundle = self.build_bundle(data=dict_strip_unicode_keys(deserialized), request=request)
 
         try:
@@ -1516,6 +2170,8 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
 
             * ``PATCH`` is all or nothing. If a single sub-operation fails, the
               entire request will fail and all resources will be rolled back.
+              With ``Meta.commit_chunk_size`` set, this holds for each chunk
+              instead (see ``write_in_chunks``).
 
           * For ``PATCH`` to work, you **must** have ``put`` in your
             :ref:`detail-allowed-methods` setting.
@@ -1539,55 +2195,205 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         if len(deserialized[collection_name]) and 'put' not in self._meta.detail_allowed_methods:
             raise ImmediateHttpResponse(response=http.HttpMethodNotAllowed())
 
-        bundles_seen = []
+        deserialized[collection_name] = [self.alter_deserialized_detail_data(request, data) for data in deserialized[collection_name]]
 
         for data in deserialized[collection_name]:
-            # If there's a resource_uri then this is either an
-            # update-in-place or a create-via-PUT.
-            if "resource_uri" in data:
-                uri = data.pop('resource_uri')
+            self.check_deserialized_data(request, data, partial="resource_uri" in data)
 
-                try:
-                    obj = self.get_via_uri(uri, request=request)
+        deleted_collection = deserialized.get(deleted_collection_name, [])
 
-                    # The object does exist, so this is an update-in-place.
-                    bundle = self.build_bundle(obj=obj, request=request)
-                    bundle = self.full_dehydrate(bundle, for_list=True)
+        if deleted_collection and 'delete' not in self._meta.detail_allowed_methods:
+            raise ImmediateHttpResponse(response=http.HttpMethodNotAllowed())
+
+        if self._meta.commit_chunk_size:
+            object_list = deserialized[collection_name]
+            chunks = []
+
+            for start, end in self.get_chunk_bounds(len(object_list)):
+                chunks.append((collection_name, start, end, partial(self.patch_list_objects, request, object_list[start:end])))
+
+            for start, end in self.get_chunk_bounds(len(deleted_collection)):
+                chunks.append((deleted_collection_name, start, end, partial(self.patch_list_deleted_objects, request, deleted_collection[start:end])))
+
+            return self.write_in_chunks(request, chunks, response_class=http.HttpAccepted)
+
+        bundles_seen = self.patch_list_objects(request, deserialized[collection_name])
+
+        if deleted_collection:
+            self.patch_list_deleted_objects(request, deleted_collection)
+
+        if not self._meta.always_return_data:
+            return http.HttpAccepted()
+        else:
+            to_be_serialized = {}
+            to_be_serialized['objects'] = [self.full_dehydrate(bundle, for_list=True) for bundle in bundles_seen]
+            to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
+            return self.create_response(request, to_be_serialized, response_class=http.HttpAccepted)
+
+    def patch_list_objects(self, request, object_list):
+        """
+        Updates or creates each of the objects sent in a ``PATCH`` to a list
+        resource (see ``patch_list``), which have already been through
+        ``alter_deserialized_detail_data``.
+
+        Returns the bundles written.
+        """
+        bundles_seen = []
+        bulk_create = self.can_bulk_create()
+        bundles_to_create = []
+
+        # Look up everything being updated (& everything related) in one go.
+        uris = [data['resource_uri'] for data in object_list if "resource_uri" in data]
+        existing_objects = self.get_via_uris(uris, request=request) if uris else {}
+        self.prefetch_related_data(request, object_list)
+
+        for data in object_list:
+            # If there's a resource_uri then this is either an
+            # update-in-place or a create-via-PUT.
+            if "resource_uri" in data:
+                uri = data.pop('resource_uri')
+                obj = existing_objects.get(uri)
+
+                if obj is not None:
+                    # The object does exist, so this is an update-in-place.
+                    bundle = self.build_bundle(obj=obj, request=request)
+                    bundle = self.full_dehydrate(bundle, for_list=True)
                     bundle = self.alter_detail_data_to_serialize(request, bundle)
                     self.update_in_place(request, bundle, data)
-                except (ObjectDoesNotExist, MultipleObjectsReturned):
+                else:
                     # The object referenced by resource_uri doesn't exist,
                     # so this is a create-by-PUT equivalent.
-                    data = self.alter_deserialized_detail_data(request, data)
                     bundle = self.build_bundle(data=dict_strip_unicode_keys(data), request=request)
-                    self.obj_create(bundle=bundle)
+
+                    if bulk_create:
+                        bundles_to_create.append(bundle)
+                    else:
+                        self.obj_create(bundle=bundle)
             else:
                 # There's no resource URI, so this is a create call just
                 # like a POST to the list resource.
-                data = self.alter_deserialized_detail_data(request, data)
                 bundle = self.build_bundle(data=dict_strip_unicode_keys(data), request=request)
-                self.obj_create(bundle=bundle)
+
+                if bulk_create:
+                    bundles_to_create.append(bundle)
+                else:
+                    self.obj_create(bundle=bundle)
 
             bundles_seen.append(bundle)
 
-        deleted_collection = deserialized.get(deleted_collection_name, [])
+            if not bulk_create:
+                self.report_progress(request)
 
-        if deleted_collection:
-            if 'delete' not in self._meta.detail_allowed_methods:
-                raise ImmediateHttpResponse(response=http.HttpMethodNotAllowed())
+        if bundles_to_create:
+            self.obj_create_bulk(bundles_to_create)
 
-            for uri in deleted_collection:
-                obj = self.get_via_uri(uri, request=request)
-                bundle = self.build_bundle(obj=obj, request=request)
-                self.obj_delete(bundle=bundle)
+        if bulk_create:
+            self.report_progress(request, len(bundles_seen))
 
-        if not self._meta.always_return_data:
-            return http.HttpAccepted()
-        else:
-            to_be_serialized = {}
-            to_be_serialized['objects'] = [self.full_dehydrate(bundle, for_list=True) for bundle in bundles_seen]
+        return bundles_seen
+
+    def patch_list_deleted_objects(self, request, uris):
+        """
+        Deletes the objects referred to by ``uris`` in a ``PATCH`` to a list
+        resource (see ``patch_list``).
+        """
+        objects_to_delete = self.get_via_uris(uris, request=request)
+
+        for uri in uris:
+            if uri not in objects_to_delete:
+                # Raises the same error a single lookup would.
+                objects_to_delete[uri] = self.get_via_uri(uri, request=request)
+
+        basic_bundle = self.build_bundle(request=request)
+        self.obj_delete_many(basic_bundle, list(objects_to_delete.values()))
+
+    def get_chunk_bounds(self, count):
+        """
+        Splits ``count`` items into ``(start, end)`` pairs of at most
+        ``Meta.commit_chunk_size`` items each.
+        """
+        size = self._meta.commit_chunk_size
+        return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+    def apply_chunk(self, request, func):
+        """
+        Carries out one chunk of a chunked write by calling ``func``, returning
+        whatever it does.
+
+        Non-ORM resources have no transaction to commit, so this is only a
+        hook. ``ModelResource`` includes a version that commits each chunk on
+        its own.
+        """
+        return func()
+
+    def write_in_chunks(self, request, chunks, response_class=http.HttpAccepted):
+        """
+        Applies a large write in ``chunks``, a list of
+        ``(collection_name, start, end, func)``, one after another through
+        ``apply_chunk``.
+
+        Stops at the first chunk that fails, leaving the chunks before it in
+        place. A database error (once the chunk has been rolled back) counts
+        as a failure too & is reported like any other server error. The
+        response lists the ``chunks`` with whether each was ``applied`` (& the
+        ``error`` for the one that failed). If all went well, it's a
+        ``response_class`` (202 Accepted by default, which has no body if it's
+        a 204 No Content), otherwise it has the failed chunk's status code.
+        """
+        report = []
+        bundles_seen = []
+        failure = None
+
+        for collection_name, start, end, func in chunks:
+            chunk = {'collection': collection_name, 'start': start, 'end': end, 'applied': False}
+            report.append(chunk)
+
+            if failure is not None:
+                continue
+
+            try:
+                bundles_seen.extend(self.apply_chunk(request, func) or [])
+                chunk['applied'] = True
+            except ImmediateHttpResponse as e:
+                failure = e.response
+            except (BadRequest, fields.ApiFieldError) as e:
+                failure = self.error_response(request, {"error": sanitize(e.args[0]) if getattr(e, 'args') else ''}, response_class=http.HttpBadRequest)
+            except ValidationError as e:
+                failure = self.error_response(request, {"error": sanitize(e.messages)}, response_class=http.HttpBadRequest)
+            except (NotFound, ObjectDoesNotExist, Http404) as e:
+                failure = self.error_response(request, {"error": sanitize(six.text_type(e))}, response_class=HttpResponseNotFound)
+            except DatabaseError as e:
+                failure = self._handle_500(request, e)
+
+            if failure is not None:
+                chunk['error'] = self.get_response_data(request, failure)
+
+        to_be_serialized = {'chunks': report}
+
+        if failure is not None:
+            return self.create_response(request, to_be_serialized, status=failure.status_code)
+
+        if response_class.status_code == 204:
+            return response_class()
+
+        if self._meta.always_return_data:
+            to_be_serialized[self._meta.collection_name] = [self.full_dehydrate(bundle, for_list=True) for bundle in bundles_seen]
             to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
-            return self.create_response(request, to_be_serialized, response_class=http.HttpAccepted)
+
+        return self.create_response(request, to_be_serialized, response_class=response_class)
+
+    def get_response_data(self, request, response):
+        """
+        Returns the deserialized body of a ``response`` built by this resource,
+        the raw text if it can't be deserialized, or ``None`` if it's empty.
+        """
+        if not response.content:
+            return None
+
+        try:
+            return self.deserialize(request, response.content, format=response.get('Content-Type', self._meta.default_format))
+        except Exception:
+            return force_text(response.content, errors='replace')
 
     def patch_detail(self, request, **kwargs):
         """
@@ -1599,6 +2405,9 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         If the resource did not exist, return ``HttpNotFound`` (404 Not Found).
         """
         request = convert_post_to_patch(request)
+        deserialized = self.deserialize(request, request.body, format=request.META.get('CONTENT_TYPE', 'application/json'))
+        deserialized = self.alter_deserialized_detail_data(request, deserialized)
+        self.check_deserialized_data(request, deserialized, partial=True)
         basic_bundle = self.build_bundle(request=request)
 
         # We want to be able to validate the update, but we can't just pass
@@ -1619,7 +2428,7 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         bundle = self.alter_detail_data_to_serialize(request, bundle)
 
         # Now update the bundle in-place.
-        deserialized = self.deserialize(request, request.body, format=request.META.get('CONTENT_TYPE', 'application/json'))
+        self.prefetch_related_data(request, [deserialized])
         self.update_in_place(request, bundle, deserialized)
 
         if not self._meta.always_return_data:
@@ -1632,13 +2441,15 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
     def update_in_place(self, request, original_bundle, new_data):
         """
         Update the object in original_bundle in-place using new_data.
+
+        ``new_data`` is expected to have been through
+        ``alter_deserialized_detail_data`` already.
         """
         original_bundle.data.update(**dict_strip_unicode_keys(new_data))
 
         # Now we've got a bundle with the new data sitting in it and we're
         # we're basically in the same spot as a PUT request. SO the rest of this
         # function is cribbed from put_detail.
-        self.alter_deserialized_detail_data(request, original_bundle.data)
         kwargs = {
             self._meta.detail_uri_name: self.get_bundle_detail_data(original_bundle),
             'request': request,
@@ -1652,6 +2463,10 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         Calls ``build_schema`` to generate the data. This method only responds
         to HTTP GET.
 
+        The serialized schema is kept per format, so ``build_schema`` is only
+        called once for each. Responses carry an ``ETag`` & a request with a
+        matching ``If-None-Match`` gets a 304 (after the usual checks).
+
         Should return a HttpResponse (200 OK).
         """
         self.method_check(request, allowed=['get'])
@@ -1660,7 +2475,14 @@ class Resource(six.with_metaclass(DeclarativeMetaclass)):
         self.log_throttled_access(request)
         bundle = self.build_bundle(request=request)
         self.authorized_read_detail(self.get_object_list(bundle.request), bundle)
-        return self.create_response(request, self.build_schema())
+        desired_format = self.determine_format(request)
+
+        # JSONP responses depend on the callback, so they aren't kept.
+        if 'text/javascript' in desired_format:
+            return self.create_response(request, self.build_schema())
+
+        serialize = lambda: self.serialize(request, self.build_schema(), desired_format)
+        return cached_response(request, self._schema_responses, (self._meta.api_name, desired_format), serialize, build_content_type(desired_format))
 
     def get_multiple(self, request, **kwargs):
         """
@@ -2078,6 +2900,7 @@ class BaseModelResource(Resource):
         """
         try:
             object_list = self.get_object_list(bundle.request).filter(**kwargs)
+            object_list = self.authorized_read_detail_lookup(object_list, bundle)
             stringified_kwargs = ', '.join(["%s=%s" % (k, v) for k, v in kwargs.items()])
 
             if len(object_list) <= 0:
@@ -2103,6 +2926,286 @@ class BaseModelResource(Resource):
         bundle = self.full_hydrate(bundle)
         return self.save(bundle)
 
+    def can_bulk_create(self):
+        """
+        A ORM-specific implementation of ``can_bulk_create``.
+
+        ``bulk_create`` skips ``Model.save`` & can't handle related data, so
+        it's only used when ``Meta.bulk_create = True``, the model has no
+        multi-table parents & the resource has no writable related fields.
+        If the response needs the new primary keys, the database must be
+        able to hand them back as well.
+        """
+        if not self._meta.bulk_create or self._meta.object_class is None:
+            return False
+
+        if self._meta.object_class._meta.parents:
+            return False
+
+        for field_object in self.fields.values():
+            if getattr(field_object, 'is_related', False) and not field_object.readonly:
+                return False
+
+        if self._meta.always_return_data and isinstance(self._meta.object_class._meta.pk, AutoField):
+            connection = connections[self._meta.queryset.db]
+            return getattr(connection.features, 'can_return_ids_from_bulk_insert', False)
+
+        return True
+
+    def obj_create_bulk(self, bundles, replace_bundle=None, **kwargs):
+        """
+        A ORM-specific implementation of ``obj_create_bulk``.
+
+        Every bundle is hydrated & validated before anything is written, the
+        new objects are authorized together, then inserted in batches of
+        ``Meta.bulk_create_batch_size`` within a single transaction.
+        """
+        for bundle in bundles:
+            bundle.obj = self._meta.object_class()
+
+            for key, value in kwargs.items():
+                setattr(bundle.obj, key, value)
+
+            self.full_hydrate(bundle)
+
+        return self.save_bulk(bundles, replace_bundle=replace_bundle, **kwargs)
+
+    def save_bulk(self, bundles, replace_bundle=None, **kwargs):
+        """
+        Validates, authorizes & inserts the new objects of already hydrated
+        bundles.
+
+        Used by ``obj_create_bulk`` & ``obj_upsert_list``.
+        """
+        invalid_bundle = self.is_valid_list(bundles)
+
+        if invalid_bundle is not None:
+            raise ImmediateHttpResponse(response=self.error_response(invalid_bundle.request, invalid_bundle.errors))
+
+        objects = [bundle.obj for bundle in bundles]
+
+        if objects:
+            self.authorized_create_bulk(objects, bundles)
+
+        object_list = self._meta.queryset._clone()
+
+        with atomic(using=object_list.db):
+            if replace_bundle is not None:
+                self.obj_delete_list_for_update(bundle=replace_bundle, **kwargs)
+
+            if objects:
+                object_list.bulk_create(objects, batch_size=self._meta.bulk_create_batch_size)
+
+        for bundle in bundles:
+            # Only some databases fill in auto-incremented keys.
+            if bundle.obj.pk is not None:
+                bundle.objects_saved.add(self.create_identifier(bundle.obj))
+
+        return bundles
+
+    def get_upsert_attributes(self):
+        """
+        Returns the object attributes ``obj_upsert_list`` matches incoming
+        data to existing objects on.
+
+        These come from ``Meta.upsert_fields`` (either resource field names or
+        ``detail_uri_name``), defaulting to ``detail_uri_name``.
+        """
+        attributes = []
+
+        for field_name in self._meta.upsert_fields or [self._meta.detail_uri_name]:
+            if field_name == self._meta.detail_uri_name:
+                attributes.append(field_name)
+                continue
+
+            field_object = self.fields.get(field_name)
+
+            if field_object is None or getattr(field_object, 'is_related', False) or not isinstance(field_object.attribute, six.string_types):
+                raise ImproperlyConfigured("The '%s' field can't be used to match objects in '%s'." % (field_name, self.__class__.__name__))
+
+            attributes.append(field_object.attribute)
+
+        return attributes
+
+    def get_upsert_key(self, obj, attributes):
+        """
+        Returns the values of ``attributes`` on ``obj``, normalized by the
+        model fields so incoming data compares equal to database values.
+
+        Returns ``None`` if any of them are missing.
+        """
+        key = []
+
+        for attribute in attributes:
+            value = getattr(obj, attribute, None)
+
+            if value is None:
+                return None
+
+            if attribute == 'pk':
+                model_field = obj._meta.pk
+            else:
+                try:
+                    model_field = obj._meta.get_field(attribute)
+                except FieldDoesNotExist:
+                    model_field = None
+
+            if model_field is not None:
+                try:
+                    value = model_field.to_python(value)
+                except ValidationError:
+                    return None
+
+            key.append(value)
+
+        return tuple(key)
+
+    def hydrate_upsert_key(self, bundle, attributes, **kwargs):
+        """
+        Returns the upsert key for the data in ``bundle``, without touching
+        ``bundle`` itself.
+
+        Only ``hydrate`` & the non-related fields are run (on a scratch
+        object), so no related objects are looked up just to match the data.
+        If the data lacks some of the ``attributes`` but has a
+        ``resource_uri``, the lookup kwargs of that URI fill them in.
+        """
+        obj = self._meta.object_class()
+
+        for attr, value in kwargs.items():
+            setattr(obj, attr, value)
+
+        scratch = self.build_bundle(obj=obj, data=bundle.data.copy(), request=bundle.request)
+        scratch = self.hydrate(scratch)
+
+        for field_name, field_object in self.fields.items():
+            if field_object.readonly is True or getattr(field_object, 'is_related', False):
+                continue
+
+            method = getattr(self, "hydrate_%s" % field_name, None)
+
+            if method:
+                scratch = method(scratch)
+
+            if field_object.attribute:
+                value = field_object.hydrate(scratch)
+
+                if value is not None or field_object.null:
+                    setattr(scratch.obj, field_object.attribute, value)
+
+        key = self.get_upsert_key(scratch.obj, attributes)
+
+        if key is None and bundle.data.get('resource_uri'):
+            try:
+                lookup_kwargs = self.resolve_detail_uri(bundle.data['resource_uri'])
+            except NotFound:
+                return None
+
+            for attr, value in lookup_kwargs.items():
+                setattr(scratch.obj, attr, value)
+
+            key = self.get_upsert_key(scratch.obj, attributes)
+
+        return key
+
+    def get_concrete_values(self, obj):
+        return [getattr(obj, model_field.attname) for model_field in obj._meta.fields]
+
+    def obj_upsert_list(self, bundles, bundle, **kwargs):
+        """
+        A ORM-specific implementation of ``obj_upsert_list``.
+
+        Loads the existing collection once, then saves only the objects whose
+        fields changed (or which have writable related data), creates the
+        new ones (with ``bulk_create`` if possible) & deletes the rest with
+        a few ``pk__in`` queries, all within a single transaction.
+        """
+        attributes = self.get_upsert_attributes()
+        existing_objects = self.obj_get_list(bundle=bundle, **kwargs)
+        updatable_objects = self.authorized_update_list(existing_objects, bundle)
+        existing = {}
+        # Objects without a key can't be matched, so they're always deleted.
+        unkeyed = []
+
+        for obj in updatable_objects:
+            key = self.get_upsert_key(obj, attributes)
+
+            if key is None:
+                unkeyed.append(obj)
+            else:
+                existing[key] = obj
+
+        writable_related = [field_name for field_name, field_object in self.fields.items() if getattr(field_object, 'is_related', False) and not field_object.readonly]
+        bundles_to_create = []
+        object_list = self._meta.queryset._clone()
+
+        with atomic(using=object_list.db):
+            for new_bundle in bundles:
+                key = self.hydrate_upsert_key(new_bundle, attributes, **kwargs)
+                obj = existing.pop(key, None) if key is not None else None
+
+                if obj is None:
+                    new_bundle.obj = self._meta.object_class()
+
+                    for attr, value in kwargs.items():
+                        setattr(new_bundle.obj, attr, value)
+
+                    self.full_hydrate(new_bundle)
+                    bundles_to_create.append(new_bundle)
+                    continue
+
+                # Hydrate onto the existing object, so fields left out of the
+                # data keep their values just like a ``PUT`` to detail.
+                original_values = self.get_concrete_values(obj)
+                new_bundle.obj = obj
+                self.full_hydrate(new_bundle)
+
+                if self.get_concrete_values(obj) == original_values and not any(field_name in new_bundle.data for field_name in writable_related):
+                    self.is_valid(new_bundle)
+
+                    if new_bundle.errors:
+                        raise ImmediateHttpResponse(response=self.error_response(new_bundle.request, new_bundle.errors))
+
+                    continue
+
+                self.save(new_bundle)
+
+            if bundles_to_create:
+                if self.can_bulk_create():
+                    self.save_bulk(bundles_to_create)
+                else:
+                    for new_bundle in bundles_to_create:
+                        self.save(new_bundle)
+
+            missing_pks = [obj.pk for obj in list(existing.values()) + unkeyed]
+            chunk_size = 500
+
+            for start in range(0, len(missing_pks), chunk_size):
+                object_list.filter(pk__in=missing_pks[start:start + chunk_size]).delete()
+
+        return bundles
+
+    def authorized_create_bulk(self, objects, bundles):
+        """
+        Authorizes the creation of all ``objects`` with a single
+        ``create_list`` check, falling back to ``create_detail`` for each
+        bundle if the authorization doesn't implement ``create_list``.
+        """
+        basic_bundle = self.build_bundle(request=bundles[0].request)
+
+        try:
+            auth_result = self.authorized_create_list(objects, basic_bundle)
+        except NotImplementedError:
+            for bundle in bundles:
+                self.authorized_create_detail(self.get_object_list(bundle.request), bundle)
+
+            return objects
+
+        if len(auth_result) != len(objects):
+            self.unauthorized_result(Unauthorized("You are not allowed to create all of those objects."))
+
+        return auth_result
+
     def lookup_kwargs_with_identifiers(self, bundle, kwargs):
         """
         Kwargs here represent uri identifiers Ex: /repos/<user_id>/<repo_name>/
@@ -2207,15 +3310,278 @@ class BaseModelResource(Resource):
         self.authorized_delete_detail(self.get_object_list(bundle.request), bundle)
         bundle.obj.delete()
 
-    @transaction.commit_on_success()
+    def obj_delete_many(self, bundle, objects):
+        """
+        A ORM-specific implementation of ``obj_delete_many``.
+
+        Each object is authorized with ``delete_detail``, just as
+        ``obj_delete`` would, but against the objects already fetched. Once
+        they've all passed, they're deleted with one queryset ``delete``. If
+        ``obj_delete`` or the model's ``delete`` (which a queryset ``delete``
+        never calls) has been overridden, ``obj_delete`` is called for each
+        object instead.
+        """
+        if six.get_unbound_function(type(self).obj_delete) is not six.get_unbound_function(BaseModelResource.obj_delete):
+            return super(BaseModelResource, self).obj_delete_many(bundle, objects)
+
+        if six.get_unbound_function(self._meta.object_class.delete) is not six.get_unbound_function(Model.delete):
+            return super(BaseModelResource, self).obj_delete_many(bundle, objects)
+
+        if not objects:
+            return
+
+        object_list = self.get_object_list(bundle.request)
+
+        for obj in objects:
+            self.authorized_delete_detail(object_list, self.build_bundle(obj=obj, request=bundle.request))
+
+        object_list.filter(pk__in=set(obj.pk for obj in objects)).delete()
+
+    def get_via_uris(self, uris, request=None):
+        """
+        A ORM-specific implementation of ``get_via_uris``.
+
+        URIs that only identify an object by ``detail_uri_name`` are fetched
+        with a single ``obj_get_many`` query. Anything else (or an
+        overridden ``get_via_uri`` or ``obj_get``) goes through
+        ``get_via_uri`` one at a time.
+        """
+        if not self.can_get_many() or six.get_unbound_function(type(self).get_via_uri) is not six.get_unbound_function(BaseModelResource.get_via_uri):
+            return super(BaseModelResource, self).get_via_uris(uris, request=request)
+
+        detail_uri_name = self._meta.detail_uri_name
+        uris_by_value = {}
+        other_uris = []
+
+        for uri in uris:
+            kwargs = self.resolve_detail_uri(uri)
+            value = self.normalize_lookup_value(detail_uri_name, kwargs.get(detail_uri_name))
+
+            if list(kwargs.keys()) == [detail_uri_name] and value is not None:
+                uris_by_value.setdefault(value, []).append(uri)
+            else:
+                other_uris.append(uri)
+
+        objects = super(BaseModelResource, self).get_via_uris(other_uris, request=request)
+
+        if not uris_by_value:
+            return objects
+
+        bundle = self.build_bundle(request=request)
+
+        for value, obj in self.obj_get_many(bundle, detail_uri_name, list(uris_by_value.keys())).items():
+            for uri in uris_by_value[value]:
+                objects[uri] = obj
+
+        return objects
+
+    def can_get_many(self):
+        """
+        Whether ``obj_get_many`` can stand in for ``obj_get``, which isn't
+        the case if ``obj_get`` has been overridden.
+        """
+        return six.get_unbound_function(type(self).obj_get) is six.get_unbound_function(BaseModelResource.obj_get)
+
+    def obj_get_many(self, bundle, attribute, values):
+        """
+        Fetches the objects whose ``attribute`` is one of ``values`` with a
+        single ``__in`` query, checking each with ``authorized_read_detail``
+        as ``obj_get`` would.
+
+        Returns a dictionary of normalized value (see
+        ``normalize_lookup_value``) to object. Values matching no object, or
+        more than one, are left out.
+        """
+        object_list = self.get_object_list(bundle.request).filter(**{'%s__in' % attribute: list(values)})
+        object_list = self.authorized_read_detail_lookup(object_list, bundle)
+        found = {}
+
+        for obj in object_list:
+            value = self.normalize_lookup_value(attribute, getattr(obj, attribute))
+            # Like ``obj_get``, more than one match counts as not found.
+            found[value] = None if value in found else obj
+
+        objects = {}
+
+        for value, obj in found.items():
+            if obj is None:
+                continue
+
+            bundle.obj = obj
+            self.authorized_read_detail(object_list, bundle)
+            objects[value] = obj
+
+        return objects
+
+    def normalize_lookup_value(self, attribute, value):
+        """
+        Converts a value of the model's ``attribute``, either from incoming
+        data or an object, with the model field so the two compare equal.
+
+        Returns ``None`` if it can't be converted.
+        """
+        if value is None:
+            return None
+
+        model_opts = self._meta.object_class._meta
+
+        try:
+            if attribute == 'pk':
+                model_field = model_opts.pk
+            else:
+                model_field = model_opts.get_field(attribute)
+        except FieldDoesNotExist:
+            return None
+
+        try:
+            return model_field.to_python(value)
+        except ValidationError:
+            return None
+
+    def related_prefetch_key(self, data):
+        """
+        A ORM-specific implementation of ``related_prefetch_key``.
+
+        Nested data is looked up by its unique keys, so only data with
+        exactly one of them (``pk`` or a ``unique`` field) can be
+        prefetched.
+        """
+        if not self.can_update() or not self.can_get_many():
+            return None
+
+        unique_keys = [key for key in data.keys() if key == 'pk' or (key in self.fields and self.fields[key].unique)]
+
+        if len(unique_keys) != 1:
+            return None
+
+        key = unique_keys[0]
+
+        if key == 'pk':
+            attribute = 'pk'
+        else:
+            field_object = self.fields[key]
+
+            if getattr(field_object, 'is_related', False) or not isinstance(field_object.attribute, six.string_types):
+                return None
+
+            attribute = field_object.attribute
+
+        value = self.normalize_lookup_value(attribute, data[key])
+
+        if value is None:
+            return None
+
+        return (self.__class__, attribute, value)
+
+    def prefetch_related_data(self, request, data_list):
+        """
+        A ORM-specific implementation of ``prefetch_related_data``.
+
+        Walks the related fields of ``data_list`` (& of any nested data
+        within it), then fetches what each related resource is referred to
+        by with one ``get_via_uris`` call & one ``obj_get_many`` query per
+        unique field.
+        """
+        if request is None:
+            return
+
+        references = {}
+        self.collect_related_references(data_list, references)
+
+        if not references:
+            return
+
+        prefetched = getattr(request, '_related_prefetch', None)
+
+        if prefetched is None:
+            prefetched = request._related_prefetch = {}
+
+        bundle = self.build_bundle(request=request)
+
+        for fk_resource, uris, lookups in references.values():
+            if uris:
+                for uri, obj in fk_resource.get_via_uris(uris, request=request).items():
+                    prefetched[(fk_resource.__class__, 'resource_uri', uri)] = obj
+
+            for attribute, values in lookups.items():
+                objects = fk_resource.obj_get_many(bundle, attribute, values)
+
+                for value in values:
+                    # ``None`` records that nothing matched.
+                    prefetched[(fk_resource.__class__, attribute, value)] = objects.get(value)
+
+    def collect_related_references(self, data_list, references):
+        """
+        Gathers the URIs & unique keys the writable related fields of
+        ``data_list`` refer to, grouped by related resource class.
+        """
+        for data in data_list:
+            if not hasattr(data, 'items'):
+                continue
+
+            for field_name, field_object in self.fields.items():
+                if not getattr(field_object, 'is_related', False) or field_object.readonly:
+                    continue
+
+                if not field_name in data or data[field_name] is None:
+                    continue
+
+                to_class = field_object.to_class
+
+                # Generic relations (& non-ORM resources) are left alone.
+                if not isinstance(to_class, type) or not issubclass(to_class, BaseModelResource):
+                    continue
+
+                if not to_class in references:
+                    references[to_class] = (to_class(), [], {})
+
+                fk_resource, uris, lookups = references[to_class]
+                values = data[field_name]
+
+                if isinstance(values, six.string_types) or hasattr(values, 'items'):
+                    values = [values]
+
+                nested = []
+
+                for value in values:
+                    if isinstance(value, six.string_types):
+                        uris.append(value)
+                    elif hasattr(value, 'items'):
+                        nested.append(value)
+                        key = fk_resource.related_prefetch_key(value)
+
+                        if key is not None:
+                            lookups.setdefault(key[1], []).append(key[2])
+
+                if nested:
+                    fk_resource.collect_related_references(nested, references)
+
     def patch_list(self, request, **kwargs):
         """
         An ORM-specific implementation of ``patch_list``.
 
         Necessary because PATCH should be atomic (all-success or all-fail)
-        and the only way to do this neatly is at the database level.
+        and the only way to do this neatly is at the database level. With
+        ``Meta.commit_chunk_size`` set, each chunk is committed on its own
+        instead (see ``apply_chunk``).
+        """
+        if self._meta.commit_chunk_size:
+            return super(BaseModelResource, self).patch_list(request, **kwargs)
+
+        with transaction.commit_on_success():
+            return super(BaseModelResource, self).patch_list(request, **kwargs)
+
+    def apply_chunk(self, request, func):
+        """
+        A ORM-specific implementation of ``apply_chunk``.
+
+        Runs ``func`` in a transaction of its own, so each chunk is committed
+        (& its locks released) as soon as it's done, & a failure only undoes
+        that chunk. Within an outer transaction (such as with
+        ``ATOMIC_REQUESTS``), each chunk is a savepoint instead.
         """
-        return super(BaseModelResource, self).patch_list(request, **kwargs)
+        with atomic(using=self.get_object_list(request).db):
+            return func()
 
     def rollback(self, bundles):
         """
@@ -2326,8 +3692,9 @@ class BaseModelResource(Resource):
         Due to the way Django works, the M2M data must be handled after the
         main instance, which is why this isn't a part of the main ``save`` bits.
 
-        Currently slightly inefficient in that it will clear out the whole
-        relation and recreate the related data as needed.
+        Only the related objects that were added or removed are written (see
+        ``update_m2m``), unless ``Meta.clear_m2m_on_save = True``, in which
+        case the whole relation is cleared out & recreated.
         """
         for field_name, field_object in self.fields.items():
             if not getattr(field_object, 'is_m2m', False):
@@ -2350,7 +3717,9 @@ class BaseModelResource(Resource):
             if not related_mngr:
                 continue
 
-            if hasattr(related_mngr, 'clear'):
+            clear_related = self._meta.clear_m2m_on_save or not hasattr(related_mngr, 'remove')
+
+            if clear_related and hasattr(related_mngr, 'clear'):
                 # FIXME: Dupe the original bundle, copy in the new object &
                 #        check the perms on that (using the related resource)?
 
@@ -2383,7 +3752,33 @@ class BaseModelResource(Resource):
                     related_resource.save(updated_related_bundle)
                 related_objs.append(updated_related_bundle.obj)
 
-            related_mngr.add(*related_objs)
+            if clear_related:
+                related_mngr.add(*related_objs)
+            else:
+                self.update_m2m(related_mngr, related_objs)
+
+    def update_m2m(self, related_mngr, related_objs):
+        """
+        Makes the relation behind ``related_mngr`` hold exactly
+        ``related_objs``, by comparing primary keys with what's already
+        there & only adding or removing the difference.
+        """
+        current_pks = set(related_mngr.values_list('pk', flat=True))
+        new_pks = set(related_obj.pk for related_obj in related_objs)
+        removed_pks = current_pks - new_pks
+
+        if removed_pks:
+            related_mngr.remove(*related_mngr.filter(pk__in=removed_pks))
+
+        added_objs = []
+
+        for related_obj in related_objs:
+            if related_obj.pk not in current_pks:
+                added_objs.append(related_obj)
+                current_pks.add(related_obj.pk)
+
+        if added_objs:
+            related_mngr.add(*added_objs)
 
     def detail_uri_kwargs(self, bundle_or_obj):
         """
@@ -1,11 +1,18 @@
 from __future__ import unicode_literals
+import json
+import os
+import re
+import threading
 import time
 
 from django.conf import settings
+from django.db import connections
 from django.test import TestCase
 from django.test.client import FakePayload, Client
 from django.utils.encoding import force_text
 
+from tastypie.compat import queries_logged
+from tastypie.fields import RelatedField
 from tastypie.serializers import Serializer
 
 try:
@@ -13,6 +20,225 @@ try:
 except ImportError:
     from urlparse import urlparse
 
+try:
+    from django.db.backends.utils import CursorDebugWrapper
+except ImportError: # Django < 1.7
+    from django.db.backends.util import CursorDebugWrapper
+
+
+# Golden files of query budgets, loaded once per run.
+QUERY_BUDGETS = {}
+
+
+# The related fields each thread is dehydrating (innermost last), tracked
+# while queries are recorded.
+_dehydrating = threading.local()
+
+
+def get_dehydrating_field():
+    """
+    Returns the name (as ``<Resource>.<field>``) of the innermost related
+    field being dehydrated by the current thread, or ``None``.
+    """
+    names = getattr(_dehydrating, 'names', None)
+
+    if not names:
+        return None
+
+    return names[-1]
+
+
+def track_dehydrate(dehydrate):
+    """
+    Wraps a related field's ``dehydrate`` so the field's name is on the
+    current thread's stack while it runs.
+    """
+    def tracked_dehydrate(field, *args, **kwargs):
+        if field.instance_name is None:
+            return dehydrate(field, *args, **kwargs)
+
+        names = _dehydrating.__dict__.setdefault('names', [])
+        names.append('%s.%s' % (getattr(field._resource, '__name__', None), field.instance_name))
+
+        try:
+            return dehydrate(field, *args, **kwargs)
+        finally:
+            names.pop()
+
+    return tracked_dehydrate
+
+
+class TrackDehydration(object):
+    """
+    A context manager that keeps track of the related field being dehydrated
+    (see ``get_dehydrating_field``) while it's active, by wrapping the
+    ``dehydrate`` of ``RelatedField`` & its subclasses. It may be nested.
+    """
+    _lock = threading.Lock()
+    _depth = 0
+    _originals = []
+
+    def get_field_classes(self):
+        classes = [RelatedField]
+
+        for field_class in classes:
+            classes.extend([subclass for subclass in field_class.__subclasses__() if not subclass in classes])
+
+        return classes
+
+    def __enter__(self):
+        with self._lock:
+            if TrackDehydration._depth == 0:
+                for field_class in self.get_field_classes():
+                    if 'dehydrate' in field_class.__dict__:
+                        dehydrate = field_class.__dict__['dehydrate']
+                        TrackDehydration._originals.append((field_class, dehydrate))
+                        field_class.dehydrate = track_dehydrate(dehydrate)
+
+            TrackDehydration._depth += 1
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._lock:
+            TrackDehydration._depth -= 1
+
+            if TrackDehydration._depth == 0:
+                for field_class, dehydrate in TrackDehydration._originals:
+                    field_class.dehydrate = dehydrate
+
+                TrackDehydration._originals = []
+
+        return False
+
+
+def get_query_shape(sql):
+    """
+    Strips the values out of some SQL (before its parameters are filled in),
+    so queries that differ only by their values look the same.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql.replace('%s', '?'))
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    return re.sub(r'\(\?(?:\s*,\s*\?)*\)', '(...)', sql)
+
+
+class RecordingCursorWrapper(CursorDebugWrapper):
+    """
+    Logs queries as usual & hands each one to a ``QueryRecorder``.
+    """
+    def __init__(self, cursor, db, recorder):
+        super(RecordingCursorWrapper, self).__init__(cursor, db)
+        self.recorder = recorder
+
+    def execute(self, sql, params=None):
+        try:
+            return super(RecordingCursorWrapper, self).execute(sql, params)
+        finally:
+            self.recorder.add(self.db, sql, get_dehydrating_field())
+
+    def executemany(self, sql, param_list):
+        try:
+            return super(RecordingCursorWrapper, self).executemany(sql, param_list)
+        finally:
+            self.recorder.add(self.db, sql, get_dehydrating_field())
+
+
+class QueryRecorder(object):
+    """
+    A context manager recording the SQL run on every database while it's
+    active (whether or not ``DEBUG`` is on).
+
+    Each of the ``queries`` is a dict with the ``sql``, ``time``, database
+    ``alias``, ``shape`` (the SQL without its values) & the related
+    ``field`` being dehydrated when it ran (as ``<Resource>.<field>``, or
+    ``None``).
+    """
+    def __init__(self):
+        self.queries = []
+        self.parent = None
+        self._connections = []
+        self._tracker = TrackDehydration()
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __enter__(self):
+        for connection in connections.all():
+            previous = connection.__dict__.get('make_debug_cursor')
+            self.parent = getattr(previous, 'recorder', self.parent)
+            self._connections.append((connection, connection.use_debug_cursor, previous, len(connection.queries)))
+            connection.make_debug_cursor = self.get_cursor_factory(connection)
+            connection.use_debug_cursor = True
+
+        self._tracker.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._tracker.__exit__(exc_type, exc_value, traceback)
+
+        for connection, use_debug_cursor, previous, count in self._connections:
+            connection.use_debug_cursor = use_debug_cursor
+
+            if previous is None:
+                del(connection.make_debug_cursor)
+            else:
+                connection.make_debug_cursor = previous
+
+            # Don't keep queries that only got logged for recording.
+            if not queries_logged(connection):
+                del(connection.queries[count:])
+
+        self._connections = []
+
+    def get_cursor_factory(self, connection):
+        def make_debug_cursor(cursor):
+            return RecordingCursorWrapper(cursor, connection, self)
+
+        make_debug_cursor.recorder = self
+        return make_debug_cursor
+
+    def add(self, connection, sql, field=None):
+        query = dict(connection.queries[-1], alias=connection.alias, shape=get_query_shape(sql), field=field)
+        self.queries.append(query)
+
+        if self.parent is not None:
+            self.parent.add(connection, sql, field=field)
+
+    def get_duplicates(self, threshold=2):
+        """
+        Returns the ``(field, shape, count)`` of each query that was run (in
+        the same shape, with different values) at least ``threshold`` times
+        by the same field, which is the telltale of an N+1 problem. The
+        most repeated come first.
+        """
+        counts = {}
+
+        for query in self.queries:
+            key = (query['field'], query['shape'])
+            counts[key] = counts.get(key, 0) + 1
+
+        duplicates = [(field, shape, count) for (field, shape), count in counts.items() if count >= threshold]
+        return sorted(duplicates, key=lambda duplicate: (-duplicate[2], duplicate[0] or '', duplicate[1]))
+
+    def format(self):
+        return '\n'.join(['%d. %s' % (i + 1, query['sql']) for i, query in enumerate(self.queries)])
+
+
+class AssertQueriesContext(QueryRecorder):
+    """
+    Records the queries run & calls ``check`` with the recorder once done
+    (unless something went wrong already).
+    """
+    def __init__(self, check):
+        super(AssertQueriesContext, self).__init__()
+        self.check = check
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super(AssertQueriesContext, self).__exit__(exc_type, exc_value, traceback)
+
+        if exc_type is None:
+            self.check(self)
+
 
 class TestApiClient(object):
     def __init__(self, serializer=None):
@@ -223,6 +449,11 @@ class ResourceTestCase(TestCase):
     """
     A useful base class for the start of testing Tastypie APIs.
     """
+    # The path to a JSON file of query budgets, for ``assertQueryBudget``.
+    query_budgets = None
+    # How many times a query may be repeated before it's an N+1 problem.
+    duplicate_query_threshold = 2
+
     def setUp(self):
         super(ResourceTestCase, self).setUp()
         self.serializer = Serializer()
@@ -524,3 +755,108 @@ class ResourceTestCase(TestCase):
         testing the full structure, which can be prone to data changes.
         """
         self.assertEqual(sorted(data.keys()), sorted(expected))
+
+    def record_queries(self):
+        """
+        Returns a context manager recording the SQL run within it (say, by
+        an ``api_client`` call), as a ``QueryRecorder``.
+
+        Usage::
+
+            with self.record_queries() as queries:
+                resp = self.api_client.get('/api/v1/entry/', format='json')
+
+            self.assertEqual(len(queries), 2)
+        """
+        return QueryRecorder()
+
+    def _assert_queries(self, check, func, args, kwargs):
+        context = AssertQueriesContext(check)
+
+        if func is None:
+            return context
+
+        with context:
+            func(*args, **kwargs)
+
+    def assertMaxQueries(self, num, func=None, *args, **kwargs):
+        """
+        Ensures no more than ``num`` queries are run.
+
+        Like Django's ``assertNumQueries``, it can either be used as a
+        context manager or be given a callable (& its arguments) to call.
+        """
+        def check(queries):
+            self.assertTrue(len(queries) <= num, "%d queries were run, more than the %d allowed:\n%s" % (len(queries), num, queries.format()))
+
+        return self._assert_queries(check, func, args, kwargs)
+
+    def assertNoNPlusOneQueries(self, func=None, *args, **kwargs):
+        """
+        Ensures no query is repeated (with different values) by the same
+        related field ``duplicate_query_threshold`` times or more, which
+        usually means it's being run once per object rather than once
+        overall.
+
+        Can either be used as a context manager or be given a callable (&
+        its arguments) to call.
+        """
+        def check(queries):
+            duplicates = queries.get_duplicates(threshold=self.duplicate_query_threshold)
+
+            if duplicates:
+                details = ['%d x %s: %s' % (count, field or '(no related field)', shape) for field, shape, count in duplicates]
+                self.fail("Repeated queries found:\n%s" % '\n'.join(details))
+
+        return self._assert_queries(check, func, args, kwargs)
+
+    def get_query_budgets(self):
+        """
+        Returns the budgets in ``query_budgets``, a dictionary of names to
+        the number of queries allowed.
+        """
+        if self.query_budgets is None:
+            raise NotImplementedError("You must set 'query_budgets' to the path of a JSON file of budgets.")
+
+        if not self.query_budgets in QUERY_BUDGETS:
+            if os.path.exists(self.query_budgets):
+                with open(self.query_budgets) as budgets_file:
+                    QUERY_BUDGETS[self.query_budgets] = json.load(budgets_file)
+            else:
+                QUERY_BUDGETS[self.query_budgets] = {}
+
+        return QUERY_BUDGETS[self.query_budgets]
+
+    def update_query_budget(self, name, num):
+        """
+        Records ``num`` as the budget for ``name`` in the ``query_budgets``
+        file.
+        """
+        budgets = self.get_query_budgets()
+        budgets[name] = num
+
+        with open(self.query_budgets, 'w') as budgets_file:
+            json.dump(budgets, budgets_file, indent=2, sort_keys=True, separators=(',', ': '))
+            budgets_file.write('\n')
+
+    def assertQueryBudget(self, name, func=None, *args, **kwargs):
+        """
+        Ensures no more queries are run than the budget for ``name`` (usually
+        the method & URI of an endpoint, like ``GET /api/v1/entry/``) in the
+        ``query_budgets`` file.
+
+        With the ``TASTYPIE_UPDATE_QUERY_BUDGETS`` environment variable set,
+        the number of queries run is written to the file instead.
+
+        Can either be used as a context manager or be given a callable (&
+        its arguments) to call.
+        """
+        def check(queries):
+            if os.environ.get('TASTYPIE_UPDATE_QUERY_BUDGETS'):
+                return self.update_query_budget(name, len(queries))
+
+            budgets = self.get_query_budgets()
+            self.assertTrue(name in budgets, "There's no query budget for '%s' in '%s'." % (name, self.query_budgets))
+            self.assertTrue(len(queries) <= budgets[name], "'%s' ran %d queries, over its budget of %d:\n%s" % (name, len(queries), budgets[name], queries.format()))
+
+        return self._assert_queries(check, func, args, kwargs)
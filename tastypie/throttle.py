@@ -1,8 +1,54 @@
 from __future__ import unicode_literals
+import threading
 import time
 from django.core.cache import cache
 
 
+class ThrottleStatus(object):
+    """
+    The outcome of a throttle check.
+
+    ``throttled`` is always set. Throttles that track quotas also fill in
+    ``limit`` (the tightest limit), ``remaining`` (how many more requests
+    that limit allows after this one) & ``reset`` (the Unix timestamp at
+    which it resets), which ``Resource`` turns into ``X-RateLimit-*`` &
+    ``Retry-After`` headers.
+
+    ``state`` is private to the throttle & is handed back to its
+    ``accessed`` method, so the access can be recorded without looking
+    anything up again.
+    """
+    def __init__(self, throttled, limit=None, remaining=None, reset=None, state=None):
+        self.throttled = throttled
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.state = state
+
+    def headers(self, now=None):
+        """
+        Returns a list of ``(header, value)`` pairs describing the quota.
+
+        Empty if the throttle doesn't report quotas.
+        """
+        if self.limit is None:
+            return []
+
+        headers = [
+            ('X-RateLimit-Limit', str(self.limit)),
+            ('X-RateLimit-Remaining', str(self.remaining)),
+            ('X-RateLimit-Reset', str(self.reset)),
+        ]
+
+        if self.throttled:
+            if now is None:
+                now = int(time.time())
+
+            headers.append(('Retry-After', str(max(self.reset - now, 0))))
+
+        return headers
+
+
 class BaseThrottle(object):
     """
     A simplified, swappable base class for throttling.
@@ -54,6 +100,15 @@ class BaseThrottle(object):
         """
         return False
 
+    def check(self, identifier, **kwargs):
+        """
+        Returns a ``ThrottleStatus`` for the user.
+
+        This implementation only wraps ``should_be_throttled``, so no quota
+        information is reported.
+        """
+        return ThrottleStatus(self.should_be_throttled(identifier, **kwargs))
+
     def accessed(self, identifier, **kwargs):
         """
         Handles recording the user's access.
@@ -128,3 +183,275 @@ class CacheDBThrottle(CacheThrottle):
             url=kwargs.get('url', ''),
             request_method=kwargs.get('request_method', '')
         )
+
+
+class TieredThrottle(BaseThrottle):
+    """
+    A throttling mechanism that enforces several limits at once, such as a
+    per-second burst limit alongside per-hour & per-day limits.
+
+    Requires a ``tiers`` argument, which should be a list of
+    ``(throttle_at, timeframe)`` pairs. For example::
+
+        TieredThrottle(tiers=[(10, 1), (1000, 3600), (10000, 86400)])
+
+    Each tier counts accesses in fixed windows of ``timeframe`` seconds,
+    under one cache key per tier & window. Checking reads every tier with a
+    single ``get_many``. Recording increments each tier's counter in place
+    (one ``incr`` per tier, since Django's cache API can't increment several
+    keys at once), so concurrent requests from the same user are all
+    counted.
+    """
+    def __init__(self, tiers, expiration=None):
+        if not tiers:
+            raise ValueError("'TieredThrottle' requires at least one '(throttle_at, timeframe)' tier.")
+
+        self.tiers = sorted([(int(throttle_at), int(timeframe)) for throttle_at, timeframe in tiers], key=lambda tier: tier[1])
+
+        if expiration is None:
+            # Long enough to outlive the longest window.
+            expiration = self.tiers[-1][1]
+
+        super(TieredThrottle, self).__init__(throttle_at=self.tiers[0][0], timeframe=self.tiers[0][1], expiration=expiration)
+
+    def get_window_key(self, identifier, timeframe, window_start):
+        return "%s_%s_%s" % (self.convert_identifier_to_key(identifier), timeframe, window_start)
+
+    def current_counts(self, identifier, now):
+        """
+        Returns a list of ``(throttle_at, timeframe, window_start, count)``
+        for the windows that are open at ``now``.
+        """
+        windows = []
+
+        for throttle_at, timeframe in self.tiers:
+            window_start = now - (now % timeframe)
+            windows.append((throttle_at, timeframe, window_start, self.get_window_key(identifier, timeframe, window_start)))
+
+        stored = cache.get_many([window[3] for window in windows])
+        return [(throttle_at, timeframe, window_start, int(stored.get(key) or 0)) for throttle_at, timeframe, window_start, key in windows]
+
+    def check(self, identifier, **kwargs):
+        """
+        Returns a ``ThrottleStatus`` reporting the tightest tier.
+
+        If the user is throttled, ``reset`` is the time at which every
+        exhausted tier has reopened.
+        """
+        now = int(time.time())
+        counts = self.current_counts(identifier, now)
+        exhausted = [tier for tier in counts if tier[3] >= tier[0]]
+
+        if exhausted:
+            throttle_at, timeframe, window_start, count = max(exhausted, key=lambda tier: tier[2] + tier[1])
+            return ThrottleStatus(True, limit=throttle_at, remaining=0, reset=window_start + timeframe, state=now)
+
+        # The tier with the fewest requests left wins; ties go to the one
+        # that resets last.
+        throttle_at, timeframe, window_start, count = min(counts, key=lambda tier: (tier[0] - tier[3], -(tier[2] + tier[1])))
+        return ThrottleStatus(False, limit=throttle_at, remaining=throttle_at - count - 1, reset=window_start + timeframe, state=now)
+
+    def should_be_throttled(self, identifier, **kwargs):
+        """
+        Returns whether or not the user has exceeded any of the tiers.
+        """
+        return self.check(identifier, **kwargs).throttled
+
+    def accessed(self, identifier, **kwargs):
+        """
+        Handles recording the user's access against every tier.
+
+        If handed the ``status`` from ``check``, the access is counted in the
+        windows that were open when it was checked. Nothing is read back, as
+        each counter is incremented in the cache. That's one ``incr`` per
+        tier, plus an ``add`` (& another ``incr`` if a concurrent request
+        created it first) for a window that hasn't been counted in yet.
+        """
+        status = kwargs.get('status')
+        now = int(time.time())
+
+        if status is not None and status.state is not None:
+            now = status.state
+
+        for throttle_at, timeframe in self.tiers:
+            key = self.get_window_key(identifier, timeframe, now - (now % timeframe))
+
+            try:
+                cache.incr(key)
+            except ValueError:
+                if not cache.add(key, 1, self.expiration):
+                    # Another request beat us to creating it.
+                    cache.incr(key)
+
+
+class ApproximateCacheThrottle(BaseThrottle):
+    """
+    A throttling mechanism that counts accesses in-process & only
+    periodically reconciles them with the cache.
+
+    Meant for high-traffic limits where precision matters less than keeping
+    cache traffic off the request path. Most requests never touch the cache.
+
+    Accepts the same arguments as ``BaseThrottle``, plus:
+
+        * ``overshoot`` - required. The number of accesses a process may
+          record locally before it must push them to the cache. This is
+          also how far past ``throttle_at`` each process may let a user go,
+          so with N processes a user may make up to
+          ``throttle_at + N * overshoot`` requests in a timeframe.
+        * ``sync_interval`` - the maximum number of seconds between
+          reconciliations for an active user. Default is 5 seconds.
+
+    Accesses are counted in fixed windows of ``timeframe`` seconds.
+    """
+    def __init__(self, throttle_at=150, timeframe=3600, expiration=None, overshoot=None, sync_interval=5):
+        if overshoot is None or int(overshoot) < 1:
+            raise ValueError("'ApproximateCacheThrottle' requires an explicit 'overshoot' of at least 1.")
+
+        if expiration is None:
+            # The counters are per-window, so there's no point keeping them
+            # around any longer than that.
+            expiration = timeframe
+
+        super(ApproximateCacheThrottle, self).__init__(throttle_at=throttle_at, timeframe=timeframe, expiration=expiration)
+        self.overshoot = int(overshoot)
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        # identifier -> [window_start, shared_count, pending, synced_at]
+        self._counts = {}
+        self._swept_window = None
+
+    def get_window_start(self, now):
+        return now - (now % int(self.timeframe))
+
+    def get_window_key(self, identifier, window_start):
+        return "%s_%s" % (self.convert_identifier_to_key(identifier), window_start)
+
+    def _entry(self, identifier, now):
+        # Must be called with the lock held.
+        window_start = self.get_window_start(now)
+
+        if window_start != self._swept_window:
+            # Once per window, forget the users from older windows so idle
+            # users don't pile up.
+            for stale_identifier, stale_entry in list(self._counts.items()):
+                if stale_entry[0] != window_start:
+                    del(self._counts[stale_identifier])
+
+            self._swept_window = window_start
+
+        entry = self._counts.get(identifier)
+
+        if entry is None or entry[0] != window_start:
+            # New user or a new window. Anything pending was for a window
+            # that's over, so it can be dropped.
+            entry = [window_start, 0, 0, None]
+            self._counts[identifier] = entry
+
+        return entry
+
+    def reconcile(self, identifier, now=None):
+        """
+        Pushes the locally pending accesses for ``identifier`` to the cache &
+        refreshes the shared count from it.
+        """
+        if now is None:
+            now = int(time.time())
+
+        with self._lock:
+            entry = self._entry(identifier, now)
+            window_start, delta = entry[0], entry[2]
+            entry[2] = 0
+
+        key = self.get_window_key(identifier, window_start)
+
+        if delta:
+            try:
+                shared = cache.incr(key, delta)
+            except ValueError:
+                if cache.add(key, delta, self.expiration):
+                    shared = delta
+                else:
+                    # Another process beat us to creating it.
+                    shared = cache.incr(key, delta)
+        else:
+            shared = cache.get(key, 0)
+
+        with self._lock:
+            entry = self._entry(identifier, now)
+
+            if entry[0] == window_start:
+                entry[1] = shared
+                entry[3] = now
+
+        return shared
+
+    def flush(self):
+        """
+        Pushes every pending access for the current window to the cache.
+
+        Useful before a process shuts down.
+        """
+        now = int(time.time())
+        window_start = self.get_window_start(now)
+
+        with self._lock:
+            pending = [identifier for identifier, entry in self._counts.items() if entry[0] == window_start and entry[2]]
+
+        for identifier in pending:
+            self.reconcile(identifier, now=now)
+
+    def needs_reconcile(self, entry, now):
+        # Must be called with the lock held.
+        return entry[3] is None or now - entry[3] >= self.sync_interval or entry[2] >= self.overshoot
+
+    def check(self, identifier, **kwargs):
+        """
+        Returns a ``ThrottleStatus`` based on the local view of the user's
+        accesses, reconciling with the cache first if that view is stale.
+        """
+        now = int(time.time())
+
+        with self._lock:
+            entry = self._entry(identifier, now)
+            stale = self.needs_reconcile(entry, now)
+
+        if stale:
+            self.reconcile(identifier, now=now)
+
+        with self._lock:
+            entry = self._entry(identifier, now)
+            count = entry[1] + entry[2]
+            window_start = entry[0]
+
+        throttle_at = int(self.throttle_at)
+        reset = window_start + int(self.timeframe)
+
+        if count >= throttle_at:
+            return ThrottleStatus(True, limit=throttle_at, remaining=0, reset=reset)
+
+        return ThrottleStatus(False, limit=throttle_at, remaining=throttle_at - count - 1, reset=reset)
+
+    def should_be_throttled(self, identifier, **kwargs):
+        """
+        Returns whether or not the user has (approximately) exceeded their
+        throttle limit.
+        """
+        return self.check(identifier, **kwargs).throttled
+
+    def accessed(self, identifier, **kwargs):
+        """
+        Handles recording the user's access.
+
+        Only counts the access locally, unless enough accesses have piled up
+        (or enough time has passed) to warrant reconciling with the cache.
+        """
+        now = int(time.time())
+
+        with self._lock:
+            entry = self._entry(identifier, now)
+            entry[2] += 1
+            stale = self.needs_reconcile(entry, now)
+
+        if stale:
+            self.reconcile(identifier, now=now)
@@ -0,0 +1,302 @@
+from __future__ import unicode_literals
+import logging
+import re
+import socket
+import threading
+import time
+import timeit
+
+from django.conf import settings
+from django.db import connections
+
+from tastypie.compat import queries_logged
+
+
+# ``time.monotonic`` on Python 3, the best clock available on Python 2.
+monotonic = getattr(time, 'monotonic', timeit.default_timer)
+
+
+class NullPhase(object):
+    """
+    Stands in for a ``Phase`` when the request isn't being timed.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_PHASE = NullPhase()
+
+
+class Phase(object):
+    """
+    Times one phase of a request (& counts its queries, if asked to).
+    """
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.queries = self.timer.query_count()
+        self.started = monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timer.add(self.name, monotonic() - self.started, self.timer.query_count() - self.queries)
+        return False
+
+
+class RequestTimer(object):
+    """
+    Collects the timings of the phases of a single request.
+
+    ``phases`` maps each phase name to a ``[seconds, queries]`` pair, adding
+    up phases that happen more than once, & ``phase_names`` lists them in the
+    order first seen. Queries are only counted if ``count_queries`` is set.
+    """
+    def __init__(self, count_queries=False):
+        self.count_queries = count_queries
+        self.phases = {}
+        self.phase_names = []
+        self.duration = None
+        self._logged = []
+
+        if count_queries:
+            # Same as ``assertNumQueries``: the debug cursor records queries
+            # even when ``DEBUG`` is off.
+            for connection in connections.all():
+                self._logged.append((connection, connection.use_debug_cursor, len(connection.queries)))
+                connection.use_debug_cursor = True
+
+        self.started = monotonic()
+
+    def query_count(self):
+        """
+        Returns how many queries have been run since the timer started.
+        """
+        if not self.count_queries:
+            return 0
+
+        return sum([len(connection.queries) - count for connection, use_debug_cursor, count in self._logged])
+
+    def phase(self, name):
+        return Phase(self, name)
+
+    def add(self, name, duration, queries=0):
+        if not name in self.phases:
+            self.phases[name] = [0, 0]
+            self.phase_names.append(name)
+
+        self.phases[name][0] += duration
+        self.phases[name][1] += queries
+
+    def ordered_phases(self):
+        """
+        Returns a list of ``(name, [seconds, queries])`` pairs, in the order
+        the phases were first seen.
+        """
+        return [(name, self.phases[name]) for name in self.phase_names]
+
+    def stop(self):
+        """
+        Records the total time & puts the connections back as they were.
+        """
+        if self.duration is not None:
+            return
+
+        self.duration = monotonic() - self.started
+        queries = self.query_count()
+
+        for connection, use_debug_cursor, count in self._logged:
+            connection.use_debug_cursor = use_debug_cursor
+
+            # Don't keep queries that only got logged for counting.
+            if not queries_logged(connection):
+                del(connection.queries[count:])
+
+        self.add('total', self.duration, queries)
+
+
+class NoTiming(object):
+    """
+    A simplified, swappable base class for timing requests.
+
+    Does nothing, so requests aren't slowed down at all.
+    """
+    enabled = False
+
+    def start(self, request):
+        """
+        Starts timing the request, returning the ``RequestTimer`` (or
+        ``None`` if it isn't being timed).
+        """
+        return None
+
+    def finish(self, resource, request, response):
+        """
+        Stops timing the request & reports on it.
+        """
+        pass
+
+
+class Timing(NoTiming):
+    """
+    Times each phase of every request (authentication, throttling, queries,
+    pagination, dehydration, serialization & building the response).
+
+    The timings are handed to the ``sink`` (if there is one) & optionally
+    sent back in a ``Server-Timing`` header. With ``count_queries``, the
+    number of queries run in each phase is recorded as well.
+    """
+    enabled = True
+
+    def __init__(self, sink=None, server_timing=False, count_queries=False):
+        self.sink = sink
+        self.server_timing = server_timing
+        self.count_queries = count_queries
+
+    def start(self, request):
+        timer = RequestTimer(count_queries=self.count_queries)
+        request._tastypie_timer = timer
+        return timer
+
+    def finish(self, resource, request, response):
+        timer = getattr(request, '_tastypie_timer', None)
+
+        if timer is None:
+            return
+
+        del(request._tastypie_timer)
+        timer.stop()
+
+        if self.server_timing:
+            response['Server-Timing'] = self.build_server_timing(timer)
+
+        if self.sink is not None:
+            self.sink.record(resource._meta.resource_name, request.method, timer)
+
+    def build_server_timing(self, timer):
+        """
+        Returns the value of the ``Server-Timing`` header, with durations in
+        milliseconds.
+        """
+        metrics = []
+
+        for name, (duration, queries) in timer.ordered_phases():
+            metric = '%s;dur=%.3f' % (name, duration * 1000)
+
+            if self.count_queries:
+                metric += ';desc="%d queries"' % queries
+
+            metrics.append(metric)
+
+        return ', '.join(metrics)
+
+
+class BaseTimingSink(object):
+    """
+    A simplified, swappable base class for where timings go.
+
+    Throws them away.
+    """
+    def record(self, resource_name, method, timer):
+        pass
+
+
+class LoggingTimingSink(BaseTimingSink):
+    """
+    Logs a line per request, with the timings in ``extra`` as well.
+    """
+    def __init__(self, logger='tastypie.timing', level=logging.INFO):
+        self.logger = logging.getLogger(logger)
+        self.level = level
+
+    def record(self, resource_name, method, timer):
+        if not self.logger.isEnabledFor(self.level):
+            return
+
+        phases = ' '.join(['%s=%.3fms/%dq' % (name, duration * 1000, queries) for name, (duration, queries) in timer.ordered_phases()])
+        self.logger.log(self.level, '%s %s %s' % (method, resource_name, phases), extra={
+            'resource_name': resource_name,
+            'method': method,
+            'phases': dict(timer.phases),
+        })
+
+
+class StatsdTimingSink(BaseTimingSink):
+    """
+    Sends the timings to a statsd-style server over UDP, as one packet per
+    request. Each phase is sent as ``<prefix>.<resource>.<method>.<phase>``
+    (a timer, in milliseconds) plus a ``.queries`` counter if queries are
+    counted.
+
+    Sending is best-effort; errors are ignored.
+    """
+    def __init__(self, host=None, port=None, prefix='tastypie'):
+        self.address = (host or getattr(settings, 'TASTYPIE_STATSD_HOST', 'localhost'), port or getattr(settings, 'TASTYPIE_STATSD_PORT', 8125))
+        self.prefix = prefix
+        self._socket = None
+
+    def get_socket(self):
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        return self._socket
+
+    def format_key(self, *bits):
+        return '.'.join([re.sub(r'[^\w-]', '_', bit) for bit in bits])
+
+    def record(self, resource_name, method, timer):
+        lines = []
+
+        for name, (duration, queries) in timer.ordered_phases():
+            key = self.format_key(self.prefix, resource_name, method.lower(), name)
+            lines.append('%s:%.3f|ms' % (key, duration * 1000))
+
+            if timer.count_queries:
+                lines.append('%s.queries:%d|c' % (key, queries))
+
+        try:
+            self.get_socket().sendto('\n'.join(lines).encode('utf-8'), self.address)
+        except (socket.error, socket.gaierror):
+            pass
+
+
+class AggregateTimingSink(BaseTimingSink):
+    """
+    Keeps running totals in the process, for looking at from a shell, a
+    management command or a test.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def record(self, resource_name, method, timer):
+        with self._lock:
+            for name, (duration, queries) in timer.ordered_phases():
+                key = (resource_name, method, name)
+                stats = self._stats.setdefault(key, {'count': 0, 'total': 0, 'max': 0, 'queries': 0})
+                stats['count'] += 1
+                stats['total'] += duration
+                stats['max'] = max(stats['max'], duration)
+                stats['queries'] += queries
+
+    def stats(self):
+        """
+        Returns a dict of ``(resource_name, method, phase)`` to the ``count``
+        of requests, ``total``, ``max`` & ``mean`` seconds & the ``queries``
+        run.
+        """
+        with self._lock:
+            stats = {}
+
+            for key, values in self._stats.items():
+                stats[key] = dict(values, mean=values['total'] / values['count'])
+
+            return stats
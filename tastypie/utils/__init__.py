@@ -3,3 +3,5 @@ from tastypie.utils.formatting import mk_datetime, format_datetime, format_date,
 from tastypie.utils.urls import trailing_slash
 from tastypie.utils.validate_jsonp import is_valid_jsonp_callback_value
 from tastypie.utils.timezone import now, make_aware, make_naive, aware_date, aware_datetime
+from tastypie.utils.lru import LRUCache
+from tastypie.utils.etags import make_etag, etag_matches, cached_response
@@ -0,0 +1,56 @@
+from __future__ import unicode_literals
+from hashlib import sha1
+
+from django.core.urlresolvers import get_script_prefix, get_urlconf
+from django.http import HttpResponse
+from django.utils.encoding import force_bytes
+from django.utils.http import parse_etags, quote_etag
+
+from tastypie.http import HttpNotModified
+
+
+def make_etag(content):
+    """
+    Returns a strong ``ETag`` for the given content.
+    """
+    return quote_etag(sha1(force_bytes(content)).hexdigest())
+
+
+def etag_matches(request, etag):
+    """
+    Returns ``True`` if the request's ``If-None-Match`` header includes
+    ``etag``.
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+
+    if not header:
+        return False
+
+    etags = parse_etags(header)
+    return '*' in etags or parse_etags(etag)[0] in etags
+
+
+def cached_response(request, responses, key, serialize, content_type):
+    """
+    Returns a response for content that doesn't change at runtime.
+
+    ``serialize`` is only called the first time for each ``key`` (& script
+    prefix/URLconf); the bytes & their ``ETag`` are kept in the ``responses``
+    dict after that. A matching ``If-None-Match`` gets a 304.
+    """
+    key = (key, get_script_prefix(), get_urlconf())
+    cached = responses.get(key)
+
+    if cached is None:
+        content = force_bytes(serialize())
+        cached = responses[key] = (content, make_etag(content))
+
+    content, etag = cached
+
+    if etag_matches(request, etag):
+        response = HttpNotModified()
+    else:
+        response = HttpResponse(content=content, content_type=content_type)
+
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,74 @@
+from __future__ import unicode_literals
+import threading
+
+
+# Where things live in each link of the list.
+PREV, NEXT, KEY, VALUE = 0, 1, 2, 3
+
+
+class LRUCache(object):
+    """
+    A small, thread-safe mapping that forgets its least recently used entries
+    once it holds more than ``max_size`` of them.
+
+    A ``max_size`` of ``0`` disables it.
+
+    Entries are kept in a dictionary & a circular, doubly linked list (oldest
+    first), so every operation takes constant time.
+    """
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self._data = {}
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _unlink(self, link):
+        link[PREV][NEXT] = link[NEXT]
+        link[NEXT][PREV] = link[PREV]
+
+    def _append(self, link):
+        last = self._root[PREV]
+        link[PREV] = last
+        link[NEXT] = self._root
+        last[NEXT] = self._root[PREV] = link
+
+    def get(self, key, default=None):
+        with self._lock:
+            link = self._data.get(key)
+
+            if link is None:
+                return default
+
+            self._unlink(link)
+            self._append(link)
+            return link[VALUE]
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            link = self._data.get(key)
+
+            if link is not None:
+                self._unlink(link)
+                link[VALUE] = value
+            else:
+                link = [None, None, key, value]
+                self._data[key] = link
+
+            self._append(link)
+
+            while len(self._data) > self.max_size:
+                oldest = self._root[NEXT]
+                self._unlink(oldest)
+                del(self._data[oldest[KEY]])
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._root[:] = [self._root, self._root, None, None]
@@ -0,0 +1,45 @@
+from __future__ import unicode_literals
+import threading
+
+from django.core.urlresolvers import get_script_prefix, set_script_prefix, get_urlconf, set_urlconf
+from django.utils import timezone, translation
+
+
+class ThreadState(object):
+    """
+    Captures the per-thread state a request is handled with (the script
+    prefix, URLconf, language & time zone), so it can be carried over to
+    another thread.
+
+    Used as a context manager (from any number of threads), it applies the
+    captured state & puts back whatever the thread had before on the way out.
+    """
+    def __init__(self):
+        self.state = self.capture()
+        self._local = threading.local()
+
+    def capture(self):
+        return (get_script_prefix(), get_urlconf(), translation.get_language(), timezone.get_current_timezone())
+
+    def apply(self, state):
+        script_prefix, urlconf, language, current_timezone = state
+        set_script_prefix(script_prefix)
+        set_urlconf(urlconf)
+        timezone.activate(current_timezone)
+
+        if language is None:
+            translation.deactivate()
+        else:
+            translation.activate(language)
+
+    def __enter__(self):
+        if not hasattr(self._local, 'previous'):
+            self._local.previous = []
+
+        self._local.previous.append(self.capture())
+        self.apply(self.state)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.apply(self._local.previous.pop())
+        return False
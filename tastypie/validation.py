@@ -1,7 +1,17 @@
 from __future__ import unicode_literals
-from django.core.exceptions import ImproperlyConfigured
+from decimal import Decimal
+
+from dateutil.parser import parse
+from django.core import validators
+from django.core.exceptions import ImproperlyConfigured, NON_FIELD_ERRORS, ValidationError
+from django.db.models import ManyToManyField, Model, Q
+from django.db.models.fields import FieldDoesNotExist
 from django.forms import ModelForm
-from django.forms.models import model_to_dict
+from django.forms.forms import BaseForm
+from django.forms.models import BaseModelForm, model_to_dict, modelform_factory
+from django.utils import six
+
+from tastypie.exceptions import ApiFieldError
 
 
 class Validation(object):
@@ -23,6 +33,30 @@ class Validation(object):
         """
         return {}
 
+    def is_valid_list(self, bundles, request=None):
+        """
+        Performs the same check as ``is_valid`` on many bundles at once, such
+        as the new objects of a list write.
+
+        Should return a list of error dictionaries, one per bundle. By
+        default, this calls ``is_valid`` for each bundle.
+        """
+        return [self.is_valid(bundle, request) for bundle in bundles]
+
+    def check_data(self, resource, data, request=None, partial=False):
+        """
+        Performs a check on the data sent to ``resource``, before it's
+        hydrated (or anything is looked up), so bad data can be turned away
+        cheaply.
+
+        ``partial`` is ``True`` when the data may only update some of the
+        fields of an existing object.
+
+        Should return a dictionary of error messages, like ``is_valid``. By
+        default, this does no checking.
+        """
+        return {}
+
 
 class FormValidation(Validation):
     """
@@ -108,3 +142,495 @@ class CleanedDataFormValidation(FormValidation):
         # The data is invalid. Let's collect all the error messages & return
         # them.
         return form.errors
+
+
+class CompiledFormValidation(Validation):
+    """
+    A validation class that checks the data against a Django ``Form``,
+    without building a form (or loading the whole object, as
+    ``model_to_dict`` does) for every bundle.
+
+    The form's fields are read once per form class & used to clean plain
+    dicts directly. Only the form fields missing from ``bundle.data`` are
+    filled in from ``bundle.obj``.
+
+    This class accepts an optional ``form_class`` argument, which should be a
+    Django ``Form`` or ``ModelForm`` class. Without one, a ``ModelForm`` is
+    built from the (non-related, editable) fields of the model behind
+    ``bundle.obj``.
+
+    For a ``ModelForm``, ``is_valid_list`` checks the uniqueness of a whole
+    list of bundles with one query per unique field (or ``unique_together``)
+    rather than one per bundle.
+
+    Forms with their own ``clean``/``clean_<field>`` methods (or models with
+    their own ``clean``) can't be compiled, so those are still validated with
+    a real form per bundle. Like ``FormValidation``, this class **DOES NOT**
+    alter the data sent.
+    """
+    # The most values looked up in a single uniqueness query.
+    unique_query_size = 500
+
+    def __init__(self, **kwargs):
+        self.form_class = kwargs.pop('form_class', None)
+        self._compiled = {}
+        super(CompiledFormValidation, self).__init__(**kwargs)
+
+        if self.form_class is not None:
+            self.compile(self.form_class)
+
+    def get_compiled(self, bundle):
+        """
+        Returns what ``compile`` worked out for the form used with ``bundle``.
+        """
+        if self.form_class is not None:
+            return self._compiled[self.form_class]
+
+        model = type(bundle.obj)
+
+        if not hasattr(model, '_meta'):
+            raise ImproperlyConfigured("'CompiledFormValidation' needs either a 'form_class' or a model instance in 'bundle.obj'.")
+
+        if not model in self._compiled:
+            field_names = [field.name for field in model._meta.fields if field.editable and field.rel is None]
+            self.compile(modelform_factory(model, fields=field_names), key=model)
+
+        return self._compiled[model]
+
+    def compile(self, form_class, key=None):
+        """
+        Reads everything needed to validate against ``form_class`` once, so
+        it doesn't have to be worked out for every bundle.
+        """
+        model = None
+        custom_clean = False
+
+        for name in dir(form_class):
+            if name.startswith('clean_') and name[6:] in form_class.base_fields:
+                custom_clean = True
+
+        base_form = BaseModelForm if issubclass(form_class, BaseModelForm) else BaseForm
+
+        for name in ('clean', '_post_clean'):
+            if six.get_unbound_function(getattr(form_class, name)) is not six.get_unbound_function(getattr(base_form, name)):
+                custom_clean = True
+
+        unique_checks = []
+        model_fields = {}
+
+        if issubclass(form_class, BaseModelForm):
+            model = form_class._meta.model
+
+            if six.get_unbound_function(model.clean) is not six.get_unbound_function(Model.clean):
+                custom_clean = True
+
+            exclude = [field.name for field in model._meta.fields if not field.name in form_class.base_fields]
+            unique_checks, date_checks = model()._get_unique_checks(exclude=exclude)
+
+            if date_checks:
+                custom_clean = True
+
+            for field in model._meta.fields:
+                if field.name in form_class.base_fields and field.rel is None:
+                    model_fields[field.name] = field
+
+        compiled = {
+            'form_class': form_class,
+            'fields': form_class.base_fields,
+            'model': model,
+            'model_fields': model_fields,
+            'unique_checks': unique_checks,
+            'custom_clean': custom_clean,
+        }
+        self._compiled[key or form_class] = compiled
+        return compiled
+
+    def get_data(self, bundle, form_class):
+        """
+        Returns ``bundle.data``, plus whatever fields of ``form_class`` it's
+        missing that ``bundle.obj`` can provide.
+        """
+        data = {}
+
+        if hasattr(bundle.obj, 'pk'):
+            opts = bundle.obj._meta
+
+            for name in form_class.base_fields:
+                if bundle.data and name in bundle.data:
+                    continue
+
+                try:
+                    field = opts.get_field(name)
+                except FieldDoesNotExist:
+                    continue
+
+                if isinstance(field, ManyToManyField):
+                    if bundle.obj.pk is not None:
+                        data[name] = [item.pk for item in field.value_from_object(bundle.obj)]
+                else:
+                    data[name] = field.value_from_object(bundle.obj)
+
+        data.update(bundle.data or {})
+        return data
+
+    def clean(self, compiled, data):
+        """
+        Cleans ``data`` with the form's fields (& the model's validators, for
+        a ``ModelForm``), returning the cleaned data & any errors.
+        """
+        cleaned_data = {}
+        errors = {}
+
+        for name, field in compiled['fields'].items():
+            value = field.widget.value_from_datadict(data, {}, name)
+
+            try:
+                cleaned_data[name] = field.clean(value)
+            except ValidationError as e:
+                errors[name] = e.messages
+
+        for name, model_field in compiled['model_fields'].items():
+            value = cleaned_data.get(name)
+
+            if name in errors or value in getattr(model_field, 'empty_values', validators.EMPTY_VALUES):
+                continue
+
+            try:
+                model_field.run_validators(value)
+            except ValidationError as e:
+                errors[name] = e.messages
+
+        return cleaned_data, errors
+
+    def is_valid(self, bundle, request=None):
+        """
+        Performs a check on ``bundle.data`` to ensure it is valid.
+
+        If the data is valid, an empty dictionary will be returned. If not, a
+        dictionary of errors will be returned.
+        """
+        return self.is_valid_list([bundle], request=request)[0]
+
+    def is_valid_list(self, bundles, request=None):
+        """
+        Performs a check on the ``data`` of each of the ``bundles``, returning
+        a dictionary of errors for each of them (empty if it's valid).
+        """
+        if not bundles:
+            return []
+
+        compiled = self.get_compiled(bundles[0])
+        form_class = compiled['form_class']
+        results = []
+        rows = []
+
+        for bundle in bundles:
+            data = self.get_data(bundle, form_class)
+
+            if compiled['custom_clean']:
+                kwargs = {'data': data}
+
+                if compiled['model'] is not None and hasattr(bundle.obj, 'pk'):
+                    kwargs['instance'] = bundle.obj
+
+                form = form_class(**kwargs)
+                results.append({} if form.is_valid() else form.errors)
+                continue
+
+            cleaned_data, errors = self.clean(compiled, data)
+            results.append(errors)
+            rows.append((bundle, cleaned_data, errors))
+
+        if compiled['unique_checks'] and rows:
+            self.validate_unique(compiled, rows)
+
+        return results
+
+    def validate_unique(self, compiled, rows):
+        """
+        Checks each of the model's unique fields (& ``unique_together``) for
+        all the ``rows`` at once, with one query apiece.
+
+        Values repeated within the rows count as duplicates too.
+        """
+        for model_class, unique_check in compiled['unique_checks']:
+            seen = {}
+            lookups = []
+
+            for bundle, cleaned_data, errors in rows:
+                if any(name in errors for name in unique_check):
+                    continue
+
+                values = tuple(self.lookup_value(cleaned_data.get(name)) for name in unique_check)
+
+                if any(value is None for value in values):
+                    continue
+
+                if values in seen:
+                    self.add_unique_error(bundle, errors, model_class, unique_check)
+                    continue
+
+                seen[values] = True
+                lookups.append((bundle, errors, values))
+
+            existing = {}
+            keys = [values for bundle, errors, values in lookups]
+            manager = model_class._default_manager
+
+            for start in range(0, len(keys), self.unique_query_size):
+                chunk = keys[start:start + self.unique_query_size]
+
+                if len(unique_check) == 1:
+                    object_list = manager.filter(**{'%s__in' % unique_check[0]: [values[0] for values in chunk]})
+                else:
+                    query = Q()
+
+                    for values in chunk:
+                        query |= Q(**dict(zip(unique_check, values)))
+
+                    object_list = manager.filter(query)
+
+                for row in object_list.values_list('pk', *unique_check):
+                    existing.setdefault(tuple(row[1:]), set()).add(row[0])
+
+            for bundle, errors, values in lookups:
+                pk = getattr(bundle.obj, 'pk', None)
+
+                if existing.get(values, set()) - set([pk]):
+                    self.add_unique_error(bundle, errors, model_class, unique_check)
+
+    def lookup_value(self, value):
+        return getattr(value, 'pk', value)
+
+    def add_unique_error(self, bundle, errors, model_class, unique_check):
+        instance = bundle.obj if isinstance(bundle.obj, model_class) else model_class()
+        key = unique_check[0] if len(unique_check) == 1 else NON_FIELD_ERRORS
+        # Older versions of Django return a plain string rather than a
+        # ``ValidationError``.
+        message = instance.unique_error_message(model_class, unique_check)
+        errors.setdefault(key, []).extend(ValidationError(message).messages)
+
+
+class SchemaValidation(Validation):
+    """
+    A validation class that checks the data sent against the resource's
+    schema (see ``Resource.build_schema``), before any of it is hydrated or
+    the database is touched.
+
+    The checks for each field (type, nullability & any constraints from
+    ``Meta.field_constraints``) are compiled once per resource class into a
+    single function.
+
+    Read-only & unknown fields are ignored, since they're never saved.
+    """
+    # What the data sent should look like, for each field type.
+    type_descriptions = {
+        'string': 'a string',
+        'integer': 'an integer',
+        'float': 'a number',
+        'decimal': 'a number',
+        'boolean': 'a boolean',
+        'date': 'a date',
+        'datetime': 'a date & time',
+        'time': 'a time',
+        'list': 'a list',
+        'dict': 'an object',
+        'to_one': 'a URI or an object',
+        'to_many': 'a list of URIs or objects',
+    }
+    boolean_strings = ('true', 'false', '1', '0')
+    constraint_names = ('required', 'max_length', 'min_length', 'min_value', 'max_value', 'choices')
+
+    def __init__(self, **kwargs):
+        self._validators = {}
+        super(SchemaValidation, self).__init__(**kwargs)
+
+    def check_data(self, resource, data, request=None, partial=False):
+        validator = self._validators.get(type(resource))
+
+        if validator is None:
+            validator = self._validators[type(resource)] = self.compile(resource)
+
+        return validator(data, partial)
+
+    def compile(self, resource):
+        """
+        Builds the function that checks data sent to ``resource``, which takes
+        the data & whether it's a partial update.
+        """
+        schema = resource.build_schema()['fields']
+        constraints = resource._meta.field_constraints or {}
+        checks = []
+        required = []
+
+        for field_name, field_constraints in constraints.items():
+            if not field_name in schema:
+                raise ImproperlyConfigured("'field_constraints' on '%s' refers to the unknown field '%s'." % (resource._meta.resource_name, field_name))
+
+            for name in field_constraints:
+                if not name in self.constraint_names:
+                    raise ImproperlyConfigured("'field_constraints' on '%s' has an unknown constraint '%s' for the '%s' field." % (resource._meta.resource_name, name, field_name))
+
+        for field_name, field_schema in schema.items():
+            if field_schema['readonly']:
+                continue
+
+            field_constraints = constraints.get(field_name, {})
+            checks.append((field_name, self.compile_field(resource.fields[field_name], field_schema, field_constraints)))
+
+            if field_constraints.get('required'):
+                required.append(field_name)
+
+        def validate(data, partial=False):
+            if not isinstance(data, dict):
+                return {NON_FIELD_ERRORS: ['Expected an object.']}
+
+            errors = {}
+
+            for field_name, check in checks:
+                if field_name in data:
+                    messages = check(data[field_name])
+
+                    if messages:
+                        errors[field_name] = messages
+                elif not partial and field_name in required:
+                    errors[field_name] = ['This field is required.']
+
+            return errors
+
+        return validate
+
+    def compile_field(self, field_object, field_schema, constraints):
+        """
+        Builds the function that checks a single value sent for
+        ``field_object``, returning a list of error messages.
+        """
+        field_type = field_schema.get('related_type', field_schema['type'])
+        type_check = getattr(self, 'check_%s' % field_type, None)
+        type_message = 'Expected %s.' % self.type_descriptions.get(field_type, field_type)
+        nullable = field_schema['nullable']
+        constraint_checks = []
+
+        if 'max_length' in constraints:
+            constraint_checks.append(lambda value, limit=constraints['max_length']: 'Ensure this value has at most %s items or characters.' % limit if len(value) > limit else None)
+
+        if 'min_length' in constraints:
+            constraint_checks.append(lambda value, limit=constraints['min_length']: 'Ensure this value has at least %s items or characters.' % limit if len(value) < limit else None)
+
+        if 'min_value' in constraints:
+            constraint_checks.append(lambda value, limit=constraints['min_value']: 'Ensure this value is greater than or equal to %s.' % limit if value < limit else None)
+
+        if 'max_value' in constraints:
+            constraint_checks.append(lambda value, limit=constraints['max_value']: 'Ensure this value is less than or equal to %s.' % limit if value > limit else None)
+
+        if 'choices' in constraints:
+            choices = [choice[0] if isinstance(choice, (list, tuple)) else choice for choice in constraints['choices']]
+            constraint_checks.append(lambda value: 'Select a valid choice. %s is not one of the available choices.' % value if not value in choices else None)
+
+        def check(value):
+            if value is None:
+                return [] if nullable else ['This field may not be null.']
+
+            if type_check is not None:
+                try:
+                    value = type_check(field_object, value)
+                except (TypeError, ValueError, ArithmeticError, OverflowError, ApiFieldError):
+                    return [type_message]
+
+            messages = []
+
+            for constraint_check in constraint_checks:
+                try:
+                    message = constraint_check(value)
+                except TypeError:
+                    message = type_message
+
+                if message:
+                    messages.append(message)
+
+            return messages
+
+        return check
+
+    # Each of these returns the value as it'll be saved, or raises an error
+    # if it isn't of the right type.
+
+    def check_string(self, field_object, value):
+        if isinstance(value, (dict, list, tuple, bool)):
+            raise TypeError()
+
+        return six.text_type(value)
+
+    def check_integer(self, field_object, value):
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise TypeError()
+
+        return int(value)
+
+    def check_float(self, field_object, value):
+        if isinstance(value, bool):
+            raise TypeError()
+
+        return float(value)
+
+    def check_decimal(self, field_object, value):
+        if isinstance(value, bool):
+            raise TypeError()
+
+        return Decimal(six.text_type(value))
+
+    def check_boolean(self, field_object, value):
+        if isinstance(value, bool) or value in (0, 1):
+            return bool(value)
+
+        if isinstance(value, six.string_types) and value.lower() in self.boolean_strings:
+            return value.lower() in ('true', '1')
+
+        raise TypeError()
+
+    def check_datetime(self, field_object, value):
+        if hasattr(value, 'year'):
+            return value
+
+        if not isinstance(value, six.string_types):
+            raise TypeError()
+
+        return parse(value)
+
+    check_date = check_datetime
+
+    def check_time(self, field_object, value):
+        if hasattr(value, 'hour'):
+            return value
+
+        if not isinstance(value, six.string_types):
+            raise TypeError()
+
+        return parse(value).time()
+
+    def check_list(self, field_object, value):
+        if not isinstance(value, (list, tuple)):
+            raise TypeError()
+
+        return value
+
+    def check_dict(self, field_object, value):
+        if not isinstance(value, dict):
+            raise TypeError()
+
+        return value
+
+    def check_to_one(self, field_object, value):
+        if not isinstance(value, six.string_types + (dict,)) and not hasattr(value, 'pk'):
+            raise TypeError()
+
+        return value
+
+    def check_to_many(self, field_object, value):
+        if not isinstance(value, (list, tuple)):
+            raise TypeError()
+
+        for item in value:
+            self.check_to_one(field_object, item)
+
+        return value
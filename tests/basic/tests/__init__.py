@@ -1,3 +1,4 @@
 from basic.tests.http import *
+from basic.tests.queries import *
 from basic.tests.resources import *
 from basic.tests.views import *
\ No newline at end of file
@@ -0,0 +1,14 @@
+import os
+
+from tastypie.test import ResourceTestCase
+
+
+class QueryBudgetTestCase(ResourceTestCase):
+    fixtures = ['test_data.json']
+    query_budgets = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'query_budgets.json')
+
+    def test_budgets(self):
+        for uri in ['/api/v1/', '/api/v1/notes/', '/api/v1/notes/1/', '/api/v1/notes/schema/', '/api/v1/users/', '/api/v1/users/1/', '/api/v2/slugbased/', '/api/v2/slugbased/first-post/']:
+            with self.assertQueryBudget('GET %s' % uri):
+                self.assertHttpOK(self.api_client.get(uri, format='json'))
+
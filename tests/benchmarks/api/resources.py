@@ -0,0 +1,67 @@
+from tastypie import fields
+from tastypie.authorization import Authorization
+from tastypie.resources import ModelResource
+from benchmarks.models import WideRow, Country, Region, City, Street, Address, Tag, Article
+
+
+class WideRowResource(ModelResource):
+    class Meta:
+        resource_name = 'widerows'
+        queryset = WideRow.objects.all()
+        authorization = Authorization()
+        limit = 50
+        ordering = ['id']
+
+
+class CountryResource(ModelResource):
+    class Meta:
+        resource_name = 'countries'
+        queryset = Country.objects.all()
+
+
+class RegionResource(ModelResource):
+    country = fields.ForeignKey(CountryResource, 'country', full=True)
+
+    class Meta:
+        resource_name = 'regions'
+        queryset = Region.objects.all()
+
+
+class CityResource(ModelResource):
+    region = fields.ForeignKey(RegionResource, 'region', full=True)
+
+    class Meta:
+        resource_name = 'cities'
+        queryset = City.objects.all()
+
+
+class StreetResource(ModelResource):
+    city = fields.ForeignKey(CityResource, 'city', full=True)
+
+    class Meta:
+        resource_name = 'streets'
+        queryset = Street.objects.all()
+
+
+class AddressResource(ModelResource):
+    street = fields.ForeignKey(StreetResource, 'street', full=True)
+
+    class Meta:
+        resource_name = 'addresses'
+        queryset = Address.objects.select_related('street__city__region__country')
+        limit = 50
+
+
+class TagResource(ModelResource):
+    class Meta:
+        resource_name = 'tags'
+        queryset = Tag.objects.all()
+
+
+class ArticleResource(ModelResource):
+    tags = fields.ManyToManyField(TagResource, 'tags')
+
+    class Meta:
+        resource_name = 'articles'
+        queryset = Article.objects.all()
+        limit = 10
@@ -0,0 +1,14 @@
+from tastypie.api import Api
+from benchmarks.api.resources import WideRowResource, CountryResource, RegionResource, CityResource, StreetResource, AddressResource, TagResource, ArticleResource
+
+api = Api(api_name='v1')
+api.register(WideRowResource())
+api.register(CountryResource())
+api.register(RegionResource())
+api.register(CityResource())
+api.register(StreetResource())
+api.register(AddressResource())
+api.register(TagResource())
+api.register(ArticleResource())
+
+urlpatterns = api.urls
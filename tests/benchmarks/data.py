@@ -0,0 +1,67 @@
+"""
+Synthetic data for the benchmarks, built the same way every time.
+"""
+import datetime
+from decimal import Decimal
+
+from tastypie.utils import aware_datetime
+from benchmarks.models import WideRow, Country, Region, City, Street, Address, Tag, Article
+
+
+# The number of rows of each kind at a ``scale`` of 1.
+SIZES = {
+    'wide_rows': 1000,
+    'countries': 5,
+    'regions_per_country': 5,
+    'cities_per_region': 4,
+    'streets_per_city': 4,
+    'addresses_per_street': 3,
+    'tags': 1000,
+    'articles': 100,
+    'tags_per_article': 200,
+}
+
+
+def scaled(name, scale):
+    return max(int(SIZES[name] * scale), 1)
+
+
+def load(scale=1):
+    """
+    Fills the (empty) database with synthetic rows: wide rows, a chain of
+    foreign keys four deep & articles with large sets of tags.
+    """
+    created = aware_datetime(2014, 1, 1, 12, 0)
+
+    WideRow.objects.bulk_create([WideRow(
+        name='Row %d' % i,
+        slug='row-%d' % i,
+        description='A wide row, with many columns of every type. ' * 4,
+        email='row%d@example.com' % i,
+        url='http://example.com/rows/%d/' % i,
+        int_1=i, int_2=i * 2, int_3=i * 3, int_4=i * 4, int_5=i * 5, int_6=i * 6,
+        float_1=i / 3.0, float_2=i / 7.0, float_3=i / 9.0, float_4=i / 11.0,
+        decimal_1=Decimal(i) / 4, decimal_2=Decimal(i) / 8,
+        flag_1=i % 2 == 0, flag_2=i % 3 == 0, flag_3=i % 5 == 0,
+        date=datetime.date(2014, 1, 1) + datetime.timedelta(days=i % 365),
+        time=datetime.time(i % 24, i % 60),
+        created=created,
+        updated=created + datetime.timedelta(minutes=i),
+    ) for i in range(scaled('wide_rows', scale))])
+
+    Country.objects.bulk_create([Country(name='Country %d' % i) for i in range(scaled('countries', scale))])
+    Region.objects.bulk_create([Region(country=country, name='Region %d' % i) for country in Country.objects.all() for i in range(SIZES['regions_per_country'])])
+    City.objects.bulk_create([City(region=region, name='City %d' % i) for region in Region.objects.all() for i in range(SIZES['cities_per_region'])])
+    Street.objects.bulk_create([Street(city=city, name='Street %d' % i) for city in City.objects.all() for i in range(SIZES['streets_per_city'])])
+    Address.objects.bulk_create([Address(street=street, number=i + 1) for street in Street.objects.all() for i in range(SIZES['addresses_per_street'])])
+
+    Tag.objects.bulk_create([Tag(name='tag-%d' % i) for i in range(scaled('tags', scale))])
+    Article.objects.bulk_create([Article(title='Article %d' % i, body='Lorem ipsum dolor sit amet. ' * 20) for i in range(scaled('articles', scale))])
+    tag_ids = list(Tag.objects.values_list('pk', flat=True))
+    tags_per_article = min(SIZES['tags_per_article'], len(tag_ids))
+    Through = Article.tags.through
+    Through.objects.bulk_create([
+        Through(article_id=article_id, tag_id=tag_ids[(article_id + i) % len(tag_ids)])
+        for article_id in Article.objects.values_list('pk', flat=True)
+        for i in range(tags_per_article)
+    ])
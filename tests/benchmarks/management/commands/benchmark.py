@@ -0,0 +1,83 @@
+from __future__ import print_function
+from __future__ import unicode_literals
+from optparse import make_option
+import os
+import platform
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import data, suite
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'baseline.json')
+
+
+class Command(BaseCommand):
+    help = "Runs the benchmarks (or those whose names contain any of the given names) & compares them against a baseline."
+    args = '[name ...]'
+    option_list = BaseCommand.option_list + (
+        make_option('--iterations', type='int', default=200,
+            help='The number of timed operations per benchmark.'),
+        make_option('--warmup', type='int', default=20,
+            help='The number of untimed operations run first.'),
+        make_option('--scale', type='float', default=1,
+            help='Multiplies the number of synthetic rows.'),
+        make_option('--baseline', default=BASELINE,
+            help='The baseline JSON file to compare against.'),
+        make_option('--save-baseline', action='store_true', dest='save_baseline', default=False,
+            help='Saves the results as the new baseline instead.'),
+        make_option('--tolerance', type='float', default=0.1,
+            help='How big a drop in ops/sec (as a fraction) counts as a regression.'),
+        make_option('--fail-on-regression', action='store_true', dest='fail_on_regression', default=False,
+            help='Exits with an error if any benchmark regressed.'),
+    )
+
+    def handle(self, *names, **options):
+        # ``migrate`` is new in Django 1.7.
+        call_command('migrate' if django.VERSION >= (1, 7) else 'syncdb', interactive=False, verbosity=0)
+        data.load(scale=options['scale'])
+
+        results = suite.run(names=names, iterations=options['iterations'], warmup=options['warmup'], stdout=self.stdout)
+        self.print_results(results)
+
+        if options['save_baseline']:
+            suite.save_baseline(options['baseline'], results, environment={
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'platform': platform.platform(),
+                'scale': options['scale'],
+            })
+            self.stdout.write("Saved the baseline to %s\n" % options['baseline'])
+            return
+
+        if not os.path.exists(options['baseline']):
+            self.stdout.write("No baseline at %s to compare against.\n" % options['baseline'])
+            return
+
+        rows = suite.compare(results, suite.load_baseline(options['baseline']), tolerance=options['tolerance'])
+        regressed = self.print_comparison(rows)
+
+        if regressed and options['fail_on_regression']:
+            raise CommandError("%d benchmark(s) regressed by more than %d%%: %s" % (len(regressed), options['tolerance'] * 100, ', '.join(regressed)))
+
+    def print_results(self, results):
+        self.stdout.write("%-30s %12s %10s %10s %12s\n" % ('benchmark', 'ops/sec', 'p50 (ms)', 'p99 (ms)', 'peak (KiB)'))
+
+        for name in sorted(results.keys()):
+            result = results[name]
+            peak = '-' if result['peak_memory'] is None else '%d' % (result['peak_memory'] / 1024)
+            self.stdout.write("%-30s %12.1f %10.3f %10.3f %12s\n" % (name, result['ops_per_sec'], result['p50'], result['p99'], peak))
+
+    def print_comparison(self, rows):
+        regressed = []
+        self.stdout.write("\n%-30s %12s %12s %9s\n" % ('benchmark', 'baseline', 'ops/sec', 'change'))
+
+        for name, before, after, change, is_regression in rows:
+            self.stdout.write("%-30s %12.1f %12.1f %+8.1f%%%s\n" % (name, before, after, change * 100, '  REGRESSED' if is_regression else ''))
+
+            if is_regression:
+                regressed.append(name)
+
+        return regressed
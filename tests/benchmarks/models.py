@@ -0,0 +1,96 @@
+from django.db import models
+
+
+class WideRow(models.Model):
+    """
+    A row with many columns of every common type, to weigh on dehydration &
+    serialization.
+    """
+    name = models.CharField(max_length=100)
+    slug = models.SlugField()
+    description = models.TextField()
+    email = models.EmailField()
+    url = models.URLField()
+    int_1 = models.IntegerField()
+    int_2 = models.IntegerField()
+    int_3 = models.IntegerField()
+    int_4 = models.IntegerField()
+    int_5 = models.IntegerField()
+    int_6 = models.IntegerField()
+    float_1 = models.FloatField()
+    float_2 = models.FloatField()
+    float_3 = models.FloatField()
+    float_4 = models.FloatField()
+    decimal_1 = models.DecimalField(max_digits=10, decimal_places=2)
+    decimal_2 = models.DecimalField(max_digits=10, decimal_places=2)
+    flag_1 = models.BooleanField(default=False)
+    flag_2 = models.BooleanField(default=False)
+    flag_3 = models.BooleanField(default=False)
+    date = models.DateField()
+    time = models.TimeField()
+    created = models.DateTimeField()
+    updated = models.DateTimeField()
+
+    def __unicode__(self):
+        return self.name
+
+
+class Country(models.Model):
+    name = models.CharField(max_length=100)
+
+    def __unicode__(self):
+        return self.name
+
+
+class Region(models.Model):
+    country = models.ForeignKey(Country, related_name='regions')
+    name = models.CharField(max_length=100)
+
+    def __unicode__(self):
+        return self.name
+
+
+class City(models.Model):
+    region = models.ForeignKey(Region, related_name='cities')
+    name = models.CharField(max_length=100)
+
+    def __unicode__(self):
+        return self.name
+
+
+class Street(models.Model):
+    city = models.ForeignKey(City, related_name='streets')
+    name = models.CharField(max_length=100)
+
+    def __unicode__(self):
+        return self.name
+
+
+class Address(models.Model):
+    """
+    The end of a chain of foreign keys, four deep.
+    """
+    street = models.ForeignKey(Street, related_name='addresses')
+    number = models.IntegerField()
+
+    def __unicode__(self):
+        return '%s %s' % (self.number, self.street)
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50)
+
+    def __unicode__(self):
+        return self.name
+
+
+class Article(models.Model):
+    """
+    Has a large set of tags.
+    """
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    tags = models.ManyToManyField(Tag, related_name='articles')
+
+    def __unicode__(self):
+        return self.title
@@ -0,0 +1,309 @@
+"""
+The benchmarks & the machinery to time them, measure their memory & compare
+them against a baseline.
+"""
+from __future__ import division
+import gc
+import json
+import math
+import timeit
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.urlresolvers import resolve
+from django.test.client import RequestFactory
+
+from tastypie.paginator import Paginator
+from tastypie.serializers import Serializer
+from tastypie.throttle import BaseThrottle, CacheThrottle, CacheDBThrottle, TieredThrottle, ApproximateCacheThrottle
+from benchmarks.api.resources import WideRowResource, AddressResource
+from benchmarks.models import WideRow
+
+try:
+    import tracemalloc
+except ImportError: # Python < 3.4
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+
+class Benchmark(object):
+    """
+    A named operation to time.
+
+    ``setup`` (if given) is called once, before any timing, & returns the
+    argument ``run`` is called with for each operation.
+    """
+    def __init__(self, name, run, setup=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at ``fraction`` of the way through the sorted
+    ``values`` (the nearest-rank method).
+    """
+    index = max(int(math.ceil(fraction * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def get_peak_memory(func, arg, operations):
+    """
+    Returns the most memory (in bytes) allocated at once while running
+    ``operations`` operations.
+
+    Uses ``tracemalloc`` where it's available. Otherwise, falls back on the
+    peak resident size of the whole process, which only ever goes up.
+    """
+    if tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+
+        try:
+            for i in range(operations):
+                func(arg)
+
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    if resource is not None:
+        for i in range(operations):
+            func(arg)
+
+        # Kilobytes on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    return None
+
+
+def measure(benchmark, iterations=200, warmup=20, memory_iterations=10):
+    """
+    Runs ``benchmark`` & returns its ``ops_per_sec``, the ``p50`` & ``p99``
+    latency (in milliseconds) & ``peak_memory`` (in bytes).
+
+    Memory is measured in a separate, shorter run, so tracing it doesn't
+    slow down the timed one.
+    """
+    arg = benchmark.setup() if benchmark.setup is not None else None
+    timer = timeit.default_timer
+
+    for i in range(warmup):
+        benchmark.run(arg)
+
+    latencies = []
+    gc.collect()
+    started = timer()
+
+    for i in range(iterations):
+        op_started = timer()
+        benchmark.run(arg)
+        latencies.append(timer() - op_started)
+
+    elapsed = timer() - started
+    latencies.sort()
+
+    return {
+        'iterations': iterations,
+        'ops_per_sec': iterations / elapsed if elapsed else 0,
+        'p50': percentile(latencies, 0.5) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'peak_memory': get_peak_memory(benchmark.run, arg, memory_iterations),
+    }
+
+
+def compare(results, baseline, tolerance=0.1):
+    """
+    Compares ``results`` against a ``baseline`` (both dictionaries of
+    benchmark names to the results of ``measure``).
+
+    Returns a list of ``(name, baseline ops/sec, ops/sec, change, regressed)``
+    for the benchmarks found in both, where ``change`` is the fraction the
+    ops/sec went up (or down, if negative) & ``regressed`` is whether it went
+    down by more than ``tolerance``.
+    """
+    rows = []
+
+    for name in sorted(results.keys()):
+        if not name in baseline:
+            continue
+
+        before = baseline[name]['ops_per_sec']
+        after = results[name]['ops_per_sec']
+        change = (after - before) / before if before else 0
+        rows.append((name, before, after, change, change < -tolerance))
+
+    return rows
+
+
+def load_baseline(path):
+    with open(path) as baseline_file:
+        return json.load(baseline_file)['results']
+
+
+def save_baseline(path, results, environment=None):
+    with open(path, 'w') as baseline_file:
+        json.dump({'environment': environment or {}, 'results': results}, baseline_file, indent=2, sort_keys=True, separators=(',', ': '))
+        baseline_file.write('\n')
+
+
+# Requests.
+
+factory = RequestFactory()
+
+
+def call_view(request):
+    match = resolve(request.path_info)
+    response = match.func(request, *match.args, **match.kwargs)
+
+    if response.status_code >= 400:
+        raise AssertionError("%s %s returned %d: %s" % (request.method, request.path_info, response.status_code, response.content[:500]))
+
+    return response
+
+
+def get_benchmark(name, path):
+    return Benchmark(name, lambda arg: call_view(factory.get(path, HTTP_ACCEPT='application/json')))
+
+
+def setup_patch_list():
+    rows = WideRow.objects.order_by('pk')[:100]
+    resource = WideRowResource(api_name='v1')
+    return {
+        'objects': [{'resource_uri': resource.get_resource_uri(row), 'int_1': row.int_1 + 1, 'name': row.name} for row in rows],
+    }
+
+
+def run_patch_list(data):
+    body = json.dumps(data)
+    call_view(factory.generic('PATCH', '/api/v1/widerows/', body, content_type='application/json', HTTP_ACCEPT='application/json'))
+
+
+# Pieces of the pipeline.
+
+def setup_full_dehydrate():
+    resource = AddressResource(api_name='v1')
+    request = factory.get('/api/v1/addresses/')
+    objects = list(resource.get_object_list(request)[:50])
+    return resource, request, objects
+
+
+def run_full_dehydrate(arg):
+    resource, request, objects = arg
+
+    for obj in objects:
+        resource.full_dehydrate(resource.build_bundle(obj=obj, request=request), for_list=True)
+
+
+def setup_paginate():
+    return WideRow.objects.all()
+
+
+def run_paginate(queryset):
+    Paginator({'offset': '100', 'limit': '50'}, queryset, resource_uri='/api/v1/widerows/', limit=20, max_limit=1000).page()
+
+
+def setup_serialize(name, format):
+    def setup():
+        serializer = Serializer(formats=[name])
+        resource = WideRowResource(api_name='v1')
+        request = factory.get('/api/v1/widerows/')
+        bundles = [resource.full_dehydrate(resource.build_bundle(obj=obj, request=request), for_list=True) for obj in WideRow.objects.order_by('pk')[:50]]
+        data = {'meta': {'limit': 50, 'offset': 0, 'total_count': len(bundles)}, 'objects': bundles}
+        # Fails early if the format's library is missing.
+        serializer.serialize(data, format, {'callback': 'callback'})
+        return serializer, data
+
+    return setup
+
+
+def run_serialize(format):
+    def run(arg):
+        serializer, data = arg
+        serializer.serialize(data, format, {'callback': 'callback'})
+
+    return run
+
+
+def run_throttle(throttle):
+    status = throttle.check('benchmark')
+    kwargs = {'url': '/api/v1/widerows/', 'request_method': 'get'}
+
+    if status.state is not None:
+        kwargs['status'] = status
+
+    throttle.accessed('benchmark', **kwargs)
+
+
+def setup_throttle(throttle_class, **kwargs):
+    def setup():
+        cache.clear()
+        return throttle_class(**kwargs)
+
+    return setup
+
+
+SERIALIZER_FORMATS = [
+    ('json', 'application/json'),
+    ('jsonp', 'text/javascript'),
+    ('xml', 'application/xml'),
+    ('yaml', 'text/yaml'),
+    ('plist', 'application/x-plist'),
+]
+
+
+def get_benchmarks():
+    """
+    Returns every ``Benchmark``, in the order they're run.
+    """
+    benchmarks = [
+        get_benchmark('get_list_wide', '/api/v1/widerows/'),
+        get_benchmark('get_detail_wide', '/api/v1/widerows/1/'),
+        get_benchmark('get_list_fk_chain', '/api/v1/addresses/'),
+        get_benchmark('get_detail_fk_chain', '/api/v1/addresses/1/'),
+        get_benchmark('get_list_m2m', '/api/v1/articles/'),
+        get_benchmark('get_detail_m2m', '/api/v1/articles/1/'),
+        Benchmark('patch_list_bulk', run_patch_list, setup_patch_list),
+        Benchmark('full_dehydrate_fk_chain', run_full_dehydrate, setup_full_dehydrate),
+        Benchmark('paginate', run_paginate, setup_paginate),
+    ]
+
+    for name, format in SERIALIZER_FORMATS:
+        benchmarks.append(Benchmark('serialize_%s' % name, run_serialize(format), setup_serialize(name, format)))
+
+    big = 10 ** 9
+    benchmarks.extend([
+        Benchmark('throttle_base', run_throttle, setup_throttle(BaseThrottle)),
+        Benchmark('throttle_cache', run_throttle, setup_throttle(CacheThrottle, throttle_at=big)),
+        Benchmark('throttle_cache_db', run_throttle, setup_throttle(CacheDBThrottle, throttle_at=big)),
+        Benchmark('throttle_tiered', run_throttle, setup_throttle(TieredThrottle, tiers=[(big, 60), (big, 3600)])),
+        Benchmark('throttle_approximate_cache', run_throttle, setup_throttle(ApproximateCacheThrottle, throttle_at=big, overshoot=100)),
+    ])
+    return benchmarks
+
+
+def run(names=None, iterations=200, warmup=20, stdout=None):
+    """
+    Measures the benchmarks (or only those whose names contain one of
+    ``names``), returning a dictionary of names to results.
+
+    Benchmarks whose optional libraries are missing are skipped.
+    """
+    results = {}
+
+    for benchmark in get_benchmarks():
+        if names and not any([name in benchmark.name for name in names]):
+            continue
+
+        try:
+            results[benchmark.name] = measure(benchmark, iterations=iterations, warmup=warmup)
+        except ImproperlyConfigured as e:
+            if stdout is not None:
+                stdout.write("Skipping %s: %s\n" % (benchmark.name, e))
+
+    return results
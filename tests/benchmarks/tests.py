@@ -0,0 +1,91 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+
+# Not imported as ``suite``, which Django 1.5's test runner would call.
+from benchmarks import data, suite as benchmark_suite
+from benchmarks.models import WideRow, Address, Article
+
+
+class SuiteTestCase(TestCase):
+    def setUp(self):
+        super(SuiteTestCase, self).setUp()
+        data.load(scale=0.02)
+
+    def test_load(self):
+        self.assertEqual(WideRow.objects.count(), 20)
+        self.assertEqual(Address.objects.count(), 240)
+        self.assertEqual(Article.objects.count(), 2)
+        self.assertEqual(Article.objects.get(pk=1).tags.count(), 20)
+
+    def test_run(self):
+        results = benchmark_suite.run(iterations=2, warmup=1)
+        names = [benchmark.name for benchmark in benchmark_suite.get_benchmarks()]
+
+        for name in ['get_list_wide', 'get_detail_fk_chain', 'get_list_m2m', 'patch_list_bulk', 'serialize_json', 'throttle_tiered']:
+            self.assertTrue(name in results)
+
+        for name, result in results.items():
+            self.assertTrue(name in names)
+            self.assertEqual(result['iterations'], 2)
+            self.assertTrue(result['ops_per_sec'] > 0)
+            self.assertTrue(result['p50'] <= result['p99'])
+
+    def test_run_names(self):
+        results = benchmark_suite.run(names=['throttle_cache', 'paginate'], iterations=2, warmup=0)
+        self.assertEqual(sorted(results.keys()), ['paginate', 'throttle_cache', 'throttle_cache_db'])
+
+    def test_patch_list(self):
+        benchmark_suite.run_patch_list(benchmark_suite.setup_patch_list())
+        self.assertEqual(WideRow.objects.get(pk=1).int_1, 1)
+
+
+class CompareTestCase(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark_suite.percentile(values, 0.5), 50)
+        self.assertEqual(benchmark_suite.percentile(values, 0.99), 99)
+        self.assertEqual(benchmark_suite.percentile([7], 0.99), 7)
+
+    def test_compare(self):
+        baseline = {
+            'a': {'ops_per_sec': 100},
+            'b': {'ops_per_sec': 100},
+            'c': {'ops_per_sec': 100},
+        }
+        results = {
+            'a': {'ops_per_sec': 95},
+            'b': {'ops_per_sec': 80},
+            'd': {'ops_per_sec': 50},
+        }
+        self.assertEqual(benchmark_suite.compare(results, baseline), [
+            ('a', 100, 95, -0.05, False),
+            ('b', 100, 80, -0.2, True),
+        ])
+        self.assertEqual(benchmark_suite.compare(results, baseline, tolerance=0.25)[1][4], False)
+
+    def test_baseline(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'baseline.json')
+
+        try:
+            results = {'a': {'ops_per_sec': 100, 'p50': 1, 'p99': 2, 'peak_memory': 1024, 'iterations': 10}}
+            benchmark_suite.save_baseline(path, results, environment={'python': '2.7'})
+            self.assertEqual(benchmark_suite.load_baseline(path), results)
+
+            with open(path) as baseline_file:
+                self.assertEqual(json.load(baseline_file)['environment'], {'python': '2.7'})
+        finally:
+            shutil.rmtree(directory)
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('benchmark', 'throttle_base', iterations=2, warmup=0, scale=0.01, stdout=stdout)
+        output = stdout.getvalue()
+        self.assertTrue('throttle_base' in output)
+        self.assertTrue('ops/sec' in output)
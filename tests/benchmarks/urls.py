@@ -0,0 +1,5 @@
+from django.conf.urls import patterns, include
+
+urlpatterns = patterns('',
+    (r'^api/', include('benchmarks.api.urls')),
+)
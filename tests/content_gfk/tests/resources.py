@@ -1,8 +1,11 @@
 from django.test import TestCase
+from mock import patch
 from tastypie.exceptions import NotFound
+from tastypie.contrib.contenttypes import resources
 from tastypie.contrib.contenttypes.resources import GenericResource
 
 from content_gfk.api.resources import NoteResource, DefinitionResource
+from content_gfk.models import Note
 
 
 class GenericResourceTestCase(TestCase):
@@ -18,3 +21,15 @@ class GenericResourceTestCase(TestCase):
     def test_resource_not_registered(self):
         bad_uri = '/api/v1/quotes/1/'
         self.assertRaises(NotFound, self.resource.get_via_uri, bad_uri)
+
+
+    def test_resolution_cached(self):
+        note = Note.objects.create(title='Hello', content='World')
+        uri = '/api/v1/notes/%s/' % note.pk
+        resources.RESOLVED_URIS.clear()
+
+        with patch.object(resources, 'resolve', wraps=resources.resolve) as mock_resolve:
+            self.assertEqual(self.resource.get_via_uri(uri), note)
+            self.assertEqual(self.resource.get_via_uri(uri), note)
+
+        self.assertEqual(mock_resolve.call_count, 1)
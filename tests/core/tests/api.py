@@ -1,10 +1,18 @@
+import sys
+import warnings
+from django.conf.urls import url
 from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.urlresolvers import resolve, reverse, NoReverseMatch, Resolver404
 from django.http import HttpRequest
 from django.test import TestCase
-from tastypie.api import Api
+from django.utils import importlib
+from mock import patch
+from tastypie.api import Api, ApiURLResolver, NamespacedApi
 from tastypie.exceptions import NotRegistered, BadRequest
-from tastypie.resources import Resource, ModelResource
+from tastypie.resources import Resource, ModelResource, URI_TEMPLATES
 from tastypie.serializers import Serializer
+from tastypie.utils import trailing_slash
 from core.models import Note
 
 
@@ -20,6 +28,47 @@ class UserResource(ModelResource):
         queryset = User.objects.all()
 
 
+class AuthUserResource(ModelResource):
+    class Meta:
+        resource_name = 'auth/user'
+        queryset = User.objects.all()
+
+
+class WordNoteResource(ModelResource):
+    class Meta:
+        resource_name = 'word-notes'
+        queryset = Note.objects.filter(is_active=True)
+
+    def base_urls(self):
+        return [
+            url(r"^(?P<resource_name>%s)%s$" % (self._meta.resource_name, trailing_slash()), self.wrap_view('dispatch_list'), name="api_dispatch_list"),
+            url(r"^(?P<resource_name>%s)/(?P<pk>\w[\w-]*)%s$" % (self._meta.resource_name, trailing_slash()), self.wrap_view('dispatch_detail'), name="api_dispatch_detail"),
+        ]
+
+
+class CustomNoteResource(ModelResource):
+    class Meta:
+        resource_name = 'custom-notes'
+        queryset = Note.objects.filter(is_active=True)
+
+    def prepend_urls(self):
+        return [
+            url(r"^latest-note/$", self.wrap_view('dispatch_list'), name="api_latest_note"),
+        ]
+
+
+class OverlappingNoteResource(ModelResource):
+    class Meta:
+        resource_name = 'overlapping-notes'
+        queryset = Note.objects.filter(is_active=True)
+
+    def prepend_urls(self):
+        return [
+            url(r"^notes/(?P<pk>\d+)/$", self.wrap_view('dispatch_detail'), name="api_overlapping_note"),
+            url(r"^users/(?P<pk>\d+)/$", self.wrap_view('dispatch_detail'), name="api_overlapping_user"),
+        ]
+
+
 class ApiTestCase(TestCase):
     urls = 'core.tests.api_urls'
 
@@ -108,18 +157,18 @@ class ApiTestCase(TestCase):
         api.register(UserResource())
 
         patterns = api.urls
-        self.assertEqual(len(patterns), 3)
+        self.assertEqual(len(patterns), 2)
         self.assertEqual(sorted([pattern.name for pattern in patterns if hasattr(pattern, 'name')]), ['api_v1_top_level'])
-        self.assertEqual([[pattern.name for pattern in include.url_patterns if hasattr(pattern, 'name')] for include in patterns if hasattr(include, 'reverse_dict')], [['api_dispatch_list', 'api_get_schema', 'api_get_multiple', 'api_dispatch_detail'], ['api_dispatch_list', 'api_get_schema', 'api_get_multiple', 'api_dispatch_detail']])
+        self.assertEqual([[pattern.name for pattern in include.url_patterns if hasattr(pattern, 'name')] for router in patterns if hasattr(router, 'reverse_dict') for include in router.url_patterns], [['api_dispatch_list', 'api_get_schema', 'api_get_multiple', 'api_dispatch_detail'], ['api_dispatch_list', 'api_get_schema', 'api_get_multiple', 'api_dispatch_detail']])
 
         api = Api(api_name='v2')
         api.register(NoteResource())
         api.register(UserResource())
 
         patterns = api.urls
-        self.assertEqual(len(patterns), 3)
+        self.assertEqual(len(patterns), 2)
         self.assertEqual(sorted([pattern.name for pattern in patterns if hasattr(pattern, 'name')]), ['api_v2_top_level'])
-        self.assertEqual([[pattern.name for pattern in include.url_patterns if hasattr(pattern, 'name')] for include in patterns if hasattr(include, 'reverse_dict')], [['api_dispatch_list', 'api_get_schema', 'api_get_multiple', 'api_dispatch_detail'], ['api_dispatch_list', 'api_get_schema', 'api_get_multiple', 'api_dispatch_detail']])
+        self.assertEqual([[pattern.name for pattern in include.url_patterns if hasattr(pattern, 'name')] for router in patterns if hasattr(router, 'reverse_dict') for include in router.url_patterns], [['api_dispatch_list', 'api_get_schema', 'api_get_multiple', 'api_dispatch_detail'], ['api_dispatch_list', 'api_get_schema', 'api_get_multiple', 'api_dispatch_detail']])
 
     def test_top_level(self):
         api = Api()
@@ -131,6 +180,31 @@ class ApiTestCase(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.content.decode('utf-8'), '{"notes": {"list_endpoint": "/api/v1/notes/", "schema": "/api/v1/notes/schema/"}, "users": {"list_endpoint": "/api/v1/users/", "schema": "/api/v1/users/schema/"}}')
 
+    def test_top_level_cached(self):
+        api = Api()
+        api.register(NoteResource())
+        request = HttpRequest()
+
+        with patch.object(Api, '_build_reverse_url', autospec=True, side_effect=Api._build_reverse_url) as mock_reverse:
+            resp = api.top_level(request)
+            etag = resp['ETag']
+            self.assertEqual(api.top_level(request).content, resp.content)
+            self.assertEqual(mock_reverse.call_count, 2)
+
+            request.META['HTTP_IF_NONE_MATCH'] = etag
+            resp = api.top_level(request)
+            self.assertEqual(resp.status_code, 304)
+            self.assertEqual(resp['ETag'], etag)
+            self.assertEqual(mock_reverse.call_count, 2)
+
+            # Registering another resource starts afresh.
+            api.register(UserResource())
+            resp = api.top_level(request)
+            self.assertEqual(resp.status_code, 200)
+            self.assertNotEqual(resp['ETag'], etag)
+            self.assertEqual(resp.content.decode('utf-8'), '{"notes": {"list_endpoint": "/api/v1/notes/", "schema": "/api/v1/notes/schema/"}, "users": {"list_endpoint": "/api/v1/users/", "schema": "/api/v1/users/schema/"}}')
+            self.assertEqual(mock_reverse.call_count, 6)
+
     def test_top_level_jsonp(self):
         api = Api()
         api.register(NoteResource())
@@ -182,3 +256,264 @@ class ApiTestCase(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp['content-type'], 'application/json',
                          msg="Expected application/json response but received %s" % resp['content-type'])
+
+
+class ApiURLResolverTestCase(TestCase):
+    def setUp(self):
+        super(ApiURLResolverTestCase, self).setUp()
+        self.resolver = ApiURLResolver(r'^(?P<api_name>v1)/', [AuthUserResource(), NoteResource(), UserResource()])
+
+    def test_resolve(self):
+        match = self.resolver.resolve('v1/notes/1/')
+        self.assertEqual(match.url_name, 'api_dispatch_detail')
+        self.assertEqual(match.kwargs, {'api_name': 'v1', 'resource_name': 'notes', 'pk': '1'})
+
+        match = self.resolver.resolve('v1/auth/user/schema/')
+        self.assertEqual(match.url_name, 'api_get_schema')
+        self.assertEqual(match.kwargs, {'api_name': 'v1', 'resource_name': 'auth/user'})
+
+        match = self.resolver.resolve('v1/users/set/1;2/')
+        self.assertEqual(match.url_name, 'api_get_multiple')
+
+        self.assertRaises(Resolver404, self.resolver.resolve, 'v1/nope/')
+        self.assertRaises(Resolver404, self.resolver.resolve, 'v2/notes/')
+
+    def test_only_matching_resource_tried(self):
+        with patch.object(self.resolver.resource_resolvers['users'], 'resolve') as mock_users_resolve:
+            with patch.object(self.resolver.resource_resolvers['auth/user'], 'resolve') as mock_auth_user_resolve:
+                self.assertEqual(self.resolver.resolve('v1/notes/').url_name, 'api_dispatch_list')
+
+        self.assertEqual(mock_users_resolve.call_count, 0)
+        self.assertEqual(mock_auth_user_resolve.call_count, 0)
+
+    def test_prepend_urls(self):
+        resolver = ApiURLResolver(r'^(?P<api_name>v1)/', [CustomNoteResource(), NoteResource()])
+        self.assertEqual(resolver.resolve('v1/latest-note/').url_name, 'api_latest_note')
+        self.assertEqual(resolver.resolve('v1/notes/').kwargs['resource_name'], 'notes')
+        self.assertEqual(resolver.resolve('v1/custom-notes/').kwargs['resource_name'], 'custom-notes')
+
+    def test_overlapping_urls(self):
+        # Whichever comes first wins, as with plain patterns.
+        resolver = ApiURLResolver(r'^(?P<api_name>v1)/', [NoteResource(), OverlappingNoteResource(), UserResource()])
+        self.assertEqual(resolver.resolve('v1/notes/1/').url_name, 'api_dispatch_detail')
+        self.assertEqual(resolver.resolve('v1/notes/1/').kwargs['resource_name'], 'notes')
+        self.assertEqual(resolver.resolve('v1/users/1/').url_name, 'api_overlapping_user')
+
+
+
+class ApiURLConfTestCase(TestCase):
+    urls = 'core.tests.api_urls'
+
+    def test_resolve_and_reverse(self):
+        self.assertEqual(reverse('api_dispatch_detail', kwargs={'api_name': 'v1', 'resource_name': 'notes', 'pk': 1}), '/api/v1/notes/1/')
+        self.assertEqual(reverse('api_v1_top_level', kwargs={'api_name': 'v1'}), '/api/v1/')
+
+        match = resolve('/api/v1/users/1/')
+        self.assertEqual(match.url_name, 'api_dispatch_detail')
+        self.assertEqual(match.kwargs, {'api_name': 'v1', 'resource_name': 'users', 'pk': '1'})
+        self.assertEqual(resolve('/api/v1/').url_name, 'api_v1_top_level')
+        self.assertRaises(Resolver404, resolve, '/api/v1/nope/')
+
+    def test_resource_uri_template(self):
+        URI_TEMPLATES.clear()
+        resource = NoteResource(api_name='v1')
+        notes = [Note(pk=1), Note(pk=2), Note(pk=u'a b/\xe9')]
+
+        with patch.object(NoteResource, '_build_reverse_url', autospec=True, side_effect=ModelResource._build_reverse_url) as mock_reverse:
+            self.assertEqual(resource.get_resource_uri(), '/api/v1/notes/')
+            self.assertEqual(resource.get_resource_uri(), '/api/v1/notes/')
+            uris = [resource.get_resource_uri(note) for note in notes]
+
+        # Reversed once for the list, once for the detail template & once for
+        # the value that needs quoting.
+        self.assertEqual(mock_reverse.call_count, 3)
+        self.assertEqual(uris, [reverse('api_dispatch_detail', kwargs={'api_name': 'v1', 'resource_name': 'notes', 'pk': note.pk}) for note in notes])
+        self.assertEqual(uris[2], '/api/v1/notes/a%20b/%C3%A9/')
+
+    def test_resource_uri_template_matches_reverse(self):
+        URI_TEMPLATES.clear()
+        resource = NoteResource(api_name='v1')
+        pks = ['a.b', 'x@y', 'with space', 'a/b', 'a+b', 'a:b', '~a', '50%', "a'b", u'\xfc', '-_.']
+
+        for pk in pks:
+            self.assertEqual(resource.get_resource_uri(Note(pk=pk)), reverse('api_dispatch_detail', kwargs={'api_name': 'v1', 'resource_name': 'notes', 'pk': pk}))
+
+        # ``.`` doesn't match newlines, so there's no URI for this one.
+        self.assertEqual(resource.get_resource_uri(Note(pk='a\nb')), '')
+
+    def test_resource_uri_template_pattern(self):
+        URI_TEMPLATES.clear()
+        resource = WordNoteResource(api_name='v1')
+
+        with patch.object(WordNoteResource, '_build_reverse_url', autospec=True, side_effect=ModelResource._build_reverse_url) as mock_reverse:
+            self.assertEqual(resource.get_resource_uri(Note(pk='a-b')), '/api/v1/word-notes/a-b/')
+            self.assertEqual(resource.get_resource_uri(Note(pk='ab')), '/api/v1/word-notes/ab/')
+            # Neither matches ``\w[\w-]*``, so both are reversed & fail.
+            self.assertEqual(resource.get_resource_uri(Note(pk='a.b')), '')
+            self.assertEqual(resource.get_resource_uri(Note(pk='-ab')), '')
+
+        self.assertEqual(mock_reverse.call_count, 3)
+
+    def test_resource_uri_prepend_urls(self):
+        URI_TEMPLATES.clear()
+        resource = CustomNoteResource(api_name='v1')
+
+        with patch.object(CustomNoteResource, '_build_reverse_url', autospec=True, side_effect=ModelResource._build_reverse_url) as mock_reverse:
+            resource.get_resource_uri(Note(pk=1))
+            resource.get_resource_uri(Note(pk=2))
+
+        self.assertEqual(mock_reverse.call_count, 2)
+
+
+class LazyApiTestCase(TestCase):
+    urls = 'core.tests.lazy_urls'
+
+    def setUp(self):
+        super(LazyApiTestCase, self).setUp()
+        sys.modules.pop('core.tests.lazy_resources', None)
+
+    def test_register_lazy(self):
+        api = Api()
+        api.register('core.tests.lazy_resources.LazyNoteResource', resource_name='lazy-notes')
+        api.register('core.tests.lazy_resources.SlugNoteResource', detail_uri_name='slug')
+        self.assertEqual(sorted(api._lazy.keys()), ['lazy-notes', 'slugnote'])
+        self.assertEqual(len(api._registry), 0)
+
+        resp = api.top_level(HttpRequest())
+        self.assertEqual(resp.content.decode('utf-8'), '{"lazy-notes": {"list_endpoint": "/api/v1/lazy-notes/", "schema": "/api/v1/lazy-notes/schema/"}, "slugnote": {"list_endpoint": "/api/v1/slugnote/", "schema": "/api/v1/slugnote/schema/"}}')
+        self.assertFalse('core.tests.lazy_resources' in sys.modules)
+
+        resource = api.canonical_resource_for('lazy-notes')
+        self.assertEqual(resource.__class__.__name__, 'LazyNoteResource')
+        self.assertEqual(resource._meta.api_name, 'v1')
+        self.assertTrue(api._registry['lazy-notes'] is resource)
+        self.assertFalse('lazy-notes' in api._lazy)
+        self.assertTrue(api.canonical_resource_for('lazy-notes') is resource)
+
+        api.unregister('slugnote')
+        self.assertEqual(len(api._lazy), 0)
+        self.assertRaises(NotRegistered, api.canonical_resource_for, 'slugnote')
+
+    def test_register_lazy_replaces(self):
+        api = Api()
+        api.register(NoteResource())
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            api.register('core.tests.lazy_resources.LazyNoteResource', resource_name='notes')
+            self.assertEqual(len(w), 1)
+
+        self.assertEqual(len(api._registry), 0)
+        self.assertEqual(list(api._lazy.keys()), ['notes'])
+
+        api.register(NoteResource())
+        self.assertEqual(len(api._lazy), 0)
+        self.assertEqual(list(api._registry.keys()), ['notes'])
+
+    def test_load_resource_misconfigured(self):
+        api = Api()
+        api.register('core.tests.lazy_resources.LazyNoteResource')
+        self.assertRaises(ImproperlyConfigured, api.load_resource, 'lazynote')
+
+        api.register('core.tests.lazy_resources.SlugNoteResource')
+        self.assertRaises(ImproperlyConfigured, api.load_resource, 'slugnote')
+
+        api.register('core.tests.lazy_resources.WordNoteResource')
+        self.assertRaises(ImproperlyConfigured, api.load_resource, 'wordnote')
+
+        api.register('core.tests.lazy_resources.MissingResource')
+        self.assertRaises(ImproperlyConfigured, api.load_resource, 'missing')
+
+        self.assertRaises(NotRegistered, api.load_resource, 'nope')
+
+    def test_load_resource_while_importing(self):
+        api = Api()
+        api.register('core.tests.lazy_resources.LazyNoteResource', resource_name='lazy-notes')
+        api.register('core.tests.lazy_resources.LazyUserResource', resource_name='lazy-users')
+        import_module = importlib.import_module
+        calls = []
+
+        def import_and_load(module_path):
+            calls.append(module_path)
+
+            # Loading another resource while the first one is imported
+            # mustn't wait on the lock.
+            if len(calls) == 1:
+                api.load_resource('lazy-users')
+
+            return import_module(module_path)
+
+        with patch('tastypie.api.importlib.import_module', side_effect=import_and_load):
+            resource = api.load_resource('lazy-notes')
+
+        self.assertTrue(api._registry['lazy-notes'] is resource)
+        self.assertEqual(sorted(api._registry.keys()), ['lazy-notes', 'lazy-users'])
+        self.assertEqual(len(api._lazy), 0)
+
+    def test_warm_up(self):
+        api = Api()
+        api.register('core.tests.lazy_resources.LazyNoteResource', resource_name='lazy-notes')
+        api.register(UserResource())
+        api.warm_up()
+
+        self.assertEqual(len(api._lazy), 0)
+        self.assertEqual(sorted(api._registry.keys()), ['lazy-notes', 'users'])
+        self.assertEqual(api._registry['lazy-notes'].fields['author']._to_class.__name__, 'LazyUserResource')
+
+    def test_namespaced_register_lazy(self):
+        api = NamespacedApi(urlconf_namespace='special')
+        api.register('core.tests.lazy_resources.LazyNoteResource', resource_name='lazy-notes')
+        self.assertEqual(api.load_resource('lazy-notes')._meta.urlconf_namespace, 'special')
+
+
+class LazyApiURLConfTestCase(TestCase):
+    urls = 'core.tests.lazy_urls'
+    fixtures = ['note_testdata.json']
+
+    def test_reverse_and_dispatch(self):
+        from core.tests.lazy_urls import api
+
+        self.assertEqual(reverse('api_dispatch_detail', kwargs={'api_name': 'v1', 'resource_name': 'lazy-notes', 'pk': 1}), '/api/v1/lazy-notes/1/')
+        self.assertEqual(reverse('api_dispatch_detail', kwargs={'api_name': 'v1', 'resource_name': 'slugnote', 'slug': 'first-post'}), '/api/v1/slugnote/first-post/')
+        self.assertRaises(NoReverseMatch, reverse, 'api_dispatch_detail', kwargs={'api_name': 'v1', 'resource_name': 'wordnote', 'pk': 'a.b'})
+        self.assertEqual(sorted(api._lazy.keys()), ['lazy-notes', 'slugnote', 'wordnote'])
+
+        self.assertRaises(Resolver404, resolve, '/api/v1/nope/')
+        self.assertEqual(sorted(api._lazy.keys()), ['lazy-notes', 'slugnote', 'wordnote'])
+
+        resp = self.client.get('/api/v1/lazy-notes/1/', HTTP_ACCEPT='application/json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content.decode('utf-8').count('"resource_uri": "/api/v1/lazy-notes/1/"'), 1)
+        self.assertEqual(sorted(api._lazy.keys()), ['slugnote', 'wordnote'])
+
+        resp = self.client.get('/api/v1/slugnote/first-post/', HTTP_ACCEPT='application/json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(list(api._lazy.keys()), ['wordnote'])
+
+        resp = self.client.get('/api/v1/wordnote/1/', HTTP_ACCEPT='application/json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(api._lazy), 0)
+        # Reverses the same way once it's been loaded.
+        self.assertEqual(api._registry['wordnote'].get_resource_uri(Note(pk='a.b')), '')
+        self.assertEqual(api._registry['wordnote'].get_resource_uri(Note(pk=1)), '/api/v1/wordnote/1/')
+
+
+class LazyCustomURLConfTestCase(TestCase):
+    urls = 'core.tests.lazy_custom_urls'
+
+    def test_reverse_prepend_urls(self):
+        from core.tests.lazy_custom_urls import api
+
+        self.assertEqual(reverse('api_dispatch_list', kwargs={'api_name': 'v1', 'resource_name': 'custom'}), '/api/v1/custom/')
+        # Only known once the resource has been loaded.
+        self.assertRaises(NoReverseMatch, reverse, 'custom_special', kwargs={'api_name': 'v1', 'resource_name': 'custom'})
+
+        self.assertEqual(resolve('/api/v1/custom/special/').url_name, 'custom_special')
+        self.assertEqual(len(api._lazy), 0)
+        self.assertEqual(reverse('custom_special', kwargs={'api_name': 'v1', 'resource_name': 'custom'}), '/api/v1/custom/special/')
+        self.assertEqual(reverse('api_dispatch_list', kwargs={'api_name': 'v1', 'resource_name': 'custom'}), '/api/v1/custom/')
+
+        # The loaded URLs are only built the once.
+        from core.tests.lazy_custom_urls import urlpatterns
+        lazy_resolver = urlpatterns[0].url_patterns[-1].lazy_resolvers[0]
+        self.assertTrue(lazy_resolver.url_patterns is lazy_resolver.url_patterns)
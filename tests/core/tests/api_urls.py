@@ -3,12 +3,13 @@ try:
 except ImportError: # Django < 1.4
     from django.conf.urls.defaults import patterns, include
 
-from core.tests.api import Api, NoteResource, UserResource
+from core.tests.api import Api, NoteResource, UserResource, WordNoteResource
 
 
 api = Api()
 api.register(NoteResource())
 api.register(UserResource())
+api.register(WordNoteResource())
 
 urlpatterns = patterns('',
     (r'^api/', include(api.urls)),
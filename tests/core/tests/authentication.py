@@ -1,4 +1,5 @@
 import base64
+import mock
 import os
 import time
 import unittest
@@ -584,4 +585,88 @@ class MultiAuthenticationTestCase(TestCase):
         request.META['HTTP_AUTHORIZATION'] = 'Basic %s' % base64.b64encode('johndoe:pass'.encode('utf-8')).decode('utf-8')
         self.assertEqual(auth.is_authenticated(request), True)
 
+    def test_remembers_winning_backend(self):
+        basic_auth = BasicAuthentication()
+        api_key_auth = ApiKeyAuthentication()
+        auth = MultiAuthentication(basic_auth, api_key_auth)
+        john_doe = User.objects.get(username='johndoe')
+
+        def build_request():
+            request = HttpRequest()
+            request.GET['username'] = 'johndoe'
+            request.GET['api_key'] = john_doe.api_key.key
+            return request
+
+        request = build_request()
+        self.assertEqual(auth.is_authenticated(request), True)
+        self.assertTrue(request._authentication_backend is api_key_auth)
+        fingerprint = auth.get_fingerprint(request)
+        self.assertEqual(auth._preferred_backends[fingerprint], 1)
+
+        # The same credentials now go straight to the API key backend.
+        request = build_request()
+
+        with mock.patch.object(basic_auth, 'is_authenticated') as mocked:
+            self.assertEqual(auth.is_authenticated(request), True)
+            self.assertEqual(mocked.call_count, 0)
+
+        self.assertEqual(auth.get_identifier(request), 'johndoe')
+
+        # Failing credentials are forgotten & still get the first backend's
+        # response.
+        john_doe.api_key.delete()
+        request = build_request()
+        check = auth.is_authenticated(request)
+        self.assertTrue(isinstance(check, HttpUnauthorized))
+        self.assertEqual(check['WWW-Authenticate'], 'Basic Realm="django-tastypie"')
+        self.assertFalse(fingerprint in auth._preferred_backends)
+
+    def test_fingerprint(self):
+        auth = MultiAuthentication(BasicAuthentication(), ApiKeyAuthentication(), max_remembered=1)
+        request = HttpRequest()
+        self.assertEqual(auth.get_fingerprint(request), None)
+
+        request.GET['username'] = 'johndoe'
+        first = auth.get_fingerprint(request)
+        request.GET['api_key'] = 'abc'
+        second = auth.get_fingerprint(request)
+        self.assertNotEqual(first, second)
 
+        auth.remember_backend(first, 1)
+        auth.remember_backend(second, 0)
+        self.assertEqual(auth._preferred_backends, {second: 0})
+
+        # More than one kind of credentials isn't fingerprinted.
+        request.META['HTTP_AUTHORIZATION'] = 'Basic abc'
+        self.assertEqual(auth.get_fingerprint(request), None)
+
+    def test_several_credentials_keep_declared_order(self):
+        basic_auth = BasicAuthentication()
+        api_key_auth = ApiKeyAuthentication()
+        auth = MultiAuthentication(basic_auth, api_key_auth)
+        john_doe = User.objects.get(username='johndoe')
+        john_doe.set_password('pass')
+        john_doe.save()
+        jane_doe = User.objects.get(username='janedoe')
+        ApiKey.objects.get_or_create(user=jane_doe)
+
+        def build_request(basic=True):
+            request = HttpRequest()
+            request.GET['username'] = 'janedoe'
+            request.GET['api_key'] = jane_doe.api_key.key
+
+            if basic:
+                request.META['HTTP_AUTHORIZATION'] = 'Basic %s' % base64.b64encode('johndoe:pass'.encode('utf-8')).decode('utf-8')
+
+            return request
+
+        # The API key alone is remembered...
+        request = build_request(basic=False)
+        self.assertEqual(auth.is_authenticated(request), True)
+        self.assertTrue(request._authentication_backend is api_key_auth)
+
+        # ...but with Basic credentials as well, Basic still goes first.
+        request = build_request()
+        self.assertEqual(auth.is_authenticated(request), True)
+        self.assertTrue(request._authentication_backend is basic_auth)
+        self.assertEqual(request.user.username, 'johndoe')
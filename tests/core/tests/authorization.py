@@ -1,8 +1,11 @@
+import json
+import mock
 from django.test import TestCase
 from django.http import HttpRequest
-from django.contrib.auth.models import User, Permission
+from django.contrib.auth.models import User, Permission, AnonymousUser
+from django.db.models import Q
 from core.models import Note
-from tastypie.authorization import Authorization, ReadOnlyAuthorization, DjangoAuthorization
+from tastypie.authorization import Authorization, ReadOnlyAuthorization, DjangoAuthorization, RowLevelAuthorization
 from tastypie.exceptions import Unauthorized
 from tastypie import fields
 from tastypie.resources import Resource, ModelResource
@@ -29,6 +32,16 @@ class DjangoNoteResource(ModelResource):
         authorization = DjangoAuthorization()
 
 
+class RowLevelNoteResource(ModelResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = RowLevelAuthorization(rules={
+            'read': [{'author': lambda user: user}, Q(pk=6)],
+            'delete': False,
+        })
+
+
 class NotAModel(object):
     name = 'Foo'
 
@@ -238,3 +251,153 @@ class DjangoAuthorizationTestCase(TestCase):
         bundle.request.method = 'DELETE'
         self.assertEqual(len(auth.delete_list(resource.get_object_list(bundle.request), bundle)), 4)
         self.assertTrue(auth.delete_detail(resource.get_object_list(bundle.request)[0], bundle))
+
+    def test_permissions_memoized_per_request(self):
+        self.user.user_permissions.add(self.change)
+        request = HttpRequest()
+        request.user = User.objects.get(pk=self.user.pk)
+        resource = DjangoNoteResource()
+        auth = resource._meta.authorization
+        notes = list(resource.get_object_list(request))
+
+        with mock.patch.object(request.user, 'has_perm', side_effect=lambda perm: perm == 'core.change_note') as mocked:
+            for note in notes:
+                bundle = resource.build_bundle(obj=note, request=request)
+                self.assertTrue(auth.update_detail(notes, bundle))
+
+            self.assertEqual(len(auth.update_list(resource.get_object_list(request), bundle)), 4)
+            self.assertEqual(mocked.call_count, 1)
+            mocked.assert_called_with('core.change_note')
+
+            bundle = resource.build_bundle(obj=notes[0], request=request)
+            self.assertRaises(Unauthorized, auth.delete_detail, notes, bundle)
+            self.assertEqual(mocked.call_count, 2)
+
+        # A fresh request asks again.
+        request = HttpRequest()
+        request.user = self.user
+        bundle = resource.build_bundle(obj=notes[0], request=request)
+        self.assertRaises(Unauthorized, auth.delete_detail, notes, bundle)
+
+    def test_list_of_instances(self):
+        self.user.user_permissions.add(self.add)
+        request = HttpRequest()
+        request.user = self.user
+        resource = DjangoNoteResource()
+        auth = resource._meta.authorization
+        bundle = resource.build_bundle(request=request)
+        notes = list(resource.get_object_list(request))
+
+        self.assertEqual(auth.create_list(notes, bundle), notes)
+        self.assertEqual(auth.delete_list(notes, bundle), [])
+        self.assertEqual(auth.create_list([], bundle), [])
+
+        # Objects that aren't models are never authorized.
+        self.assertEqual(auth.create_list(notes + [NotAModel()], bundle), notes)
+
+
+class RowLevelAuthorizationTestCase(TestCase):
+    fixtures = ['note_testdata']
+
+    def setUp(self):
+        super(RowLevelAuthorizationTestCase, self).setUp()
+        self.resource = RowLevelNoteResource()
+        self.auth = self.resource._meta.authorization
+        self.auth._compiled.clear()
+        self.request = HttpRequest()
+        self.request.user = User.objects.get(username='johndoe')
+
+    def test_compile_rule(self):
+        user = self.request.user
+        self.assertEqual(self.auth.compile_rule(True, user), True)
+        self.assertEqual(self.auth.compile_rule([False, lambda user: True], user), True)
+        self.assertEqual(self.auth.compile_rule([], user), False)
+        compiled = self.auth.compile_rule({'author': lambda user: user}, user)
+        self.assertEqual(compiled.children, [('author', user)])
+
+    def test_read_list(self):
+        bundle = self.resource.build_bundle(request=self.request)
+        notes = self.auth.read_list(self.resource.get_object_list(self.request), bundle)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(sorted([note.pk for note in notes]), [1, 2, 6])
+
+        # Plain lists are filtered with a single query too.
+        all_notes = list(Note.objects.all())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(sorted([note.pk for note in self.auth.update_list(all_notes, bundle)]), [1, 2, 5, 6])
+
+        self.assertEqual(len(self.auth.delete_list(self.resource.get_object_list(self.request), bundle)), 0)
+
+        # No user, no rows.
+        bundle = self.resource.build_bundle(request=HttpRequest())
+        self.assertEqual(len(self.auth.read_list(self.resource.get_object_list(bundle.request), bundle)), 0)
+
+    def test_obj_get(self):
+        bundle = self.resource.build_bundle(request=self.request)
+
+        # The rule is part of the lookup, so there's no separate check.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.resource.obj_get(bundle, pk=1).pk, 1)
+
+        self.assertRaises(Note.DoesNotExist, self.resource.obj_get, bundle, pk=4)
+
+        # Updates share the read rule, which the lookup already enforced.
+        with self.assertNumQueries(0):
+            self.assertTrue(self.auth.update_detail(self.resource.get_object_list(self.request), bundle))
+
+        self.assertRaises(Unauthorized, self.auth.delete_detail, self.resource.get_object_list(self.request), bundle)
+
+        # Objects that didn't come through the lookup are checked in the DB.
+        bundle = self.resource.build_bundle(obj=Note.objects.get(pk=4), request=self.request)
+        self.assertRaises(Unauthorized, self.auth.update_detail, self.resource.get_object_list(self.request), bundle)
+        bundle = self.resource.build_bundle(obj=Note.objects.get(pk=6), request=self.request)
+        self.assertTrue(self.auth.read_detail(self.resource.get_object_list(self.request), bundle))
+
+    def test_anonymous(self):
+        request = HttpRequest()
+        request.method = 'GET'
+        request.GET = {'format': 'json'}
+        request.user = AnonymousUser()
+
+        resp = self.resource.get_list(request)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.content.decode('utf-8'))['objects'], [])
+
+        bundle = self.resource.build_bundle(request=request)
+        self.assertRaises(Note.DoesNotExist, self.resource.obj_get, bundle, pk=6)
+        self.assertRaises(Unauthorized, self.auth.create_detail, None, bundle)
+
+        # Rules can opt in to anonymous users.
+        auth = RowLevelAuthorization(rules={
+            'read': lambda user: Q(pk=6) if user.is_anonymous() else {'author': user},
+        }, allow_anonymous=True)
+        notes = auth.read_list(self.resource.get_object_list(request), bundle)
+        self.assertEqual([note.pk for note in notes], [6])
+
+    def test_compiled_rules_cached(self):
+        calls = []
+
+        def rule(user):
+            calls.append(user)
+            return {'author': user}
+
+        auth = RowLevelAuthorization(rules={'read': rule}, ttl=60)
+        auth.get_compiled(self.request, 'read')
+        auth.get_compiled(self.request, 'update')
+        self.assertEqual(len(calls), 1)
+
+        auth.ttl = -1
+        auth._compiled.clear()
+        auth.get_compiled(self.request, 'read')
+        auth.get_compiled(self.request, 'read')
+        self.assertEqual(len(calls), 3)
+
+    def test_create(self):
+        bundle = self.resource.build_bundle(request=self.request)
+        self.assertTrue(self.auth.create_detail(None, bundle))
+
+        auth = RowLevelAuthorization(rules={'create': lambda user: user.is_staff})
+        self.assertRaises(Unauthorized, auth.create_detail, None, bundle)
+        self.assertEqual(auth.create_list([1, 2], bundle), [])
@@ -0,0 +1,230 @@
+import json
+
+from django.core.urlresolvers import set_script_prefix
+from django.http import HttpRequest
+from django.test import TestCase, TransactionTestCase
+from django.test.testcases import skipIf
+from django.utils import timezone, translation
+
+from tastypie.authentication import ApiKeyAuthentication
+from tastypie.batch import Batch
+from tastypie.compat import HAS_ATOMIC
+from core.models import Note
+from core.tests.batch_urls import api, CountingAuthentication
+
+
+class BatchTestMixin(object):
+    fixtures = ['note_testdata.json']
+    urls = 'core.tests.batch_urls'
+
+    def setUp(self):
+        super(BatchTestMixin, self).setUp()
+        CountingAuthentication.calls = 0
+
+    def post_batch(self, data, path='/api/v1/batch/', **extra):
+        return self.client.post(path, data=json.dumps(data), content_type='application/json', HTTP_ACCEPT='application/json', **extra)
+
+    def deserialize(self, response):
+        return json.loads(response.content.decode('utf-8'))
+
+
+class BatchTestCase(BatchTestMixin, TestCase):
+
+    def test_get(self):
+        response = self.post_batch([
+            {'method': 'GET', 'path': '/api/v1/notes/?limit=2'},
+            {'path': '/api/v1/notes/1/'},
+            {'path': '/api/v1/notes/9999/'},
+            {'path': '/api/v1/nothing/'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        results = self.deserialize(response)
+
+        self.assertEqual([result['status'] for result in results], [200, 200, 404, 404])
+        self.assertEqual(results[0]['headers']['Content-Type'], 'application/json')
+        self.assertEqual(results[0]['body']['meta']['limit'], 2)
+        self.assertEqual(len(results[0]['body']['objects']), 2)
+        self.assertEqual(results[1]['body']['title'], 'First Post!')
+        self.assertEqual(results[1]['body']['resource_uri'], '/api/v1/notes/1/')
+
+    def test_writes(self):
+        response = self.post_batch([
+            {'method': 'POST', 'path': '/api/v1/notes/', 'body': {'title': 'Batched', 'slug': 'batched', 'content': 'Hello.'}},
+            {'method': 'PATCH', 'path': '/api/v1/notes/1/', 'body': {'title': 'Patched'}},
+            {'method': 'DELETE', 'path': '/api/v1/notes/2/'},
+            {'method': 'GET', 'path': '/api/v1/notes/1/'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = self.deserialize(response)
+
+        self.assertEqual([result['status'] for result in results], [201, 202, 204, 200])
+        self.assertTrue(results[0]['headers']['Location'].endswith('/api/v1/notes/%d/' % Note.objects.get(slug='batched').pk))
+        self.assertEqual(results[2]['body'], None)
+        self.assertEqual(results[3]['body']['title'], 'Patched')
+        self.assertFalse(Note.objects.filter(pk=2).exists())
+
+    def test_headers(self):
+        response = self.post_batch([
+            {'path': '/api/v1/notes/1/', 'headers': {'Accept': 'application/xml'}},
+        ])
+        result = self.deserialize(response)[0]
+        self.assertEqual(result['headers']['Content-Type'], 'application/xml; charset=utf-8')
+        # Formats other than the batch's are passed along as text.
+        self.assertTrue(result['body'].startswith("<?xml version='1.0' encoding='utf-8'?>"))
+
+    def test_authenticates_once(self):
+        response = self.post_batch([
+            {'path': '/api/v1/notes/'},
+            {'path': '/api/v1/notes/1/'},
+            {'path': '/api/v1/users/'},
+            {'method': 'POST', 'path': '/api/v1/notes/', 'body': {'title': 'Batched', 'slug': 'batched'}},
+            {'method': 'POST', 'path': '/api/v1/notes/', 'body': {'title': 'Again', 'slug': 'again'}},
+        ])
+        self.assertEqual([result['status'] for result in self.deserialize(response)], [200, 200, 200, 201, 201])
+        # Once for the ``GET`` requests & once for the ``POST`` requests.
+        self.assertEqual(CountingAuthentication.calls, 2)
+
+        # Sub-requests with credentials of their own are authenticated anew.
+        CountingAuthentication.calls = 0
+        response = self.post_batch([
+            {'path': '/api/v1/notes/'},
+            {'path': '/api/v1/notes/', 'headers': {'Authorization': 'ApiKey johndoe:1234'}},
+            {'path': '/api/v1/notes/?api_key=1234'},
+            {'path': '/api/v1/notes/', 'headers': {'Cookie': 'sessionid=abc'}},
+            {'path': '/api/v1/notes/1/', 'headers': {'Authorization': 'ApiKey johndoe:1234'}},
+        ])
+        self.assertEqual([result['status'] for result in self.deserialize(response)], [200] * 5)
+        self.assertEqual(CountingAuthentication.calls, 4)
+
+        api.batch.reuse_authentication = False
+
+        try:
+            CountingAuthentication.calls = 0
+            self.post_batch([{'path': '/api/v1/notes/'}, {'path': '/api/v1/notes/1/'}, {'path': '/api/v1/users/'}])
+            self.assertEqual(CountingAuthentication.calls, 3)
+        finally:
+            api.batch.reuse_authentication = True
+
+    def test_batch_authentication(self):
+        batch = Batch(authentication=ApiKeyAuthentication())
+        request = HttpRequest()
+        request.method = 'POST'
+        request.META['HTTP_ACCEPT'] = 'application/json'
+        response = batch.dispatch(api, request)
+        self.assertEqual(response.status_code, 401)
+
+    def test_without_transaction(self):
+        count = Note.objects.count()
+        response = self.post_batch([
+            {'method': 'POST', 'path': '/api/v1/notes/', 'body': {'title': 'Batched', 'slug': 'batched'}},
+            {'method': 'PATCH', 'path': '/api/v1/notes/9999/', 'body': {'title': 'Missing'}},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in self.deserialize(response)], [201, 404])
+        self.assertEqual(Note.objects.count(), count + 1)
+
+    def test_invalid(self):
+        self.assertEqual(self.client.get('/api/v1/batch/').status_code, 405)
+
+        response = self.client.post('/api/v1/batch/', data='[{"path": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.deserialize(response), {'error': "The batch couldn't be read as 'application/json'."})
+
+        cases = [
+            ([], "A batch must be a non-empty list of requests."),
+            ({'requests': 'nope'}, "A batch must be a non-empty list of requests."),
+            ([{'path': '/api/v1/notes/'}] * 6, "A batch may have at most 5 requests."),
+            ([{'method': 'GET'}], "Request 0 needs a 'path'."),
+            ([{'path': '/api/v1/notes/'}, {'method': 'OPTIONS', 'path': '/api/v1/notes/'}], "Request 1 has an unsupported method 'OPTIONS'."),
+            ([{'path': '/admin/'}], "Request 0 must be for a path beneath '/api/v1/'."),
+            ([{'path': '/api/v2/threads/'}], "Request 0 must be for a path beneath '/api/v1/'."),
+            ([{'path': '/api/v1/notes/', 'headers': ['Accept']}], "Request 0 has 'headers' that aren't a dictionary."),
+        ]
+
+        for data, error in cases:
+            response = self.post_batch(data)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(self.deserialize(response), {'error': error})
+
+    def test_nested(self):
+        response = self.post_batch([{'method': 'POST', 'path': '/api/v1/batch/', 'body': [{'path': '/api/v1/notes/'}]}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.deserialize(response)[0]['status'], 400)
+
+    def test_parallel(self):
+        self.assertFalse(api.batch.can_run_in_parallel())
+
+        response = self.post_batch([{'path': '/api/v2/threads/'}] * 4 + [{'path': '/api/v2/threads/1/'}], path='/api/v2/batch/')
+        self.assertEqual(response.status_code, 200)
+        results = self.deserialize(response)
+        self.assertEqual([result['status'] for result in results], [200] * 5)
+        threads = set([results[index]['body']['objects'][0]['thread'] for index in range(4)] + [results[4]['body']['thread']])
+        self.assertFalse('MainThread' in threads)
+        self.assertTrue(1 <= len(threads) <= 3)
+
+        # The threads run with the script prefix, URLconf, language & time
+        # zone of the batch request.
+        set_script_prefix('/prefix/')
+
+        try:
+            with translation.override('de'):
+                with timezone.override('Europe/Berlin'):
+                    response = self.post_batch([{'path': '/prefix/api/v2/threads/1/'}] * 2, path='/api/v2/batch/', SCRIPT_NAME='/prefix')
+        finally:
+            set_script_prefix('/')
+
+        self.assertEqual(response.status_code, 200)
+
+        for result in self.deserialize(response):
+            self.assertNotEqual(result['body']['thread'], 'MainThread')
+            self.assertEqual(result['body']['script_prefix'], '/prefix/')
+            self.assertEqual(result['body']['urlconf'], 'core.tests.batch_urls')
+            self.assertEqual(result['body']['language'], 'de')
+            self.assertEqual(result['body']['timezone'], 'Europe/Berlin')
+            self.assertEqual(result['body']['resource_uri'], '/prefix/api/v2/threads/1/')
+
+    def test_top_level(self):
+        response = self.client.get('/api/v1/', HTTP_ACCEPT='application/json')
+        self.assertFalse('batch' in self.deserialize(response))
+
+
+class BatchTransactionTestCase(BatchTestMixin, TransactionTestCase):
+    @skipIf(not HAS_ATOMIC, "Transactional batches need Django 1.6+.")
+    def test_transaction(self):
+        count = Note.objects.count()
+        response = self.post_batch({'transaction': True, 'requests': [
+            {'method': 'POST', 'path': '/api/v1/notes/', 'body': {'title': 'Batched', 'slug': 'batched'}},
+            {'method': 'PATCH', 'path': '/api/v1/notes/9999/', 'body': {'title': 'Missing'}},
+            {'method': 'POST', 'path': '/api/v1/notes/', 'body': {'title': 'Never', 'slug': 'never'}},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        # Stops at the first failure.
+        self.assertEqual([result['status'] for result in self.deserialize(response)], [201, 404])
+        self.assertEqual(Note.objects.count(), count)
+
+        response = self.post_batch({'transaction': True, 'requests': [
+            {'method': 'POST', 'path': '/api/v1/notes/', 'body': {'title': 'Batched', 'slug': 'batched'}},
+            {'method': 'POST', 'path': '/api/v1/notes/', 'body': {'title': 'Again', 'slug': 'again'}},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Note.objects.count(), count + 2)
+
+        api.batch.allow_transactions = False
+
+        try:
+            response = self.post_batch({'transaction': True, 'requests': [{'path': '/api/v1/notes/'}]})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(self.deserialize(response), {'error': "Transactions aren't allowed."})
+        finally:
+            api.batch.allow_transactions = True
+
+    @skipIf(HAS_ATOMIC, "Transactional batches are refused before Django 1.6.")
+    def test_transaction_refused(self):
+        count = Note.objects.count()
+        response = self.post_batch({'transaction': True, 'requests': [
+            {'method': 'POST', 'path': '/api/v1/notes/', 'body': {'title': 'Batched', 'slug': 'batched'}},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.deserialize(response), {'error': "Transactions need Django 1.6 or later."})
+        self.assertEqual(Note.objects.count(), count)
@@ -0,0 +1,91 @@
+try:
+    from django.conf.urls import patterns, include
+except ImportError: # Django < 1.4
+    from django.conf.urls.defaults import patterns, include
+import threading
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import get_script_prefix, get_urlconf
+from django.utils import timezone, translation
+from tastypie import fields
+from tastypie.api import Api
+from tastypie.authentication import Authentication
+from tastypie.authorization import Authorization
+from tastypie.batch import Batch
+from tastypie.resources import ModelResource, Resource
+from core.models import Note
+
+
+class CountingAuthentication(Authentication):
+    calls = 0
+
+    def is_authenticated(self, request, **kwargs):
+        CountingAuthentication.calls += 1
+        return super(CountingAuthentication, self).is_authenticated(request, **kwargs)
+
+
+class BatchNoteResource(ModelResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authentication = CountingAuthentication()
+        authorization = Authorization()
+
+
+class BatchUserResource(ModelResource):
+    class Meta:
+        resource_name = 'users'
+        queryset = User.objects.all()
+        authentication = CountingAuthentication()
+        excludes = ['password']
+
+
+class ThreadObject(object):
+    def __init__(self):
+        self.pk = 1
+        self.thread = threading.current_thread().name
+        self.script_prefix = get_script_prefix()
+        self.urlconf = get_urlconf()
+        self.language = translation.get_language()
+        self.timezone = timezone.get_current_timezone_name()
+
+
+class ThreadResource(Resource):
+    thread = fields.CharField(attribute='thread')
+    script_prefix = fields.CharField(attribute='script_prefix')
+    urlconf = fields.CharField(attribute='urlconf', null=True)
+    language = fields.CharField(attribute='language')
+    timezone = fields.CharField(attribute='timezone')
+
+    class Meta:
+        resource_name = 'threads'
+        object_class = ThreadObject
+
+    def detail_uri_kwargs(self, bundle_or_obj):
+        return {'pk': 1}
+
+    def obj_get_list(self, bundle, **kwargs):
+        return [ThreadObject()]
+
+    def obj_get(self, bundle, **kwargs):
+        return ThreadObject()
+
+
+class ParallelBatch(Batch):
+    # The test database is in memory & within a transaction, which threads
+    # can't share. These requests don't touch it.
+    def can_run_in_parallel(self):
+        return self.parallel
+
+
+api = Api(api_name='v1', batch=Batch(max_requests=5))
+api.register(BatchNoteResource())
+api.register(BatchUserResource())
+
+parallel_api = Api(api_name='v2', batch=ParallelBatch(parallel=True, workers=3))
+parallel_api.register(ThreadResource())
+
+urlpatterns = patterns('',
+    (r'^api/', include(api.urls)),
+    (r'^api/', include(parallel_api.urls)),
+)
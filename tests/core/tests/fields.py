@@ -605,6 +605,14 @@ class UserResource(ModelResource):
         return '/api/v1/users/%s/' % bundle_or_obj.obj.id
 
 
+class CountingUserResource(UserResource):
+    dehydrated = 0
+
+    def full_dehydrate(self, bundle, for_list=False):
+        CountingUserResource.dehydrated += 1
+        return super(CountingUserResource, self).full_dehydrate(bundle, for_list=for_list)
+
+
 class ToOneFieldTestCase(TestCase):
     fixtures = ['note_testdata.json']
 
@@ -734,6 +742,46 @@ class ToOneFieldTestCase(TestCase):
         field_1 = ToOneField(UserResource, 'author', full=True, full_detail=False)
         self.assertEqual(field_1.dehydrate(bundle, for_list=False), '/api/v1/users/1/')
 
+    def test_dehydrate_identity_map(self):
+        CountingUserResource.dehydrated = 0
+        request = MockRequest()
+        request.path = "/api/v1/notes/"
+        field_1 = ToOneField(CountingUserResource, 'author', full=True)
+        notes = list(Note.objects.filter(author__pk=1))
+        self.assertTrue(len(notes) > 1)
+
+        user_bundles = [field_1.dehydrate(Bundle(obj=note, request=request)) for note in notes]
+        self.assertEqual(CountingUserResource.dehydrated, 1)
+        self.assertEqual(len(request._related_identity_map), 1)
+
+        for note, user_bundle in zip(notes, user_bundles):
+            self.assertEqual(user_bundle.data['username'], u'johndoe')
+            self.assertTrue(user_bundle.obj is note.author)
+
+        # Each gets its own data.
+        user_bundles[0].data['username'] = 'changed'
+        self.assertEqual(user_bundles[1].data['username'], u'johndoe')
+        self.assertEqual(field_1.dehydrate(Bundle(obj=notes[0], request=request)).data['username'], u'johndoe')
+
+        # Detail representations are kept apart from list ones.
+        field_1.dehydrate(Bundle(obj=notes[0], request=request), for_list=False)
+        self.assertEqual(CountingUserResource.dehydrated, 2)
+
+        # URIs are remembered too.
+        field_2 = ToOneField(CountingUserResource, 'author')
+        self.assertEqual(field_2.dehydrate(Bundle(obj=notes[0], request=request)), '/api/v1/users/1/')
+        self.assertEqual(len(request._related_identity_map), 3)
+
+        # Writes aren't mapped.
+        request = MockRequest()
+        request.method = 'POST'
+
+        for note in notes:
+            field_1.dehydrate(Bundle(obj=note, request=request))
+
+        self.assertEqual(CountingUserResource.dehydrated, 2 + len(notes))
+        self.assertFalse(hasattr(request, '_related_identity_map'))
+
     def test_hydrate(self):
         note = Note()
         bundle = Bundle(obj=note)
@@ -1227,6 +1275,22 @@ class ToManyFieldTestCase(TestCase):
         self.assertEqual(subject_bundle_list[1].obj.name, u'Photos')
         self.assertEqual(subject_bundle_list[1].obj.url, u'/photos/')
 
+    def test_dehydrate_identity_map(self):
+        field_1 = ToManyField(SubjectResource, 'subjects', full=True)
+        field_1.instance_name = 'm2m'
+        request = MockRequest()
+        request.path = "/api/v1/notes/"
+
+        subject_bundle_list_1 = field_1.dehydrate(Bundle(obj=self.note_1, request=request))
+        self.assertEqual(len(field_1.m2m_resources), 2)
+
+        # "News" is shared, so only "Personal Interest" is dehydrated.
+        subject_bundle_list_2 = field_1.dehydrate(Bundle(obj=self.note_2, request=request))
+        self.assertEqual(len(field_1.m2m_resources), 1)
+        self.assertEqual([subject_bundle.data['name'] for subject_bundle in subject_bundle_list_2], [u'News', u'Personal Interest'])
+        self.assertFalse(subject_bundle_list_2[0] is subject_bundle_list_1[0])
+        self.assertEqual(len(request._related_identity_map), 3)
+
     def test_dehydrate_with_callable(self):
         note = Note()
         bundle_1 = Bundle(obj=self.note_2)
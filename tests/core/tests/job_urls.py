@@ -0,0 +1,26 @@
+try:
+    from django.conf.urls import patterns, include
+except ImportError: # Django < 1.4
+    from django.conf.urls.defaults import patterns, include
+from tastypie.api import Api
+from tastypie.authorization import Authorization
+from tastypie.jobs import BaseJobQueue, JobResource
+from tastypie.resources import ModelResource
+from core.models import Note
+
+
+class JobNoteResource(ModelResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = Authorization()
+        job_queue = BaseJobQueue()
+
+
+api = Api(api_name='v1')
+api.register(JobNoteResource())
+api.register(JobResource())
+
+urlpatterns = patterns('',
+    (r'^api/', include(api.urls)),
+)
@@ -0,0 +1,150 @@
+import json
+import threading
+
+from django.core.cache import cache
+from django.core.urlresolvers import get_script_prefix, set_script_prefix, get_urlconf, set_urlconf
+from django.http import HttpRequest
+from django.test import TestCase
+from django.utils import translation
+from mock import patch
+
+from tastypie.exceptions import NotFound
+from tastypie.jobs import Job, JobResource, ThreadedJobQueue
+from core.models import Note
+from core.tests.job_urls import JobNoteResource
+
+
+class JobTestCase(TestCase):
+    def tearDown(self):
+        cache.clear()
+        super(JobTestCase, self).tearDown()
+
+    def test_lifecycle(self):
+        job = Job('notes', 'patch', total=3)
+        self.assertEqual(job.state, Job.PENDING)
+        self.assertEqual(Job.load(job.id), None)
+
+        job.start()
+        self.assertEqual(Job.load(job.id).state, Job.RUNNING)
+
+        # Progress is only saved now & then.
+        job.advance(2)
+        self.assertEqual(job.completed, 2)
+        self.assertEqual(Job.load(job.id).completed, 0)
+
+        job.saved_at -= Job.save_interval
+        job.advance()
+        self.assertEqual(Job.load(job.id).completed, 3)
+
+        job.finish(202)
+        loaded = Job.load(job.id)
+        self.assertEqual(loaded.state, Job.SUCCEEDED)
+        self.assertEqual(loaded.status_code, 202)
+        self.assertTrue(loaded.finished is not None)
+
+        job.finish(400, errors=[{'index': 1, 'error': 'Nope.'}])
+        self.assertEqual(Job.load(job.id).state, Job.FAILED)
+
+    def test_job_resource(self):
+        job = Job('notes', 'put', total=1, owner=1)
+        job.save()
+        resource = JobResource()
+        bundle = resource.build_bundle(request=HttpRequest())
+
+        # Jobs belonging to someone are hidden from everyone else.
+        self.assertRaises(NotFound, resource.obj_get, bundle, id=job.id)
+        self.assertRaises(NotFound, resource.obj_get, bundle, id='nope')
+
+        job.owner = None
+        job.save()
+        self.assertEqual(resource.obj_get(bundle, id=job.id).id, job.id)
+
+    def test_threaded_queue(self):
+        job_queue = ThreadedJobQueue(workers=1)
+        job = job_queue.create_job('notes', 'patch')
+        done = threading.Event()
+
+        job_queue.enqueue(job, done.set)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(len(job_queue._threads), 1)
+        self.assertEqual(Job.load(job.id).state, Job.PENDING)
+
+
+class AsyncWriteTestCase(TestCase):
+    fixtures = ['note_testdata.json']
+    urls = 'core.tests.job_urls'
+
+    def tearDown(self):
+        cache.clear()
+        super(AsyncWriteTestCase, self).tearDown()
+
+    def test_patch_list_async(self):
+        data = {'objects': [{'title': 'New', 'slug': 'new'}, {'resource_uri': '/api/v1/notes/2/', 'content': 'This is note 2.'}]}
+        resp = self.client.generic('PATCH', '/api/v1/notes/', data=json.dumps(data), content_type='application/json', HTTP_PREFER='respond-async')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp['Preference-Applied'], 'respond-async')
+        job_uri = json.loads(resp.content.decode('utf-8'))['resource_uri']
+        self.assertTrue(job_uri.startswith('/api/v1/jobs/'))
+        self.assertTrue(resp['Location'].endswith(job_uri))
+        self.assertEqual(Note.objects.get(pk=2).content, 'This is note 2.')
+
+        resp = self.client.get(job_uri, data={'format': 'json'})
+        self.assertEqual(resp.status_code, 200)
+        job = json.loads(resp.content.decode('utf-8'))
+        self.assertEqual(job['state'], 'succeeded')
+        self.assertEqual(job['method'], 'patch')
+        self.assertEqual(job['total'], 2)
+        self.assertEqual(job['completed'], 2)
+        self.assertEqual(job['status_code'], 202)
+        self.assertEqual(job['errors'], [])
+
+    def test_put_list_async_errors(self):
+        data = {'objects': [{'title': 'New', 'slug': 'new', 'created': 'not a date'}]}
+        resp = self.client.put('/api/v1/notes/', data=json.dumps(data), content_type='application/json', HTTP_PREFER='respond-async')
+        self.assertEqual(resp.status_code, 202)
+
+        job = json.loads(self.client.get(resp['Location'], data={'format': 'json'}).content.decode('utf-8'))
+        self.assertEqual(job['state'], 'failed')
+        self.assertEqual(job['status_code'], 400)
+        self.assertEqual(job['errors'][0]['index'], 0)
+
+    def test_async_envelope_checked(self):
+        resp = self.client.put('/api/v1/notes/', data=json.dumps({'nope': []}), content_type='application/json', HTTP_PREFER='respond-async')
+        self.assertEqual(resp.status_code, 400)
+
+    def test_sync_without_prefer(self):
+        data = {'objects': [{'title': 'New', 'slug': 'new'}]}
+        resp = self.client.put('/api/v1/notes/', data=json.dumps(data), content_type='application/json')
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(Note.objects.filter(is_active=True).count(), 1)
+
+    def test_threaded_job_keeps_request_state(self):
+        resource = JobNoteResource()
+        seen = {}
+        done = threading.Event()
+
+        def run_job(job, request, method, **kwargs):
+            seen.update(script_prefix=get_script_prefix(), urlconf=get_urlconf(), language=translation.get_language())
+            done.set()
+
+        request = HttpRequest()
+        request.method = 'PATCH'
+        request._body = json.dumps({'objects': []}).encode('utf-8')
+        request.META['CONTENT_TYPE'] = 'application/json'
+
+        set_script_prefix('/prefix/')
+        set_urlconf('core.tests.job_urls')
+
+        try:
+            with patch.object(resource._meta, 'job_queue', ThreadedJobQueue(workers=1)):
+                with patch.object(resource, 'run_job', side_effect=run_job):
+                    with translation.override('de'):
+                        resp = resource.enqueue_job(request, 'patch')
+
+                    self.assertEqual(resp.status_code, 202)
+                    self.assertTrue(done.wait(5))
+        finally:
+            set_script_prefix('/')
+            set_urlconf(None)
+
+        self.assertEqual(seen, {'script_prefix': '/prefix/', 'urlconf': 'core.tests.job_urls', 'language': 'de'})
@@ -0,0 +1,11 @@
+from django.conf.urls import patterns, include
+
+from tastypie.api import Api
+
+
+api = Api()
+api.register('core.tests.lazy_resources.CustomNoteResource', resource_name='custom')
+
+urlpatterns = patterns('',
+    (r'^api/', include(api.urls)),
+)
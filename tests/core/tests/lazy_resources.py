@@ -0,0 +1,48 @@
+from django.conf.urls import url
+from django.contrib.auth.models import User
+from tastypie import fields
+from tastypie.resources import ModelResource
+from tastypie.utils import trailing_slash
+from core.models import Note
+
+
+class LazyUserResource(ModelResource):
+    class Meta:
+        resource_name = 'lazy-users'
+        queryset = User.objects.all()
+
+
+class LazyNoteResource(ModelResource):
+    author = fields.ForeignKey('core.tests.lazy_resources.LazyUserResource', 'author', null=True)
+
+    class Meta:
+        resource_name = 'lazy-notes'
+        queryset = Note.objects.filter(is_active=True)
+
+
+class SlugNoteResource(ModelResource):
+    class Meta:
+        queryset = Note.objects.filter(is_active=True)
+        detail_uri_name = 'slug'
+
+
+class WordNoteResource(ModelResource):
+    class Meta:
+        queryset = Note.objects.filter(is_active=True)
+
+    def base_urls(self):
+        return [
+            url(r"^(?P<resource_name>%s)%s$" % (self._meta.resource_name, trailing_slash()), self.wrap_view('dispatch_list'), name="api_dispatch_list"),
+            url(r"^(?P<resource_name>%s)/(?P<pk>\w[\w-]*)%s$" % (self._meta.resource_name, trailing_slash()), self.wrap_view('dispatch_detail'), name="api_dispatch_detail"),
+        ]
+
+
+class CustomNoteResource(ModelResource):
+    class Meta:
+        resource_name = 'custom'
+        queryset = Note.objects.filter(is_active=True)
+
+    def prepend_urls(self):
+        return [
+            url(r"^(?P<resource_name>%s)/special%s$" % (self._meta.resource_name, trailing_slash()), self.wrap_view('dispatch_list'), name="custom_special"),
+        ]
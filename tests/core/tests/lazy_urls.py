@@ -0,0 +1,13 @@
+from django.conf.urls import patterns, include
+
+from tastypie.api import Api
+
+
+api = Api()
+api.register('core.tests.lazy_resources.LazyNoteResource', resource_name='lazy-notes')
+api.register('core.tests.lazy_resources.SlugNoteResource', detail_uri_name='slug')
+api.register('core.tests.lazy_resources.WordNoteResource', detail_uri_regex=r'\w[\w-]*')
+
+urlpatterns = patterns('',
+    (r'^api/', include(api.urls)),
+)
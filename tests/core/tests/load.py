@@ -0,0 +1,221 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.test.testcases import skipIf
+
+from tastypie.load import ScenarioStep, Scenario, LoadReport, LoadRunner, HISTOGRAM_BUCKETS
+
+
+class ScenarioStepTestCase(TestCase):
+    def test_init(self):
+        step = ScenarioStep('/api/v1/notes/')
+        self.assertEqual(step.method, 'get')
+        self.assertEqual(step.name, 'GET /api/v1/notes/')
+        self.assertEqual(step.weight, 1)
+
+        step = ScenarioStep('/api/v1/notes/', method='POST', name='create')
+        self.assertEqual(step.method, 'post')
+        self.assertEqual(step.name, 'create')
+
+        self.assertRaises(ImproperlyConfigured, ScenarioStep, '/api/v1/notes/', method='options')
+        self.assertRaises(ImproperlyConfigured, ScenarioStep, '/api/v1/notes/', weight=0)
+        self.assertRaises(ImproperlyConfigured, ScenarioStep, '/api/v1/notes/', data={'objects': {}}, repeat={'objects': 5})
+        self.assertRaises(ImproperlyConfigured, ScenarioStep, '/api/v1/notes/', repeat={'objects': 5})
+
+    def test_is_error(self):
+        step = ScenarioStep('/api/v1/notes/')
+        self.assertFalse(step.is_error(200))
+        self.assertFalse(step.is_error(302))
+        self.assertTrue(step.is_error(404))
+        self.assertTrue(step.is_error(500))
+
+        step = ScenarioStep('/api/v1/notes/', expect=[201, 429])
+        self.assertTrue(step.is_error(200))
+        self.assertFalse(step.is_error(201))
+        self.assertFalse(step.is_error(429))
+
+    def test_build_data(self):
+        self.assertEqual(ScenarioStep('/api/v1/notes/').build_data(3), None)
+
+        step = ScenarioStep('/api/v1/notes/', method='patch', data={
+            'objects': [{'title': 'Note {n}-{i}', 'slug': 'note-{n}-{i}'}, {'title': 'Other {i}', 'is_active': True}],
+            'deleted_objects': [],
+        }, repeat={'objects': 3})
+        self.assertEqual(step.build_data(7), {
+            'objects': [
+                {'title': 'Note 7-0', 'slug': 'note-7-0'},
+                {'title': 'Other 1', 'is_active': True},
+                {'title': 'Note 7-2', 'slug': 'note-7-2'},
+            ],
+            'deleted_objects': [],
+        })
+        # The template is left alone.
+        self.assertEqual(len(step.data['objects']), 2)
+
+
+class ScenarioTestCase(TestCase):
+    def setUp(self):
+        super(ScenarioTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(ScenarioTestCase, self).tearDown()
+
+    def test_from_dict(self):
+        scenario = Scenario.from_dict({
+            'requests': 50,
+            'concurrency': 4,
+            'steps': [
+                {'uri': '/api/v1/notes/', 'weight': 3},
+                {'uri': '/api/v1/notes/1/', 'name': 'detail'},
+            ],
+        })
+        self.assertEqual(scenario.requests, 50)
+        self.assertEqual(scenario.concurrency, 4)
+        self.assertEqual(scenario.mode, 'thread')
+        self.assertEqual(scenario.client, 'test')
+        self.assertEqual([step.name for step in scenario.steps], ['GET /api/v1/notes/', 'detail'])
+
+        self.assertRaises(ImproperlyConfigured, Scenario.from_dict, {'steps': [{'uri': '/api/v1/notes/', 'wieght': 3}]})
+        self.assertRaises(ImproperlyConfigured, Scenario.from_dict, {'users': 5, 'steps': []})
+
+    def test_validate(self):
+        steps = [ScenarioStep('/api/v1/notes/')]
+        Scenario(steps).validate()
+        self.assertRaises(ImproperlyConfigured, Scenario([]).validate)
+        self.assertRaises(ImproperlyConfigured, Scenario(steps, requests=0).validate)
+        self.assertRaises(ImproperlyConfigured, Scenario(steps, concurrency=0).validate)
+        self.assertRaises(ImproperlyConfigured, Scenario(steps, mode='fiber').validate)
+        self.assertRaises(ImproperlyConfigured, Scenario(steps, client='curl').validate)
+
+    def test_from_file(self):
+        path = os.path.join(self.directory, 'scenario.json')
+
+        with open(path, 'w') as scenario_file:
+            json.dump({'requests': 10, 'steps': [{'uri': '/api/v1/notes/'}]}, scenario_file)
+
+        scenario = Scenario.from_file(path)
+        self.assertEqual(scenario.requests, 10)
+        self.assertEqual(scenario.steps[0].uri, '/api/v1/notes/')
+
+
+class LoadReportTestCase(TestCase):
+    def test_summary(self):
+        samples = [('list', 200, 0.0005 * (i + 1), 2, None) for i in range(100)]
+        samples.append(('detail', 404, 0.003, 1, 'detail returned 404'))
+        samples.append(('detail', None, 10, 0, 'detail raised ValueError: Oops'))
+        summary = LoadReport(samples, 2.0, concurrency=2).summary()
+
+        self.assertEqual(summary['duration'], 2.0)
+        self.assertEqual(summary['concurrency'], 2)
+        self.assertEqual(summary['all']['requests'], 102)
+        self.assertEqual(summary['all']['errors'], 2)
+        self.assertEqual(summary['all']['queries'], 201)
+        self.assertEqual(summary['all']['statuses'], {'200': 100, '404': 1, 'None': 1})
+        self.assertEqual(summary['all']['throughput'], 51)
+        self.assertEqual(len(summary['all']['histogram']), len(HISTOGRAM_BUCKETS) + 1)
+        self.assertEqual(sum(summary['all']['histogram']), 102)
+        self.assertEqual(summary['all']['histogram'][-1], 1)
+
+        listing = summary['steps']['list']
+        self.assertEqual(listing['requests'], 100)
+        self.assertEqual(listing['errors'], 0)
+        self.assertEqual(listing['error_rate'], 0)
+        self.assertAlmostEqual(listing['p50'], 25)
+        self.assertAlmostEqual(listing['p90'], 45)
+        self.assertAlmostEqual(listing['p99'], 49.5)
+        self.assertAlmostEqual(listing['max'], 50)
+        self.assertEqual(listing['queries_per_request'], 2)
+        # <= 1ms, <= 2ms, <= 5ms, <= 10ms, <= 20ms, <= 50ms.
+        self.assertEqual(listing['histogram'][:7], [2, 2, 6, 10, 20, 60, 0])
+
+        self.assertEqual(summary['steps']['detail']['error_rate'], 1)
+        self.assertEqual(sorted(summary['errors']), [('detail raised ValueError: Oops', 1), ('detail returned 404', 1)])
+
+    def test_format(self):
+        samples = [('list', 200, 0.004, 2, None), ('detail', 404, 0.003, 1, 'detail returned 404')]
+        output = LoadReport(samples, 1.0, concurrency=2).format()
+        self.assertTrue(output.startswith('2 thread workers, 2 requests in 1.00s (2.0 requests/sec)'))
+        self.assertTrue('Status codes: 200 x 1, 404 x 1' in output)
+        self.assertTrue('<= 5ms' in output)
+        self.assertTrue('1 x detail returned 404' in output)
+
+
+class LoadRunnerTestCase(TestCase):
+    fixtures = ['note_testdata.json']
+    urls = 'core.tests.api_urls'
+
+    def get_scenario(self, **kwargs):
+        steps = [
+            ScenarioStep('/api/v1/notes/', name='list', data={'limit': 2}, weight=3),
+            ScenarioStep('/api/v1/notes/2/', name='detail'),
+            ScenarioStep('/api/v1/notes/9999/', name='missing', expect=[404]),
+        ]
+        kwargs.setdefault('requests', 30)
+        kwargs.setdefault('concurrency', 3)
+        kwargs.setdefault('seed', 1)
+        return Scenario(steps, **kwargs)
+
+    def test_run_threads(self):
+        report = LoadRunner(self.get_scenario()).run()
+        summary = report.summary()
+
+        self.assertEqual(summary['all']['requests'], 30)
+        self.assertEqual(summary['all']['errors'], 0)
+        self.assertEqual(set(summary['steps'].keys()), set(['list', 'detail', 'missing']))
+        self.assertTrue(summary['steps']['list']['requests'] > summary['steps']['detail']['requests'])
+        # Counting plus fetching the page.
+        self.assertEqual(summary['steps']['list']['queries_per_request'], 2)
+        self.assertEqual(summary['steps']['detail']['queries_per_request'], 1)
+        self.assertEqual(summary['all']['statuses']['404'], summary['steps']['missing']['requests'])
+
+    def test_run_wsgi(self):
+        report = LoadRunner(self.get_scenario(client='wsgi', concurrency=2, requests=10)).run()
+        summary = report.summary()
+        self.assertEqual(summary['all']['requests'], 10)
+        self.assertEqual(summary['all']['errors'], 0)
+        self.assertTrue(summary['all']['queries'] > 0)
+
+    def test_errors(self):
+        scenario = Scenario([ScenarioStep('/api/v1/notes/9999/', name='missing')], requests=4, concurrency=2)
+        summary = LoadRunner(scenario).run().summary()
+        self.assertEqual(summary['all']['errors'], 4)
+        self.assertEqual(summary['all']['error_rate'], 1)
+        self.assertEqual(summary['errors'], [('missing returned 404', 4)])
+
+    def test_seed(self):
+        runner = LoadRunner(self.get_scenario())
+        picks = []
+
+        for i in range(2):
+            rng = random.Random(5)
+            picks.append([runner.choose(rng).name for j in range(20)])
+
+        self.assertEqual(picks[0], picks[1])
+        self.assertEqual(set(picks[0]), set(['list', 'detail', 'missing']))
+
+    def test_get_counts(self):
+        self.assertEqual(LoadRunner(self.get_scenario(requests=10, concurrency=3)).get_counts(), [4, 3, 3])
+        self.assertEqual(LoadRunner(self.get_scenario(requests=2, concurrency=3)).get_counts(), [1, 1, 0])
+
+    @skipIf(not hasattr(os, 'fork'), "The 'process' mode requires 'fork'.")
+    def test_run_processes(self):
+        report = LoadRunner(self.get_scenario(mode='process', concurrency=2, requests=10)).run()
+        summary = report.summary()
+        self.assertEqual(summary['mode'], 'process')
+        self.assertEqual(summary['all']['requests'], 10)
+        self.assertEqual(summary['all']['errors'], 0)
+
+
+class LoadTestCommandTestCase(TestCase):
+    def test_bad_arguments(self):
+        self.assertRaises(CommandError, call_command, 'loadtest')
+        self.assertRaises(CommandError, call_command, 'loadtest', '/does/not/exist.json')
@@ -9,12 +9,15 @@ from mock import patch
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.cache import cache
-from django.core.exceptions import FieldError, MultipleObjectsReturned
+from django.core.exceptions import FieldError, ImproperlyConfigured, MultipleObjectsReturned
 from django.core import mail
 from django.core.urlresolvers import reverse
+from django.db import IntegrityError
+from django.db.models.signals import m2m_changed
+from django.db.models.sql.compiler import SQLInsertCompiler
 from django import forms
 from django.http import HttpRequest, QueryDict, Http404
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.utils.encoding import force_text
 from django.utils import six
 
@@ -24,9 +27,9 @@ from tastypie.bundle import Bundle
 from tastypie.exceptions import InvalidFilterError, InvalidSortError, ImmediateHttpResponse, BadRequest, NotFound
 from tastypie import fields
 from tastypie.paginator import Paginator
-from tastypie.resources import Resource, ModelResource, ALL, ALL_WITH_RELATIONS, convert_post_to_put, convert_post_to_patch
+from tastypie.resources import Resource, ModelResource, ALL, ALL_WITH_RELATIONS, RESOLVED_URIS, convert_post_to_put, convert_post_to_patch
 from tastypie.serializers import Serializer
-from tastypie.throttle import CacheThrottle
+from tastypie.throttle import CacheThrottle, TieredThrottle
 from tastypie.utils import aware_datetime, make_naive
 from tastypie.validation import FormValidation
 from core.models import Note, NoteWithEditor, Subject, MediaBit, AutoNowNote, DateRecord, Counter
@@ -879,6 +882,31 @@ class AlwaysDataNoteResourceUseIn(NoteResource):
         authorization = Authorization()
 
 
+class BulkCreateNoteResource(NoteResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = Authorization()
+        bulk_create = True
+        bulk_create_batch_size = 2
+
+
+class UpsertNoteResource(NoteResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = Authorization()
+        put_list_upsert = True
+
+
+class ChunkedNoteResource(NoteResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = Authorization()
+        commit_chunk_size = 2
+
+
 class VeryCustomNoteResource(NoteResource):
     author = fields.CharField(attribute='author__username')
     constant = fields.IntegerField(default=20)
@@ -998,6 +1026,14 @@ class ThrottledNoteResource(NoteResource):
         authorization = Authorization()
 
 
+class TieredThrottledNoteResource(NoteResource):
+    class Meta:
+        resource_name = 'tieredthrottlednotes'
+        queryset = Note.objects.filter(is_active=True)
+        throttle = TieredThrottle(tiers=[(1, 60), (100, 3600)])
+        authorization = Authorization()
+
+
 class BasicAuthNoteResource(NoteResource):
     class Meta:
         resource_name = 'notes'
@@ -1538,6 +1574,23 @@ class ModelResourceTestCase(TestCase):
         note_1 = resource.get_via_uri('/api/v1/notes/1/', request=request)
         self.assertEqual(note_1.pk, 1)
 
+    def test_resolve_detail_uri_cached(self):
+        RESOLVED_URIS.clear()
+        resource = NoteResource(api_name='v1')
+
+        with patch.object(NoteResource, 'match_detail_uri', autospec=True, side_effect=lambda self, uri, prefix: {'resource_name': 'notes', 'pk': '1'}) as mock_match:
+            self.assertEqual(resource.resolve_detail_uri('/api/v1/notes/1/'), {'pk': '1'})
+            # Fresh instances share what's been resolved.
+            kwargs = NoteResource(api_name='v1').resolve_detail_uri('/api/v1/notes/1/')
+            self.assertEqual(kwargs, {'pk': '1'})
+            kwargs['pk'] = '2'
+            self.assertEqual(resource.resolve_detail_uri('/api/v1/notes/1/'), {'pk': '1'})
+
+        self.assertEqual(mock_match.call_count, 1)
+
+        # The URL patterns are only built once.
+        self.assertTrue(resource.get_uri_resolvers() is NoteResource().get_uri_resolvers())
+
     def test_create_identifier(self):
         resource = NoteResource()
         new_note = Note.objects.get(pk=1)
@@ -2469,6 +2522,180 @@ class ModelResourceTestCase(TestCase):
             self.assertIn('constant', note)
             self.assertNotIn('author', note)
 
+    def test_can_bulk_create(self):
+        self.assertFalse(NoteResource().can_bulk_create())
+        self.assertTrue(BulkCreateNoteResource().can_bulk_create())
+
+        class BulkDetailedNoteResource(DetailedNoteResource):
+            class Meta(DetailedNoteResource.Meta):
+                bulk_create = True
+
+        # Writable related fields need saving one at a time.
+        self.assertFalse(BulkDetailedNoteResource().can_bulk_create())
+
+        class BulkAlwaysDataNoteResource(BulkCreateNoteResource):
+            class Meta(BulkCreateNoteResource.Meta):
+                always_return_data = True
+
+        # SQLite can't hand back the new primary keys.
+        self.assertFalse(BulkAlwaysDataNoteResource().can_bulk_create())
+
+    def test_put_list_bulk_create(self):
+        resource = BulkCreateNoteResource()
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+        setattr(request, self.body_attr, json.dumps({'objects': [
+            {'title': 'First', 'slug': 'first', 'content': 'One.'},
+            {'title': 'Second', 'slug': 'second', 'content': 'Two.'},
+            {'title': 'Third', 'slug': 'third', 'content': 'Three.'},
+        ]}))
+
+        with patch.object(Note, 'save') as mock_save:
+            resp = resource.put_list(request)
+
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(mock_save.call_count, 0)
+        self.assertEqual(Note.objects.filter(is_active=True).count(), 3)
+        self.assertEqual(sorted(Note.objects.filter(is_active=True).values_list('slug', flat=True)), ['first', 'second', 'third'])
+
+    def test_obj_create_bulk(self):
+        resource = BulkCreateNoteResource()
+        request = HttpRequest()
+        bundles = [resource.build_bundle(data={'title': 'Note %s' % i, 'slug': 'note-%s' % i}, request=request) for i in range(3)]
+
+        execute_sql = SQLInsertCompiler.execute_sql
+
+        # Three rows in batches of two. Savepoints aren't counted, as older
+        # versions of Django don't issue them inside ``TestCase``.
+        with patch.object(SQLInsertCompiler, 'execute_sql', autospec=True, side_effect=execute_sql) as mock_execute_sql:
+            resource.obj_create_bulk(bundles)
+
+        self.assertEqual(mock_execute_sql.call_count, 2)
+
+        self.assertEqual(Note.objects.filter(slug__startswith='note-').count(), 3)
+
+    def test_obj_create_bulk_validates_list(self):
+        resource = BulkCreateNoteResource()
+        request = HttpRequest()
+        bundles = [resource.build_bundle(data={'title': 'Note %s' % i, 'slug': 'note-%s' % i}, request=request) for i in range(3)]
+
+        with patch.object(resource._meta.validation, 'is_valid_list', return_value=[{}, {'slug': ['Nope.']}, {}]) as mock_is_valid_list:
+            self.assertRaises(ImmediateHttpResponse, resource.obj_create_bulk, bundles)
+
+        # The whole list is checked at once.
+        self.assertEqual(mock_is_valid_list.call_count, 1)
+        self.assertEqual(bundles[1].errors, {'notes': {'slug': ['Nope.']}})
+        self.assertEqual(Note.objects.filter(slug__startswith='note-').count(), 0)
+
+    def test_put_list_bulk_create_all_or_nothing(self):
+        resource = BulkCreateNoteResource()
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+        setattr(request, self.body_attr, json.dumps({'objects': [
+            {'title': 'First', 'slug': 'first'},
+            {'title': 'Second', 'slug': 'second'},
+        ]}))
+
+        # The new objects are authorized in a single call.
+        with patch.object(resource._meta.authorization, 'create_list', return_value=[]) as mock_create_list:
+            with self.assertRaises(ImmediateHttpResponse) as cm:
+                resource.put_list(request)
+
+        self.assertEqual(cm.exception.response.status_code, 401)
+        self.assertEqual(mock_create_list.call_count, 1)
+        self.assertEqual(len(mock_create_list.call_args[0][0]), 2)
+        # Nothing was deleted or created.
+        self.assertEqual(Note.objects.count(), 6)
+        self.assertEqual(Note.objects.filter(slug='first').count(), 0)
+
+    def test_put_list_upsert(self):
+        resource = UpsertNoteResource()
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+        setattr(request, self.body_attr, json.dumps({'objects': [
+            {'id': 1},
+            {'id': 2, 'content': 'This is note 2.'},
+            {'title': 'Third', 'slug': 'third', 'content': 'Three.'},
+        ]}))
+        original_updated = Note.objects.get(pk=1).updated
+
+        with patch.object(Note, 'save', autospec=True, side_effect=lambda obj, *args, **kwargs: super(Note, obj).save(*args, **kwargs)) as mock_save:
+            with patch.object(resource, 'full_hydrate', wraps=resource.full_hydrate) as mock_full_hydrate:
+                resp = resource.put_list(request)
+
+        self.assertEqual(resp.status_code, 204)
+        # Only the changed & new objects get saved.
+        self.assertEqual(mock_save.call_count, 2)
+        # Each object is only hydrated once, matched or not.
+        self.assertEqual(mock_full_hydrate.call_count, 3)
+        self.assertEqual(sorted(Note.objects.filter(is_active=True).values_list('slug', flat=True)), ['another-post', 'first-post', 'third'])
+        self.assertEqual(Note.objects.get(pk=1).updated, original_updated)
+        self.assertEqual(Note.objects.get(pk=2).content, 'This is note 2.')
+        # Objects outside the collection are left alone.
+        self.assertEqual(Note.objects.filter(is_active=False).count(), 2)
+
+    def test_put_list_upsert_fields(self):
+        class SlugUpsertNoteResource(UpsertNoteResource):
+            class Meta(UpsertNoteResource.Meta):
+                upsert_fields = ['slug']
+
+        resource = SlugUpsertNoteResource()
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+        setattr(request, self.body_attr, json.dumps({'objects': [
+            {'slug': 'grannys-gone', 'title': 'Granny Is Back'},
+        ]}))
+
+        resp = resource.put_list(request)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(list(Note.objects.filter(is_active=True).values_list('pk', 'title')), [(6, 'Granny Is Back')])
+
+        class BadUpsertNoteResource(UpsertNoteResource):
+            class Meta(UpsertNoteResource.Meta):
+                upsert_fields = ['resource_uri']
+
+        self.assertRaises(ImproperlyConfigured, BadUpsertNoteResource().get_upsert_attributes)
+
+    def test_put_list_upsert_resource_uri(self):
+        resource = UpsertNoteResource(api_name='v1')
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+        setattr(request, self.body_attr, json.dumps({'objects': [
+            {'resource_uri': '/api/v1/notes/1/', 'title': 'Renamed'},
+            {'resource_uri': '/api/v1/notes/2/'},
+        ]}))
+
+        resp = resource.put_list(request)
+        self.assertEqual(resp.status_code, 204)
+        # Matched on the pk from the URI, rather than recreated.
+        self.assertEqual(list(Note.objects.filter(is_active=True).order_by('pk').values_list('pk', 'title')), [(1, 'Renamed'), (2, 'Another Post')])
+
+    def test_put_list_upsert_unkeyed(self):
+        class AuthorUpsertNoteResource(UpsertNoteResource):
+            author_id = fields.IntegerField(attribute='author_id', null=True)
+
+            class Meta(UpsertNoteResource.Meta):
+                upsert_fields = ['author_id']
+
+        Note.objects.filter(is_active=True).update(author=None)
+        resource = AuthorUpsertNoteResource()
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+        setattr(request, self.body_attr, json.dumps({'objects': [
+            {'author_id': 1, 'title': 'New', 'slug': 'new'},
+        ]}))
+
+        resp = resource.put_list(request)
+        self.assertEqual(resp.status_code, 204)
+        # None of the existing notes could be matched, so all of them go.
+        self.assertEqual(list(Note.objects.filter(is_active=True).values_list('slug', flat=True)), ['new'])
+
     def test_put_detail(self):
         self.assertEqual(Note.objects.count(), 6)
         resource = NoteResource()
@@ -2656,6 +2883,144 @@ class ModelResourceTestCase(TestCase):
         updated_note = Note.objects.get(pk=2)
         self.assertEqual(updated_note.content, "This is note 2.")
 
+    def test_patch_list_bulk_create(self):
+        resource = BulkCreateNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PATCH'
+        request._read_started = False
+
+        self.assertEqual(Note.objects.count(), 6)
+        request._raw_post_data = request._body = '{"objects": [{"title": "First", "slug": "first"}, {"title": "Second", "slug": "second"}, {"resource_uri": "/api/v1/notes/2/", "content": "This is note 2."}], "deleted_objects": ["/api/v1/notes/1/"]}'
+
+        with patch.object(Note, 'save', autospec=True, side_effect=lambda obj, *args, **kwargs: super(Note, obj).save(*args, **kwargs)) as mock_save:
+            resp = resource.patch_list(request)
+
+        self.assertEqual(resp.status_code, 202)
+        # Only the update goes through ``Model.save``.
+        self.assertEqual(mock_save.call_count, 1)
+        self.assertEqual(Note.objects.count(), 7)
+        self.assertEqual(Note.objects.filter(slug__in=['first', 'second']).count(), 2)
+        self.assertEqual(Note.objects.get(pk=2).content, "This is note 2.")
+
+    def test_put_list_chunked(self):
+        resource = ChunkedNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+
+        self.assertEqual(Note.objects.filter(is_active=True).count(), 4)
+        objects = [{"title": "Note %s" % i, "slug": "note-%s" % i} for i in range(5)]
+        request._read_started = False
+        request._raw_post_data = request._body = json.dumps({"objects": objects})
+        resp = resource.put_list(request)
+        # The same as an unchunked ``PUT``.
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(resp.content, b'')
+        self.assertEqual(sorted(Note.objects.filter(is_active=True).values_list('slug', flat=True)), ['note-0', 'note-1', 'note-2', 'note-3', 'note-4'])
+
+        resource._meta.always_return_data = True
+        request._read_started = False
+
+        try:
+            resp = resource.put_list(request)
+        finally:
+            resource._meta.always_return_data = False
+
+        self.assertEqual(resp.status_code, 200)
+        data = json.loads(resp.content.decode('utf-8'))
+        self.assertEqual(data['chunks'], [
+            {'collection': 'objects', 'start': 0, 'end': 2, 'applied': True},
+            {'collection': 'objects', 'start': 2, 'end': 4, 'applied': True},
+            {'collection': 'objects', 'start': 4, 'end': 5, 'applied': True},
+        ])
+        self.assertEqual(len(data['objects']), 5)
+
+    def test_patch_list_chunked(self):
+        resource = ChunkedNoteResource()
+        resource._meta.always_return_data = True
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PATCH'
+        request._read_started = False
+        request._raw_post_data = request._body = '{"objects": [{"title": "First", "slug": "first"}, {"resource_uri": "/api/v1/notes/2/", "content": "This is note 2."}, {"title": "Second", "slug": "second"}], "deleted_objects": ["/api/v1/notes/1/", "/api/v1/notes/99/"]}'
+
+        try:
+            resp = resource.patch_list(request)
+        finally:
+            resource._meta.always_return_data = False
+
+        self.assertEqual(resp.status_code, 404)
+        data = json.loads(resp.content.decode('utf-8'))
+        self.assertEqual(data['chunks'], [
+            {'collection': 'objects', 'start': 0, 'end': 2, 'applied': True},
+            {'collection': 'objects', 'start': 2, 'end': 3, 'applied': True},
+            {'collection': 'deleted_objects', 'start': 0, 'end': 2, 'applied': False, 'error': data['chunks'][2]['error']},
+        ])
+        self.assertEqual(data['chunks'][2]['collection'], 'deleted_objects')
+        self.assertFalse(data['chunks'][2]['applied'])
+        self.assertTrue('pk=99' in data['chunks'][2]['error']['error'])
+        self.assertFalse('objects' in data)
+        self.assertEqual(Note.objects.filter(slug__in=['first', 'second']).count(), 2)
+        self.assertEqual(Note.objects.get(pk=2).content, "This is note 2.")
+        self.assertTrue(Note.objects.filter(pk=1).exists())
+
+    def test_patch_list_batched_lookups(self):
+        resource = NoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PATCH'
+        request._read_started = False
+        request._raw_post_data = request._body = '{"objects": [{"resource_uri": "/api/v1/notes/2/", "content": "This is note 2."}, {"resource_uri": "/api/v1/notes/4/", "content": "This is note 4."}, {"resource_uri": "/api/v1/notes/99/", "title": "New", "slug": "new"}], "deleted_objects": ["/api/v1/notes/1/", "/api/v1/notes/6/"]}'
+
+        with patch.object(NoteResource, 'obj_get_many', autospec=True, side_effect=ModelResource.obj_get_many) as mock_obj_get_many:
+            with patch.object(resource._meta.authorization, 'delete_detail', return_value=True) as mock_delete_detail:
+                resp = resource.patch_list(request)
+
+        self.assertEqual(resp.status_code, 202)
+        # One lookup for the updates & one for the deletes.
+        self.assertEqual(mock_obj_get_many.call_count, 2)
+        # Each delete is still authorized on its own.
+        self.assertEqual(sorted([call[0][1].obj.pk for call in mock_delete_detail.call_args_list]), [1, 6])
+        self.assertEqual(Note.objects.get(pk=2).content, "This is note 2.")
+        self.assertEqual(Note.objects.get(pk=4).content, "This is note 4.")
+        self.assertEqual(Note.objects.filter(slug='new').count(), 1)
+        self.assertEqual(Note.objects.filter(pk__in=[1, 6]).count(), 0)
+
+    def test_patch_list_delete_custom_model_delete(self):
+        resource = NoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PATCH'
+        request._read_started = False
+        request._raw_post_data = request._body = '{"objects": [], "deleted_objects": ["/api/v1/notes/1/", "/api/v1/notes/6/"]}'
+
+        # Stands in for a model with its own ``delete`` (a soft delete).
+        def soft_delete(obj, *args, **kwargs):
+            Note.objects.filter(pk=obj.pk).update(is_active=False)
+
+        with patch.object(Note, 'delete', autospec=True, side_effect=soft_delete) as mock_delete:
+            resp = resource.patch_list(request)
+
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(sorted([call[0][0].pk for call in mock_delete.call_args_list]), [1, 6])
+        self.assertEqual(Note.objects.filter(pk__in=[1, 6], is_active=False).count(), 2)
+
+    def test_patch_list_delete_unauthorized(self):
+        resource = NoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PATCH'
+        request._read_started = False
+        request._raw_post_data = request._body = '{"objects": [], "deleted_objects": ["/api/v1/notes/1/", "/api/v1/notes/6/"]}'
+
+        with patch.object(resource._meta.authorization, 'delete_detail', side_effect=lambda object_list, bundle: bundle.obj.pk == 1):
+            with self.assertRaises(ImmediateHttpResponse) as cm:
+                resource.patch_list(request)
+
+        self.assertEqual(cm.exception.response.status_code, 401)
+        self.assertEqual(Note.objects.filter(pk__in=[1, 6]).count(), 2)
+
     def test_patch_list_return_data(self):
         always_resource = AlwaysDataNoteResource()
         request = HttpRequest()
@@ -3130,6 +3495,50 @@ class ModelResourceTestCase(TestCase):
         resource.fields['created']._default = old_created
         resource.fields['updated']._default = old_updated
 
+    def test_get_schema_cached(self):
+        resource = NoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        with patch.object(NoteResource, 'build_schema', autospec=True, side_effect=ModelResource.build_schema) as mock_build_schema:
+            resp = resource.get_schema(request)
+            self.assertEqual(resp.status_code, 200)
+            etag = resp['ETag']
+            content = resp.content
+
+            resp = resource.get_schema(request)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp['ETag'], etag)
+            self.assertEqual(resp.content, content)
+            self.assertEqual(mock_build_schema.call_count, 1)
+
+            request.GET = {'format': 'xml'}
+            resp = resource.get_schema(request)
+            self.assertEqual(resp['content-type'].split(';')[0], 'application/xml')
+            self.assertNotEqual(resp['ETag'], etag)
+            self.assertEqual(mock_build_schema.call_count, 2)
+
+            # JSONP isn't kept.
+            request.GET = {'format': 'jsonp', 'callback': 'foo'}
+            self.assertTrue(resource.get_schema(request).content.startswith(b'foo('))
+            self.assertEqual(mock_build_schema.call_count, 3)
+
+        request.GET = {'format': 'json'}
+        request.META['HTTP_IF_NONE_MATCH'] = '"nope", %s' % etag
+        resp = resource.get_schema(request)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+        self.assertEqual(resp.content, b'')
+
+        request.META['HTTP_IF_NONE_MATCH'] = '"nope"'
+        self.assertEqual(resource.get_schema(request).status_code, 200)
+
+        # Authentication is still checked.
+        resource = BasicAuthNoteResource()
+        request.META['HTTP_IF_NONE_MATCH'] = etag
+        self.assertEqual(resource.wrap_view('get_schema')(request).status_code, 401)
+
     def test_get_multiple(self):
         resource = NoteResource()
         request = HttpRequest()
@@ -3230,6 +3639,46 @@ class ModelResourceTestCase(TestCase):
         # Restore.
         settings.DEBUG = old_debug
 
+    def test_throttle_headers(self):
+        resource = TieredThrottledNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        with patch('tastypie.throttle.time') as mocked_time:
+            mocked_time.time.return_value = 1000
+            resp = resource.dispatch('list', request)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp['X-RateLimit-Limit'], '1')
+            self.assertEqual(resp['X-RateLimit-Remaining'], '0')
+            self.assertEqual(resp['X-RateLimit-Reset'], '1020')
+            self.assertFalse(resp.has_header('Retry-After'))
+
+            resp = resource.wrap_view('dispatch_list')(request)
+            self.assertEqual(resp.status_code, 429)
+            self.assertEqual(resp['X-RateLimit-Remaining'], '0')
+            self.assertTrue(resp.has_header('Retry-After'))
+
+        cache.delete_many(['noaddr_nohost_accesses_60_960', 'noaddr_nohost_accesses_3600_0'])
+
+    def test_identifier_resolved_once_per_request(self):
+        resource = ThrottledNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        with patch.object(resource._meta.authentication, 'get_identifier', return_value='once') as mocked:
+            resp = resource.dispatch('list', request)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(mocked.call_count, 1)
+
+        context = request._authentication_context
+        self.assertTrue(context.authentication is resource._meta.authentication)
+        self.assertTrue(context.backend is resource._meta.authentication)
+        self.assertEqual(context.identifier, 'once')
+        self.assertEqual(len(cache.get('once_accesses')), 1)
+        cache.delete('once_accesses')
+
     def test_generate_cache_key(self):
         resource = NoteResource()
         self.assertEqual(resource.generate_cache_key(), 'None:notes::')
@@ -3539,6 +3988,101 @@ class ModelResourceTestCase(TestCase):
         self.assertEqual(numero_uno.is_active, True)
         self.assertEqual(numero_uno.author.pk, request.user.pk)
 
+    def test_prefetch_related_data(self):
+        resource = RelatedNoteResource()
+        request = HttpRequest()
+        subject_uris = ['/api/v1/subjects/%s/' % self.subject_1.pk, '/api/v1/subjects/%s/' % self.subject_2.pk]
+        data_list = [
+            {'title': 'One', 'slug': 'one', 'author': '/api/v1/user/1/', 'subjects': subject_uris},
+            {'title': 'Two', 'slug': 'two', 'author': '/api/v1/user/1/', 'subjects': subject_uris[1:]},
+        ]
+
+        # One query per related resource, however many references.
+        with self.assertNumQueries(2):
+            resource.prefetch_related_data(request, data_list)
+
+        self.assertEqual(request._related_prefetch[(SubjectResource, 'resource_uri', subject_uris[0])], self.subject_1)
+        self.assertEqual(request._related_prefetch[(UserResource, 'resource_uri', '/api/v1/user/1/')].username, 'johndoe')
+
+        with patch.object(SubjectResource, 'get_via_uri') as mock_get_via_uri:
+            with patch.object(UserResource, 'get_via_uri') as mock_user_get_via_uri:
+                bundle = resource.obj_create(resource.build_bundle(data=data_list[0], request=request))
+
+        self.assertEqual(mock_get_via_uri.call_count, 0)
+        self.assertEqual(mock_user_get_via_uri.call_count, 0)
+        self.assertEqual(bundle.obj.author.username, 'johndoe')
+        self.assertEqual(sorted(bundle.obj.subjects.values_list('pk', flat=True)), [self.subject_1.pk, self.subject_2.pk])
+
+    def test_prefetch_related_nested_data(self):
+        resource = AnotherRelatedNoteResource()
+        request = HttpRequest()
+        data_list = [{'subjects': [
+            {'pk': self.subject_1.pk, 'name': 'Renamed', 'url': '/renamed/'},
+            {'pk': 999, 'name': 'Missing', 'url': '/missing/'},
+            {'name': 'New', 'url': '/new/'},
+        ]}]
+
+        with self.assertNumQueries(1):
+            resource.prefetch_related_data(request, data_list)
+
+        self.assertEqual(request._related_prefetch, {
+            (SubjectResource, 'pk', self.subject_1.pk): self.subject_1,
+            (SubjectResource, 'pk', 999): None,
+        })
+
+        field = resource.fields['subjects']
+        related_bundle = field.resource_from_data(SubjectResource(), data_list[0]['subjects'][0], request=request)
+        self.assertEqual(related_bundle.obj.pk, self.subject_1.pk)
+        self.assertEqual(Subject.objects.get(pk=self.subject_1.pk).name, 'Renamed')
+
+        # Missing objects skip the lookups, but only once.
+        with self.assertNumQueries(0):
+            related_bundle = field.resource_from_data(SubjectResource(), data_list[0]['subjects'][1], request=request)
+
+        self.assertEqual(related_bundle.obj.name, 'Missing')
+        self.assertFalse((SubjectResource, 'pk', 999) in request._related_prefetch)
+
+    def test_save_m2m_incremental(self):
+        subject_1, subject_2 = self.subject_1, self.subject_2
+        subject_3 = Subject.objects.create(name='Videos', url='/videos/')
+        note_obj = self.note_1
+        actions = []
+
+        def record_m2m_changed(sender, action, pk_set, **kwargs):
+            actions.append((action, pk_set))
+
+        data = {
+            'title': 'First Post!',
+            'slug': 'first-post',
+            'author': '/api/v1/user/1/',
+            'subjects': ['/api/v1/subjects/%s/' % subject_2.pk, '/api/v1/subjects/%s/' % subject_3.pk],
+        }
+        m2m_changed.connect(record_m2m_changed, sender=Subject.notes.through)
+
+        try:
+            note = RelatedNoteResource()
+            note.obj_update(note.build_bundle(data=data.copy()), pk=1)
+            self.assertEqual(actions, [
+                ('pre_remove', set([subject_1.pk])),
+                ('post_remove', set([subject_1.pk])),
+                ('pre_add', set([subject_3.pk])),
+                ('post_add', set([subject_3.pk])),
+            ])
+            self.assertEqual(sorted(note_obj.subjects.values_list('pk', flat=True)), [subject_2.pk, subject_3.pk])
+
+            # Saving the same data again doesn't touch the relation.
+            del actions[:]
+            note.obj_update(note.build_bundle(data=data.copy()), pk=1)
+            self.assertEqual(actions, [])
+
+            with patch.object(note._meta, 'clear_m2m_on_save', True):
+                note.obj_update(note.build_bundle(data=data.copy()), pk=1)
+
+            self.assertEqual([action for action, pk_set in actions], ['pre_clear', 'post_clear', 'pre_add', 'post_add'])
+            self.assertEqual(sorted(note_obj.subjects.values_list('pk', flat=True)), [subject_2.pk, subject_3.pk])
+        finally:
+            m2m_changed.disconnect(record_m2m_changed, sender=Subject.notes.through)
+
     def test_obj_update_single_hydrate(self):
         counter = Counter.objects.get(pk=1)
         self.assertEqual(counter.count, 1)
@@ -4020,6 +4564,52 @@ class ModelResourceTestCase(TestCase):
         self.assertEqual(response.status_code, 202)
 
 
+class ChunkedWriteTestCase(TransactionTestCase):
+    # Each chunk commits (or rolls back) on its own, which ``TestCase``
+    # doesn't allow for on every version of Django.
+    fixtures = ['note_testdata.json']
+
+    def put_list(self, resource, objects):
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+        request._read_started = False
+        request._raw_post_data = request._body = json.dumps({"objects": objects})
+        return resource.put_list(request)
+
+    def test_put_list_failure(self):
+        # A failure stops at that chunk, leaving the ones before it in place.
+        objects = [{"title": "Other %s" % i, "slug": "other-%s" % i} for i in range(5)]
+        objects[3]['created'] = 'not a date'
+        resp = self.put_list(ChunkedNoteResource(), objects)
+        self.assertEqual(resp.status_code, 400)
+        chunks = json.loads(resp.content.decode('utf-8'))['chunks']
+        self.assertEqual([chunk['applied'] for chunk in chunks], [True, False, False])
+        self.assertTrue('error' in chunks[1])
+        self.assertFalse('error' in chunks[2])
+        self.assertEqual(sorted(Note.objects.filter(is_active=True).values_list('slug', flat=True)), ['other-0', 'other-1'])
+
+    def test_put_list_database_error(self):
+        objects = [{"title": "Other %s" % i, "slug": "other-%s" % i} for i in range(5)]
+        save = Note.save
+
+        def broken_save(obj, *args, **kwargs):
+            if obj.slug == 'other-3':
+                raise IntegrityError("Nope.")
+
+            return save(obj, *args, **kwargs)
+
+        with patch.object(Note, 'save', autospec=True, side_effect=broken_save):
+            resp = self.put_list(ChunkedNoteResource(), objects)
+
+        self.assertEqual(resp.status_code, 500)
+        chunks = json.loads(resp.content.decode('utf-8'))['chunks']
+        self.assertEqual([chunk['applied'] for chunk in chunks], [True, False, False])
+        self.assertTrue('error_message' in chunks[1]['error'])
+        # The failed chunk was rolled back.
+        self.assertEqual(sorted(Note.objects.filter(is_active=True).values_list('slug', flat=True)), ['other-0', 'other-1'])
+
+
 class BasicAuthResourceTestCase(TestCase):
     fixtures = ['note_testdata.json']
 
@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.http import HttpRequest
+
+from mock import patch
+
+from tastypie import fields
+from tastypie.resources import ModelResource
+from tastypie.test import ResourceTestCase, QUERY_BUDGETS, get_query_shape
+from core.models import Note
+
+
+class AuthorNoteResource(ModelResource):
+    author = fields.ForeignKey('core.tests.api.UserResource', 'author')
+
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+
+
+class SelectRelatedNoteResource(AuthorNoteResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True).select_related('author')
+
+
+class ResourceTestCaseQueriesTestCase(ResourceTestCase):
+    urls = 'core.tests.api_urls'
+    fixtures = ['note_testdata.json']
+
+    def setUp(self):
+        super(ResourceTestCaseQueriesTestCase, self).setUp()
+        self.budgets_dir = tempfile.mkdtemp()
+        self.query_budgets = os.path.join(self.budgets_dir, 'query_budgets.json')
+
+    def tearDown(self):
+        QUERY_BUDGETS.pop(self.query_budgets, None)
+        shutil.rmtree(self.budgets_dir)
+        super(ResourceTestCaseQueriesTestCase, self).tearDown()
+
+    def get_list(self, resource_class):
+        request = HttpRequest()
+        request.method = 'GET'
+        request.GET = {'format': 'json'}
+        return resource_class(api_name='v1').wrap_view('dispatch_list')(request)
+
+    def test_get_query_shape(self):
+        self.assertEqual(get_query_shape('SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s) AND "a"."t1" = \'it\'\'s\' LIMIT 20'), 'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (...) AND "a"."t1" = ? LIMIT ?')
+
+    def test_record_queries(self):
+        dehydrate = fields.ToOneField.__dict__['dehydrate']
+
+        with self.record_queries() as queries:
+            with self.record_queries() as inner_queries:
+                User.objects.count()
+
+            self.assertFalse(fields.ToOneField.__dict__['dehydrate'] is dehydrate)
+
+            list(Note.objects.all())
+
+        self.assertEqual(len(inner_queries), 1)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(queries.queries[0]['alias'], 'default')
+        self.assertEqual(queries.queries[0]['field'], None)
+        self.assertTrue('auth_user' in queries.queries[0]['sql'])
+
+        # Nothing is left behind on the connection (or the fields).
+        with self.assertNumQueries(1):
+            User.objects.count()
+
+        self.assertTrue(fields.ToOneField.__dict__['dehydrate'] is dehydrate)
+
+    def test_assert_max_queries(self):
+        with self.assertMaxQueries(2):
+            User.objects.count()
+            User.objects.count()
+
+        self.assertMaxQueries(1, User.objects.count)
+        self.assertRaises(AssertionError, self.assertMaxQueries, 0, User.objects.count)
+
+    def test_assert_no_n_plus_one_queries(self):
+        with self.record_queries() as queries:
+            self.assertEqual(self.get_list(AuthorNoteResource).status_code, 200)
+
+        # One query for each of the 4 notes' authors.
+        self.assertEqual(queries.get_duplicates(), [('AuthorNoteResource.author', queries.queries[-1]['shape'], 4)])
+
+        try:
+            with self.assertNoNPlusOneQueries():
+                self.get_list(AuthorNoteResource)
+        except AssertionError as e:
+            self.assertTrue('4 x AuthorNoteResource.author: SELECT' in str(e))
+        else:
+            self.fail("The N+1 queries weren't found.")
+
+        with self.assertNoNPlusOneQueries():
+            self.get_list(SelectRelatedNoteResource)
+
+    def test_assert_query_budget(self):
+        with open(self.query_budgets, 'w') as budgets_file:
+            json.dump({'GET /api/v1/notes/': 2}, budgets_file)
+
+        with self.assertQueryBudget('GET /api/v1/notes/'):
+            self.get_list(SelectRelatedNoteResource)
+
+        self.assertRaises(AssertionError, self.assertQueryBudget, 'GET /api/v1/notes/', self.get_list, AuthorNoteResource)
+        self.assertRaises(AssertionError, self.assertQueryBudget, 'GET /api/v1/users/', User.objects.count)
+
+    def test_update_query_budget(self):
+        with patch.dict(os.environ, {'TASTYPIE_UPDATE_QUERY_BUDGETS': '1'}):
+            self.assertQueryBudget('GET /api/v1/notes/', self.get_list, AuthorNoteResource)
+
+        with open(self.query_budgets) as budgets_file:
+            self.assertEqual(json.load(budgets_file), {'GET /api/v1/notes/': 6})
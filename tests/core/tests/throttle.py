@@ -6,7 +6,7 @@ from django.test import TestCase
 from django.utils.encoding import force_text
 
 from tastypie.models import ApiAccess
-from tastypie.throttle import BaseThrottle, CacheThrottle, CacheDBThrottle
+from tastypie.throttle import BaseThrottle, CacheThrottle, CacheDBThrottle, TieredThrottle, ThrottleStatus, ApproximateCacheThrottle
 
 
 class NoThrottleTestCase(TestCase):
@@ -141,6 +141,154 @@ class CacheDBThrottleTestCase(TestCase):
         self.assertEqual(ApiAccess.objects.filter(identifier='daniel').count(), 4)
 
 
+class TieredThrottleTestCase(TestCase):
+    def tearDown(self):
+        cache.delete_many(['daniel_accesses_10_1000', 'daniel_accesses_10_1010', 'daniel_accesses_100_1000', 'daniel_accesses_100_1100'])
+
+    def test_init(self):
+        throttle_1 = TieredThrottle(tiers=[(1000, 86400), (5, 1), (100, 3600)])
+        self.assertEqual(throttle_1.tiers, [(5, 1), (100, 3600), (1000, 86400)])
+        self.assertEqual(throttle_1.throttle_at, 5)
+        self.assertEqual(throttle_1.timeframe, 1)
+        self.assertEqual(throttle_1.expiration, 86400)
+        self.assertRaises(ValueError, TieredThrottle, tiers=[])
+
+    def test_throttling(self):
+        throttle_1 = TieredThrottle(tiers=[(2, 10), (3, 100)])
+
+        with mock.patch('tastypie.throttle.time') as mocked_time:
+            mocked_time.time.return_value = 1000
+
+            status = throttle_1.check('daniel')
+            self.assertEqual(status.throttled, False)
+            # Two requests allowed in the burst window, this is one of them.
+            self.assertEqual(status.limit, 2)
+            self.assertEqual(status.remaining, 1)
+            self.assertEqual(status.reset, 1010)
+
+            # Recording only increments a counter for each tier.
+            with mock.patch('tastypie.throttle.cache') as mocked_cache:
+                throttle_1.accessed('daniel', status=status)
+                self.assertEqual(mocked_cache.get_many.call_count, 0)
+                self.assertEqual(mocked_cache.incr.call_count, 2)
+
+            throttle_1.accessed('daniel', status=status)
+            self.assertEqual(cache.get_many(['daniel_accesses_10_1000', 'daniel_accesses_100_1000']), {'daniel_accesses_10_1000': 1, 'daniel_accesses_100_1000': 1})
+
+            self.assertEqual(throttle_1.should_be_throttled('daniel'), False)
+            throttle_1.accessed('daniel')
+
+            # THROTTLE'D by the burst limit!
+            status = throttle_1.check('daniel')
+            self.assertEqual(status.throttled, True)
+            self.assertEqual(status.remaining, 0)
+            self.assertEqual(status.reset, 1010)
+            self.assertEqual(dict(status.headers(now=1004))['Retry-After'], '6')
+
+            # Should be no interplay.
+            self.assertEqual(throttle_1.should_be_throttled('cody'), False)
+
+            # The burst window rolls over, but the sustained one is the
+            # tightest now.
+            mocked_time.time.return_value = 1012
+            status = throttle_1.check('daniel')
+            self.assertEqual(status.throttled, False)
+            self.assertEqual(status.limit, 3)
+            self.assertEqual(status.remaining, 0)
+            self.assertEqual(status.reset, 1100)
+            throttle_1.accessed('daniel', status=status)
+
+            # Now the sustained limit throttles until it resets.
+            status = throttle_1.check('daniel')
+            self.assertEqual(status.throttled, True)
+            self.assertEqual(status.limit, 3)
+            self.assertEqual(status.reset, 1100)
+
+            mocked_time.time.return_value = 1100
+            self.assertEqual(throttle_1.should_be_throttled('daniel'), False)
+
+    def test_concurrent_accesses(self):
+        throttle_1 = TieredThrottle(tiers=[(2, 10), (3, 100)])
+
+        with mock.patch('tastypie.throttle.time') as mocked_time:
+            mocked_time.time.return_value = 1000
+
+            # Both requests are checked before either is recorded, but each
+            # access still counts.
+            statuses = [throttle_1.check('daniel'), throttle_1.check('daniel')]
+            self.assertEqual([status.throttled for status in statuses], [False, False])
+
+            for status in statuses:
+                throttle_1.accessed('daniel', status=status)
+
+            self.assertEqual(cache.get('daniel_accesses_10_1000'), 2)
+            self.assertEqual(throttle_1.should_be_throttled('daniel'), True)
+
+    def test_status_headers(self):
+        self.assertEqual(BaseThrottle().check('daniel').headers(), [])
+
+        status = ThrottleStatus(False, limit=10, remaining=4, reset=2000)
+        self.assertEqual(status.headers(), [
+            ('X-RateLimit-Limit', '10'),
+            ('X-RateLimit-Remaining', '4'),
+            ('X-RateLimit-Reset', '2000'),
+        ])
+
+
+class ApproximateCacheThrottleTestCase(TestCase):
+    def tearDown(self):
+        cache.delete('daniel_accesses_1000')
+        cache.delete('daniel_accesses_1100')
+
+    def test_init(self):
+        self.assertRaises(ValueError, ApproximateCacheThrottle, throttle_at=10)
+        self.assertRaises(ValueError, ApproximateCacheThrottle, throttle_at=10, overshoot=0)
+
+        throttle_1 = ApproximateCacheThrottle(throttle_at=10, timeframe=100, overshoot=3)
+        self.assertEqual(throttle_1.overshoot, 3)
+        self.assertEqual(throttle_1.sync_interval, 5)
+        self.assertEqual(throttle_1.expiration, 100)
+
+    def test_throttling(self):
+        throttle_1 = ApproximateCacheThrottle(throttle_at=4, timeframe=100, overshoot=3, sync_interval=10)
+        other_process = ApproximateCacheThrottle(throttle_at=4, timeframe=100, overshoot=3, sync_interval=10)
+
+        with mock.patch('tastypie.throttle.time') as mocked_time:
+            mocked_time.time.return_value = 1000
+
+            self.assertEqual(throttle_1.should_be_throttled('daniel'), False)
+            throttle_1.accessed('daniel')
+            throttle_1.accessed('daniel')
+
+            # Nothing has reached the cache yet.
+            self.assertEqual(cache.get('daniel_accesses_1000'), None)
+            self.assertEqual(throttle_1.check('daniel').remaining, 1)
+
+            # Hitting the overshoot pushes the batch out.
+            throttle_1.accessed('daniel')
+            self.assertEqual(cache.get('daniel_accesses_1000'), 3)
+
+            # The other process sees the shared count once it syncs.
+            self.assertEqual(other_process.should_be_throttled('daniel'), False)
+            other_process.accessed('daniel')
+            self.assertEqual(other_process.should_be_throttled('daniel'), True)
+
+            # Local counting only, until the interval passes.
+            self.assertEqual(throttle_1.should_be_throttled('daniel'), False)
+            mocked_time.time.return_value = 1010
+            self.assertEqual(throttle_1.should_be_throttled('daniel'), False)
+            other_process.flush()
+            mocked_time.time.return_value = 1020
+            self.assertEqual(throttle_1.should_be_throttled('daniel'), True)
+            self.assertEqual(cache.get('daniel_accesses_1000'), 4)
+
+            # A new window starts from scratch & forgets the old one.
+            mocked_time.time.return_value = 1100
+            self.assertEqual(throttle_1.should_be_throttled('daniel'), False)
+            self.assertEqual(list(throttle_1._counts.keys()), ['daniel'])
+            self.assertEqual(throttle_1._counts['daniel'][0], 1100)
+
+
 class ModelTestCase(TestCase):
     def test_unicode(self):
         access = ApiAccess(identifier="testing", accessed=0)
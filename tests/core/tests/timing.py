@@ -0,0 +1,117 @@
+import logging
+
+import mock
+
+from django.db import connection
+from django.http import HttpRequest
+from django.test import TestCase
+
+from tastypie.authorization import Authorization
+from tastypie.resources import ModelResource
+from tastypie.timing import Timing, NoTiming, AggregateTimingSink, LoggingTimingSink, StatsdTimingSink, RequestTimer
+from core.models import Note
+
+
+class TimedNoteResource(ModelResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = Authorization()
+        timing = Timing(sink=AggregateTimingSink(), server_timing=True, count_queries=True)
+
+
+class UntimedNoteResource(TimedNoteResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        timing = NoTiming()
+
+
+class TimingTestCase(TestCase):
+    fixtures = ['note_testdata.json']
+
+    def setUp(self):
+        super(TimingTestCase, self).setUp()
+        self.sink = TimedNoteResource._meta.timing.sink
+        self.sink.reset()
+
+    def get_request(self):
+        request = HttpRequest()
+        request.method = 'GET'
+        request.GET = {'format': 'json'}
+        return request
+
+    def test_get_list(self):
+        resource = TimedNoteResource()
+        queries_before = len(connection.queries)
+        resp = resource.wrap_view('dispatch_list')(self.get_request())
+        self.assertEqual(resp.status_code, 200)
+
+        metrics = [metric.split(';') for metric in resp['Server-Timing'].split(', ')]
+        self.assertEqual([metric[0] for metric in metrics], ['authentication', 'throttle', 'query', 'paginate', 'dehydrate', 'serialize', 'response', 'total'])
+        self.assertTrue(all([metric[1].startswith('dur=') for metric in metrics]))
+        descriptions = dict([(metric[0], metric[2]) for metric in metrics])
+        self.assertEqual(descriptions['query'], 'desc="1 queries"')
+        self.assertEqual(descriptions['paginate'], 'desc="1 queries"')
+        self.assertEqual(descriptions['dehydrate'], 'desc="0 queries"')
+        self.assertEqual(descriptions['total'], 'desc="2 queries"')
+
+        # The connection is left as it was.
+        self.assertFalse(connection.use_debug_cursor)
+        self.assertEqual(len(connection.queries), queries_before)
+
+        stats = self.sink.stats()
+        self.assertEqual(stats[('notes', 'GET', 'total')]['count'], 1)
+        self.assertEqual(stats[('notes', 'GET', 'total')]['queries'], 2)
+
+        resource.wrap_view('dispatch_detail')(self.get_request(), pk=1)
+        stats = self.sink.stats()
+        self.assertEqual(stats[('notes', 'GET', 'total')]['count'], 2)
+        self.assertEqual(stats[('notes', 'GET', 'query')]['queries'], 2)
+        self.assertEqual(stats[('notes', 'GET', 'paginate')]['count'], 1)
+        self.assertTrue(stats[('notes', 'GET', 'total')]['max'] >= stats[('notes', 'GET', 'total')]['mean'])
+
+    def test_errors_timed(self):
+        resp = TimedNoteResource().wrap_view('dispatch_detail')(self.get_request(), pk=999)
+        self.assertEqual(resp.status_code, 404)
+        self.assertTrue('total;dur=' in resp['Server-Timing'])
+
+    def test_untimed(self):
+        resource = UntimedNoteResource()
+        request = self.get_request()
+
+        with mock.patch('tastypie.resources.NULL_PHASE') as mock_phase:
+            resp = resource.wrap_view('dispatch_list')(request)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(resp.has_header('Server-Timing'))
+        self.assertFalse(hasattr(request, '_tastypie_timer'))
+        self.assertTrue(mock_phase.__enter__.called)
+        self.assertEqual(len(self.sink.stats()), 0)
+
+    def test_logging_sink(self):
+        timer = RequestTimer()
+        timer.add('query', 0.002, 3)
+        sink = LoggingTimingSink()
+
+        with mock.patch.object(sink.logger, 'log') as mock_log:
+            with mock.patch.object(sink.logger, 'isEnabledFor', return_value=True):
+                sink.record('notes', 'GET', timer)
+
+        self.assertEqual(mock_log.call_args[0], (logging.INFO, 'GET notes query=2.000ms/3q'))
+        self.assertEqual(mock_log.call_args[1]['extra']['phases'], {'query': [0.002, 3]})
+
+    def test_statsd_sink(self):
+        timer = RequestTimer(count_queries=True)
+        timer.add('query', 0.002, 3)
+        timer.stop()
+        sink = StatsdTimingSink(host='statsd.example.com', port=9125, prefix='api')
+
+        with mock.patch.object(sink, 'get_socket') as mock_socket:
+            sink.record('auth/user', 'GET', timer)
+
+        data, address = mock_socket.return_value.sendto.call_args[0]
+        self.assertEqual(address, ('statsd.example.com', 9125))
+        lines = data.decode('utf-8').split('\n')
+        self.assertEqual(lines[:2], ['api.auth_user.get.query:2.000|ms', 'api.auth_user.get.query.queries:3|c'])
+        self.assertTrue(lines[2].startswith('api.auth_user.get.total:'))
@@ -6,6 +6,7 @@ from django.test import TestCase
 
 from tastypie.exceptions import BadRequest
 from tastypie.serializers import Serializer
+from tastypie.utils.lru import LRUCache
 from tastypie.utils.mime import determine_format, build_content_type
 from tastypie.utils.timezone import now
 
@@ -115,3 +116,36 @@ if TZ_AVAILABLE:
             with mock.patch('django.utils.timezone.now', return_value=without_tz):
                 self.assertEqual(now().isoformat(), '2013-08-07T22:54:52')
 
+
+class LRUCacheTestCase(TestCase):
+    def test_get_set(self):
+        lru = LRUCache(max_size=2)
+        self.assertEqual(lru.get('a'), None)
+        self.assertEqual(lru.get('a', 'default'), 'default')
+
+        lru.set('a', 1)
+        lru.set('b', 2)
+        self.assertEqual(lru.get('a'), 1)
+
+        # ``b`` is now the least recently used.
+        lru.set('c', 3)
+        self.assertEqual(len(lru), 2)
+        self.assertEqual(lru.get('b'), None)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('c'), 3)
+
+        # Setting an existing key refreshes it too.
+        lru.set('c', 4)
+        lru.set('d', 5)
+        self.assertEqual(lru.get('a'), None)
+        self.assertEqual(lru.get('c'), 4)
+
+        lru.clear()
+        self.assertEqual(len(lru), 0)
+        lru.set('a', 1)
+        self.assertEqual(lru.get('a'), 1)
+
+    def test_disabled(self):
+        lru = LRUCache(max_size=0)
+        lru.set('a', 1)
+        self.assertEqual(lru.get('a'), None)
@@ -1,8 +1,17 @@
+import json
+
 from django.core.exceptions import ImproperlyConfigured
 from django import forms
+from django.http import HttpRequest
 from django.test import TestCase
+from mock import patch
+from tastypie import fields
+from tastypie.authorization import Authorization
 from tastypie.bundle import Bundle
-from tastypie.validation import Validation, FormValidation, CleanedDataFormValidation
+from tastypie.exceptions import ImmediateHttpResponse
+from tastypie.resources import ModelResource
+from tastypie.validation import Validation, FormValidation, CleanedDataFormValidation, CompiledFormValidation, SchemaValidation
+from core.models import Counter, Note
 
 
 class NoteForm(forms.Form):
@@ -23,6 +32,19 @@ class NoteForm(forms.Form):
         return self.cleaned_data
 
 
+class PlainNoteForm(forms.Form):
+    title = forms.CharField(max_length=100)
+    slug = forms.CharField(max_length=50)
+    content = forms.CharField(required=False, widget=forms.Textarea)
+    is_active = forms.BooleanField()
+
+
+class CounterForm(forms.ModelForm):
+    class Meta:
+        model = Counter
+        fields = ['name', 'slug', 'count']
+
+
 class ValidationTestCase(TestCase):
     def test_init(self):
         try:
@@ -149,3 +171,207 @@ class CleanedDataFormValidationTestCase(TestCase):
         self.assertEqual(valid.is_valid(bundle), {})
         # NOTE: Bundle data is modified!
         self.assertEqual(bundle.data['title'], u'FOO.')
+
+
+class CompiledFormValidationTestCase(TestCase):
+    def test_is_valid(self):
+        valid = CompiledFormValidation(form_class=PlainNoteForm)
+        bundle = Bundle()
+        self.assertEqual(valid.is_valid(bundle), {
+            'is_active': [u'This field is required.'],
+            'slug': [u'This field is required.'],
+            'title': [u'This field is required.'],
+        })
+
+        bundle = Bundle(data={
+            'title': 'Foo.',
+            'slug': '123456789012345678901234567890123456789012345678901234567890',
+            'content': '',
+            'is_active': True,
+        })
+        self.assertEqual(valid.is_valid(bundle), {
+            'slug': [u'Ensure this value has at most 50 characters (it has 60).'],
+        })
+
+        bundle = Bundle(data={
+            'title': 'Foo.',
+            'slug': 'bar',
+            'content': '',
+            'is_active': True,
+        })
+        self.assertEqual(valid.is_valid(bundle), {})
+        self.assertEqual(bundle.data['title'], 'Foo.')
+
+    def test_custom_clean(self):
+        # Forms with their own cleaning still go through the form.
+        valid = CompiledFormValidation(form_class=NoteForm)
+        bundle = Bundle(data={
+            'title': 'Foo.',
+            'slug': 'bar',
+            'content': '',
+            'is_active': True,
+        })
+        self.assertEqual(valid.is_valid(bundle), {
+            '__all__': [u'Having no content makes for a very boring note.'],
+        })
+        self.assertEqual(bundle.data['title'], 'Foo.')
+
+    def test_data_from_obj(self):
+        valid = CompiledFormValidation(form_class=PlainNoteForm)
+        note = Note(title='Foo.', slug='foo', is_active=True)
+        bundle = Bundle(obj=note, data={'slug': '123456789012345678901234567890123456789012345678901234567890'})
+
+        # Only what's missing from the data is read off the object.
+        with self.assertNumQueries(0):
+            self.assertEqual(valid.is_valid(bundle), {
+                'slug': [u'Ensure this value has at most 50 characters (it has 60).'],
+            })
+
+    def test_from_model(self):
+        valid = CompiledFormValidation()
+        bundle = Bundle(obj=Note(), data={'title': 'Foo.', 'slug': 'not a slug!'})
+        errors = valid.is_valid(bundle)
+        self.assertEqual(list(errors.keys()), ['slug'])
+
+        bundle = Bundle(obj=Note(), data={'title': 'Foo.', 'slug': 'foo'})
+        self.assertEqual(valid.is_valid(bundle), {})
+
+        self.assertRaises(ImproperlyConfigured, valid.is_valid, Bundle(data={'title': 'Foo.'}))
+
+    def test_is_valid_list_unique(self):
+        existing = Counter.objects.create(name='Existing', slug='existing')
+        valid = CompiledFormValidation(form_class=CounterForm)
+        bundles = [
+            Bundle(obj=existing, data={'name': 'Renamed'}),
+            Bundle(obj=Counter(), data={'name': 'One', 'slug': 'one'}),
+            Bundle(obj=Counter(), data={'name': 'Two', 'slug': 'existing'}),
+            Bundle(obj=Counter(), data={'name': 'Three', 'slug': 'one'}),
+            Bundle(obj=Counter(), data={'name': 'Four', 'slug': 'not a slug!'}),
+        ]
+
+        # One query for all the slugs.
+        with self.assertNumQueries(1):
+            results = valid.is_valid_list(bundles)
+
+        self.assertEqual(results[0], {})
+        self.assertEqual(results[1], {})
+        self.assertEqual(results[2], {'slug': [u'Counter with this Slug already exists.']})
+        # Repeated within the list.
+        self.assertEqual(results[3], {'slug': [u'Counter with this Slug already exists.']})
+        self.assertEqual(list(results[4].keys()), ['slug'])
+
+
+class SchemaNoteResource(ModelResource):
+    subjects = fields.ToManyField('core.tests.resources.SubjectResource', 'subjects', null=True)
+
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.all()
+        authorization = Authorization()
+        validation = SchemaValidation()
+        field_constraints = {
+            'title': {'required': True, 'max_length': 100},
+            'slug': {'required': True, 'min_length': 2},
+            'content': {'choices': ['Yes.', 'No.']},
+        }
+
+
+class SchemaValidationTestCase(TestCase):
+    def setUp(self):
+        super(SchemaValidationTestCase, self).setUp()
+        self.resource = SchemaNoteResource()
+        self.valid = self.resource._meta.validation
+
+    def test_check_data(self):
+        self.assertEqual(self.valid.check_data(self.resource, {'title': 'Foo.', 'slug': 'foo'}), {})
+        self.assertEqual(self.valid.check_data(self.resource, {'title': 'Foo.', 'slug': 'foo', 'is_active': 'true', 'created': '2010-04-03 20:05:00', 'content': 'Yes.', 'subjects': ['/api/v1/subjects/1/', {'name': 'Foo'}]}), {})
+
+        self.assertEqual(self.valid.check_data(self.resource, {}), {
+            'title': ['This field is required.'],
+            'slug': ['This field is required.'],
+        })
+        self.assertEqual(self.valid.check_data(self.resource, {}, partial=True), {})
+
+        self.assertEqual(self.valid.check_data(self.resource, {'title': None, 'slug': ['foo'], 'is_active': 'maybe', 'created': 'not a date', 'content': 'Perhaps.', 'subjects': '/api/v1/subjects/1/'}), {
+            'title': ['This field may not be null.'],
+            'slug': ['Expected a string.'],
+            'is_active': ['Expected a boolean.'],
+            'created': ['Expected a date & time.'],
+            'content': ['Select a valid choice. Perhaps. is not one of the available choices.'],
+            'subjects': ['Expected a list of URIs or objects.'],
+        })
+        self.assertEqual(self.valid.check_data(self.resource, {'title': 'x' * 101, 'slug': 'f'}), {
+            'title': ['Ensure this value has at most 100 items or characters.'],
+            'slug': ['Ensure this value has at least 2 items or characters.'],
+        })
+
+        # Read-only & unknown fields are left alone.
+        self.assertEqual(self.valid.check_data(self.resource, {'title': 'Foo.', 'slug': 'foo', 'resource_uri': 12, 'nope': []}), {})
+        self.assertEqual(self.valid.check_data(self.resource, ['nope']), {'__all__': ['Expected an object.']})
+
+    def test_compiled_once(self):
+        with patch.object(SchemaNoteResource, 'build_schema', autospec=True, side_effect=ModelResource.build_schema) as mock_build_schema:
+            valid = SchemaValidation()
+            valid.check_data(self.resource, {'title': 'Foo.'})
+            valid.check_data(SchemaNoteResource(), {'title': 'Bar.'})
+
+        self.assertEqual(mock_build_schema.call_count, 1)
+
+    def test_improperly_configured(self):
+        class BadNoteResource(SchemaNoteResource):
+            class Meta:
+                queryset = Note.objects.all()
+                validation = SchemaValidation()
+                field_constraints = {'title': {'max_size': 10}}
+
+        self.assertRaises(ImproperlyConfigured, BadNoteResource()._meta.validation.check_data, BadNoteResource(), {})
+
+    def test_rejected_early(self):
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'POST'
+        request._read_started = False
+        request._raw_post_data = request._body = '{"title": "Foo.", "slug": "", "is_active": 12}'
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(ImmediateHttpResponse) as cm:
+                self.resource.post_list(request)
+
+        self.assertEqual(cm.exception.response.status_code, 400)
+        self.assertEqual(json.loads(cm.exception.response.content.decode('utf-8')), {
+            'notes': {
+                'slug': ['Ensure this value has at least 2 items or characters.'],
+                'is_active': ['Expected a boolean.'],
+            },
+        })
+
+    def test_checked_after_alter(self):
+        class RenamingNoteResource(SchemaNoteResource):
+            def alter_deserialized_detail_data(self, request, data):
+                if 'name' in data:
+                    data['title'] = data.pop('name')
+
+                return data
+
+        resource = RenamingNoteResource()
+        sent = {'name': 'x' * 101, 'slug': 'foo'}
+
+        for method, view, body, kwargs in (
+            ('PUT', resource.put_list, {'objects': [sent]}, {}),
+            ('PATCH', resource.patch_list, {'objects': [sent]}, {}),
+            ('PATCH', resource.patch_detail, sent, {'pk': 1}),
+        ):
+            request = HttpRequest()
+            request.GET = {'format': 'json'}
+            request.method = method
+            request._read_started = False
+            request._raw_post_data = request._body = json.dumps(body)
+
+            with self.assertNumQueries(0):
+                with self.assertRaises(ImmediateHttpResponse) as cm:
+                    view(request, **kwargs)
+
+            self.assertEqual(cm.exception.response.status_code, 400)
+            self.assertEqual(json.loads(cm.exception.response.content.decode('utf-8')), {
+                'notes': {'title': ['Ensure this value has at most 100 items or characters.']},
+            })
@@ -1,5 +1,6 @@
 from datetime import datetime, tzinfo, timedelta
 import json
+import os
 
 import django
 from django.conf import settings
@@ -9,6 +10,7 @@ from django.db.models.signals import pre_save
 
 from tastypie import fields
 from tastypie.exceptions import NotFound
+from tastypie.test import ResourceTestCase
 
 from core.models import Note, MediaBit
 from core.tests.mocks import MockRequest
@@ -746,3 +748,13 @@ class CorrectUriRelationsTestCase(TestCaseWithFixture):
 
         self.assertEqual(str(cm.exception), "An incorrect URL was provided '/v1/notes/2/' for the 'UserResource' resource.")
         self.assertEqual(Note.objects.count(), 2)
+
+
+class QueryBudgetTestCase(ResourceTestCase):
+    fixtures = ['test_data.json']
+    query_budgets = os.path.join(os.path.dirname(__file__), 'query_budgets.json')
+
+    def test_budgets(self):
+        for uri in ['/v1/', '/v1/notes/', '/v1/notes/1/', '/v1/users/', '/v1/post/', '/v1/label/', '/v1/category/', '/v1/person/']:
+            with self.assertQueryBudget('GET %s' % uri):
+                self.assertHttpOK(self.api_client.get(uri, format='json'))
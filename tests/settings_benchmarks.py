@@ -0,0 +1,16 @@
+from settings import *
+INSTALLED_APPS.append('benchmarks')
+
+ROOT_URLCONF = 'benchmarks.urls'
+
+DATABASES['default']['NAME'] = ':memory:'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Keeps queries (& the memory they take) from being logged.
+DEBUG = False
+TEMPLATE_DEBUG = DEBUG